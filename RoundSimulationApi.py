@@ -1,9 +1,15 @@
+import dataclasses
+import json
 import logging
+import os
+import queue
+import threading
+import time
 
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify, stream_with_context
 from flask_cors import CORS
 
-from typing import List, Dict
+from typing import List, Dict, FrozenSet
 
 from matplotlib import pyplot as plt
 
@@ -13,25 +19,58 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-from constants.GameConstants import PLAYER_COUNT, HAND_MAX_CARD_COUNT
+from constants.GameConstants import PLAYER_COUNT, HAND_MAX_CARD_COUNT, TRICK_COUNT
 from dtos.BasicDto import Player, Call, CallTypeEnum, SuitColorEnum
-from dtos.SimulationDto import RoundSimulationRequest, RoundSimulation, RoundSimulationResponse
+from dtos.SimulationDto import RoundSimulationRequest, RoundSimulation, RoundSimulationResponse, \
+    SimulationEngineEnum, SimulationOutputEnum, DEFAULT_SIMULATION_OUTPUTS, SimulationJob, SimulationJobResponse, RoundTotals, \
+    RoundSimulationBatch, RoundSimulationBatchRequest, RoundSimulationBatchResponse, CallDecision, CallDecisionRequest, \
+    CallDecisionResponse, CallOptionResponse, DiscardDecision, DiscardDecisionRequest, DiscardDecisionResponse, \
+    DiscardOptionResponse, FlippedCardSweepResponse
+from services.BitmaskRoundService import BitmaskRoundService
 from services.CallService import CallService
 from services.DealingService import DealingService
+from services.ExactRoundService import ExactRoundService
+from services.NumpyRoundService import NumpyRoundService
 from services.PlayService import PlayService
 from services.PlayerService import PlayerService
 from services.RoundService import RoundService
 from services.ShuffleService import ShuffleService
 from services.TrickService import TrickService
-from services.simulation.RoundSimulationService import RoundSimulationService
+from services.simulation.CallDecisionService import CallDecisionService
+from services.simulation.RoundSimulationService import RoundSimulationService, EXACT_ROUND_COST
+from services.simulation.SimulationJobService import SimulationJobService
+from services.simulation.SimulationWorkerPool import SimulationWorkerPool
+from mappers.SimulationMapper import to_simulation_cache_key
 from utils.BasicsUtil import create_player_name_map
+from utils.LruCache import LruCache
+from utils.StatisticsUtil import Z_95, proportion_standard_error, mean_standard_error
 from utils.CardUtil import get_card_by_name, get_cards_by_names, get_suit_by_name
 
 MAX_SIMULATION_QUANTITY = 1_000_000
+MAX_JOB_SIMULATION_QUANTITY = 1_000_000_000
+MAX_BATCH_SCENARIOS = 20
+DEFAULT_CALL_DECISION_QUANTITY = 20_000
+MAX_TIME_BUDGET_MS = 60_000
+# scenario fields a batch cannot honor: every scenario shares the batch's deals on the numpy engine
+UNSUPPORTED_BATCH_SCENARIO_FIELDS = ('engine', 'seed', 'target_win_prob_ci', 'target_avg_points_ci', 'time_budget_ms')
+# sweep fields that would stop strata at different points and so weight the up-cards unequally
+UNSUPPORTED_SWEEP_FIELDS = ('target_win_prob_ci', 'target_avg_points_ci', 'time_budget_ms')
+SIMULATION_WORKERS = int(os.environ.get('SIMULATION_WORKERS', os.cpu_count() or 1))
+SIMULATION_CACHE_SIZE = int(os.environ.get('SIMULATION_CACHE_SIZE', 10_000))
+SIMULATION_CACHE_TTL_SECONDS = float(os.environ.get('SIMULATION_CACHE_TTL_SECONDS', 3600))
+SIMULATION_MAX_RUNNING_JOBS = int(os.environ.get('SIMULATION_MAX_RUNNING_JOBS', 2))
 
 app = Flask(__name__)
 CORS(app)
 player_service = PlayerService()
+
+# simulation work runs in pre-warmed worker processes; request threads only parse, wait and respond
+# the pool starts with the first simulation that needs it, or up front through create_app when serving
+simulation_worker_pool = SimulationWorkerPool(SIMULATION_WORKERS)
+
+# key=normalized request, value=(RoundTotals, ids of the players left in the simulation)
+simulation_cache = LruCache(SIMULATION_CACHE_SIZE, SIMULATION_CACHE_TTL_SECONDS)
+
 round_simulation_service = RoundSimulationService(
     dealing_service=DealingService(),
     shuffle_service=ShuffleService(),
@@ -44,9 +83,16 @@ round_simulation_service = RoundSimulationService(
         dealing_service=DealingService(),
         call_service=CallService(),
         shuffle_service=ShuffleService(),
-    )
+    ),
+    bitmask_round_service=BitmaskRoundService(),
+    numpy_round_service=NumpyRoundService(),
+    exact_round_service=ExactRoundService(),
+    worker_pool=simulation_worker_pool,
 )
 
+call_decision_service = CallDecisionService(CallService(), round_simulation_service)
+simulation_job_service = SimulationJobService(round_simulation_service, SIMULATION_MAX_RUNNING_JOBS)
+
 
 @app.route("/")
 def health_check():
@@ -69,8 +115,8 @@ def simulate_round():
         # validate cross-field business rules
         validate_simulation(simulation)
 
-        # simulate rounds
-        simulation = round_simulation_service.simulate(simulation)
+        # simulate rounds, or reuse the totals of an identical earlier scenario
+        simulation = simulate_with_cache(simulation_request, simulation)
 
         # transform from RoundSimulation
         simulation_response = transform_simulation_to_response(simulation)
@@ -86,6 +132,235 @@ def simulate_round():
         return jsonify(error=str(e)), 500
 
 
+@app.route('/euchre/simulate/round/batch', methods=['POST'])
+def simulate_round_batch():
+    try:
+        batch_request = to_simulation_batch_request(request.json)
+        logger.info('Received batch simulation request: scenarios=%s quantity=%s', len(batch_request.scenarios),
+                    batch_request.quantity)
+        validate_simulation_batch_request(batch_request)
+        batch = transform_batch_request_to_batch(batch_request)
+        batch = round_simulation_service.simulate_batch(batch)
+        return jsonify(transform_batch_to_response(batch)), 200
+    except ValueError as e:
+        logger.warning('Validation error: %s', e)
+        return jsonify(error=str(e)), 400
+    except Exception as e:
+        logger.error('Batch simulation failed: %s', e, exc_info=True)
+        return jsonify(error=str(e)), 500
+
+
+@app.route('/euchre/evaluate/call', methods=['POST'])
+def evaluate_call():
+    try:
+        decision_request = to_call_decision_request(request.json)
+        logger.info('Received call decision request: quantity=%s', decision_request.quantity)
+        validate_quantity_and_seed(decision_request.quantity, decision_request.seed, MAX_SIMULATION_QUANTITY,
+                                   quantity_required=True)
+        decision = transform_decision_request_to_decision(decision_request)
+        decision = call_decision_service.evaluate(decision)
+        return jsonify(transform_decision_to_response(decision)), 200
+    except ValueError as e:
+        logger.warning('Validation error: %s', e)
+        return jsonify(error=str(e)), 400
+    except Exception as e:
+        logger.error('Call decision failed: %s', e, exc_info=True)
+        return jsonify(error=str(e)), 500
+
+
+@app.route('/euchre/evaluate/discard', methods=['POST'])
+def evaluate_discard():
+    try:
+        decision_request = to_discard_decision_request(request.json)
+        logger.info('Received discard decision request: quantity=%s', decision_request.quantity)
+        validate_quantity_and_seed(decision_request.quantity, decision_request.seed, MAX_SIMULATION_QUANTITY,
+                                   quantity_required=True)
+        decision = transform_discard_request_to_decision(decision_request)
+        decision = call_decision_service.evaluate_discards(decision)
+        return jsonify(transform_discard_decision_to_response(decision)), 200
+    except ValueError as e:
+        logger.warning('Validation error: %s', e)
+        return jsonify(error=str(e)), 400
+    except Exception as e:
+        logger.error('Discard decision failed: %s', e, exc_info=True)
+        return jsonify(error=str(e)), 500
+
+
+@app.route('/euchre/simulate/round/flipped-sweep', methods=['POST'])
+def sweep_flipped_cards():
+    try:
+        simulation_request = to_simulation_request(request.json)
+        logger.info('Received flipped card sweep request: quantity=%s', simulation_request.quantity)
+        validate_sweep_request(simulation_request)
+        simulation = transform_simulation_request_to_simulation(simulation_request)
+        # sweeps run on the numpy engine unless another one is asked for
+        if not simulation_request.engine:
+            simulation.engine = SimulationEngineEnum.NUMPY
+        validate_simulation(simulation)
+        batch = round_simulation_service.sweep_flipped_cards(simulation)
+        return jsonify(transform_sweep_to_response(simulation, batch)), 200
+    except ValueError as e:
+        logger.warning('Validation error: %s', e)
+        return jsonify(error=str(e)), 400
+    except Exception as e:
+        logger.error('Flipped card sweep failed: %s', e, exc_info=True)
+        return jsonify(error=str(e)), 500
+
+
+@app.route('/euchre/simulate/round/stream', methods=['POST'])
+def stream_simulate_round():
+    try:
+        simulation_request = to_simulation_request(request.json)
+        logger.info('Received streaming simulation request: quantity=%s', simulation_request.quantity)
+        validate_simulation_request(simulation_request)
+        simulation = transform_simulation_request_to_simulation(simulation_request)
+        validate_simulation(simulation)
+        # only the integer engines report chunks, so the object engine could neither send progress nor stop
+        if simulation.engine == SimulationEngineEnum.OBJECT:
+            raise ValueError(f"streamed simulations require one of the engines: "
+                             f"{SimulationEngineEnum.get_integer_engine_names()}")
+        if not simulation.chunk_size:
+            simulation.chunk_size = RoundSimulationService.get_progress_chunk_size(simulation)
+    except ValueError as e:
+        logger.warning('Validation error: %s', e)
+        return jsonify(error=str(e)), 400
+    except Exception as e:
+        logger.error('Streaming simulation request failed: %s', e, exc_info=True)
+        return jsonify(error=str(e)), 500
+
+    return Response(stream_with_context(stream_simulation_events(simulation_request, simulation)),
+                    mimetype='text/event-stream', headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+
+@app.route('/euchre/simulate/round/jobs', methods=['POST'])
+def submit_simulation_job():
+    try:
+        simulation_request = to_simulation_request(request.json)
+        logger.info('Received simulation job request: quantity=%s', simulation_request.quantity)
+        if simulation_request.quantity is None and simulation_request.time_budget_ms is None:
+            raise ValueError("quantity is required for simulation jobs")
+        validate_simulation_request(simulation_request, MAX_JOB_SIMULATION_QUANTITY)
+        simulation = transform_simulation_request_to_simulation(simulation_request, MAX_JOB_SIMULATION_QUANTITY)
+        validate_simulation(simulation)
+        job = simulation_job_service.submit(simulation)
+        return jsonify(transform_job_to_response(job)), 202
+    except ValueError as e:
+        logger.warning('Validation error: %s', e)
+        return jsonify(error=str(e)), 400
+    except Exception as e:
+        logger.error('Simulation job submission failed: %s', e, exc_info=True)
+        return jsonify(error=str(e)), 500
+
+
+@app.route('/euchre/simulate/round/jobs/<job_id>', methods=['GET'])
+def get_simulation_job(job_id: str):
+    job = simulation_job_service.get_job(job_id)
+    if job is None:
+        return jsonify(error=f"simulation job '{job_id}' not found"), 404
+    return jsonify(transform_job_to_response(job)), 200
+
+
+@app.route('/euchre/simulate/round/jobs/<job_id>', methods=['DELETE'])
+def cancel_simulation_job(job_id: str):
+    job = simulation_job_service.cancel(job_id)
+    if job is None:
+        return jsonify(error=f"simulation job '{job_id}' not found"), 404
+    return jsonify(transform_job_to_response(job)), 200
+
+
+@app.route('/euchre/simulate/round/cache', methods=['GET'])
+def simulation_cache_stats():
+    return jsonify(simulation_cache.stats()), 200
+
+
+def simulate_with_cache(simulation_request: RoundSimulationRequest, simulation: RoundSimulation) -> RoundSimulation:
+    cache_key = to_simulation_cache_key(simulation_request, simulation.engine, simulation.workers,
+                                        simulation.chunk_size)
+    cached_totals = simulation_cache.get(cache_key)
+    if cached_totals is None:
+        simulation = round_simulation_service.simulate(simulation)
+        put_simulation_in_cache(cache_key, simulation)
+        return simulation
+
+    logger.info('Simulation cache hit')
+    return apply_cached_totals(simulation, cached_totals)
+
+
+def put_simulation_in_cache(cache_key: tuple, simulation: RoundSimulation) -> None:
+    simulation_cache.put(cache_key, (RoundSimulationService.get_totals_from_simulation(simulation),
+                                     frozenset(p.id for p in simulation.players)))
+
+
+# no rounds are played for a cache hit, so it reports no throughput rather than the original run's
+def apply_cached_totals(simulation: RoundSimulation, cached_totals: tuple) -> RoundSimulation:
+    totals, player_ids = cached_totals
+    simulation.rounds_per_sec = 0
+    simulation.is_cached = True
+    # a loner's teammate sits out, exactly as the simulation would have removed them
+    simulation.players = [p for p in simulation.players if p.id in player_ids]
+    RoundSimulationService.update_simulation_with_totals(simulation, totals)
+    return simulation
+
+
+# yields SSE 'progress' events with running aggregates after each chunk, then one 'result' (or 'error') event
+# the simulation runs in its own thread and stops at the next chunk once the client disconnects
+# progress chunks split a seeded run's random streams differently, so the chunk size keeps its own cache entry
+def stream_simulation_events(simulation_request: RoundSimulationRequest, simulation: RoundSimulation):
+    cache_key = to_simulation_cache_key(simulation_request, simulation.engine, simulation.workers,
+                                        simulation.chunk_size)
+    cached_totals = simulation_cache.get(cache_key)
+    if cached_totals is not None:
+        logger.info('Simulation cache hit')
+        yield to_sse_event('result', transform_simulation_to_response(apply_cached_totals(simulation, cached_totals)))
+        return
+
+    events = queue.Queue()
+    disconnected = threading.Event()
+    start_time = time.time()
+
+    def on_chunk(totals: RoundTotals) -> bool:
+        snapshot = RoundTotals.create()
+        snapshot.merge(totals)
+        events.put(('progress', snapshot))
+        return disconnected.is_set()
+
+    def run_simulation():
+        try:
+            round_simulation_service.simulate(simulation, on_chunk)
+            if not disconnected.is_set():
+                put_simulation_in_cache(cache_key, simulation)
+            events.put(('result', simulation))
+        except Exception as e:
+            logger.error('Streaming simulation failed: %s', e, exc_info=True)
+            events.put(('error', str(e)))
+
+    threading.Thread(target=run_simulation, name='simulation-stream', daemon=True).start()
+    try:
+        while True:
+            event_name, payload = events.get()
+            if event_name == 'progress':
+                elapsed = time.time() - start_time
+                progress = dataclasses.asdict(transform_totals_to_response(
+                    simulation, payload, payload.rounds / elapsed if elapsed > 0 else 0))
+                progress['quantity'] = simulation.quantity
+                progress['percent_complete'] = round(payload.rounds / simulation.quantity * 100, 2)
+                yield to_sse_event('progress', progress)
+            elif event_name == 'result':
+                yield to_sse_event('result', transform_simulation_to_response(payload))
+                return
+            else:
+                yield to_sse_event('error', {'error': payload})
+                return
+    finally:
+        disconnected.set()
+
+
+def to_sse_event(event_name: str, data) -> str:
+    if dataclasses.is_dataclass(data):
+        data = dataclasses.asdict(data)
+    return f'event: {event_name}\ndata: {json.dumps(data)}\n\n'
+
+
 def to_simulation_request(json_data: Dict) -> RoundSimulationRequest:
     return RoundSimulationRequest(
         player_names=json_data.get('player_names', []),
@@ -96,17 +371,116 @@ def to_simulation_request(json_data: Dict) -> RoundSimulationRequest:
         call_suit=json_data.get('call_suit', ''),
         call_type=json_data.get('call_type', ''),
         quantity=json_data.get('quantity'),
-        passing_player_names=json_data.get('passing_player_names', [])
+        passing_player_names=json_data.get('passing_player_names', []),
+        engine=json_data.get('engine', ''),
+        seed=json_data.get('seed'),
+        target_win_prob_ci=json_data.get('target_win_prob_ci'),
+        target_avg_points_ci=json_data.get('target_avg_points_ci'),
+        time_budget_ms=json_data.get('time_budget_ms'),
+        outputs=json_data.get('outputs'),
+    )
+
+
+def to_simulation_batch_request(json_data: Dict) -> RoundSimulationBatchRequest:
+    scenarios = json_data.get('scenarios')
+    if not isinstance(scenarios, list):
+        raise ValueError("scenarios must be a list of simulation requests")
+    return RoundSimulationBatchRequest(
+        scenarios=[to_simulation_request(scenario) for scenario in scenarios],
+        quantity=json_data.get('quantity'),
+        seed=json_data.get('seed'),
+    )
+
+
+def to_call_decision_request(json_data: Dict) -> CallDecisionRequest:
+    return CallDecisionRequest(
+        player_names=json_data.get('player_names', []),
+        player_hands=json_data.get('player_hands', []),
+        dealer_name=json_data.get('dealer_name', ''),
+        flipped_card=json_data.get('flipped_card', ''),
+        decider_name=json_data.get('decider_name', ''),
+        quantity=json_data.get('quantity', DEFAULT_CALL_DECISION_QUANTITY),
+        seed=json_data.get('seed'),
+    )
+
+
+def to_discard_decision_request(json_data: Dict) -> DiscardDecisionRequest:
+    return DiscardDecisionRequest(
+        player_names=json_data.get('player_names', []),
+        player_hands=json_data.get('player_hands', []),
+        dealer_name=json_data.get('dealer_name', ''),
+        flipped_card=json_data.get('flipped_card', ''),
+        caller_name=json_data.get('caller_name', ''),
+        call_type=json_data.get('call_type', 'REGULAR_P1'),
+        quantity=json_data.get('quantity', DEFAULT_CALL_DECISION_QUANTITY),
+        seed=json_data.get('seed'),
     )
 
 
-def validate_simulation_request(simulation_request: RoundSimulationRequest):
+def validate_simulation_batch_request(batch_request: RoundSimulationBatchRequest):
+    if not 0 < len(batch_request.scenarios) <= MAX_BATCH_SCENARIOS:
+        raise ValueError(f"scenarios must contain between 1 and {MAX_BATCH_SCENARIOS} requests, "
+                         f"got {len(batch_request.scenarios)}")
+    for scenario_id, scenario in enumerate(batch_request.scenarios):
+        try:
+            for field_name in UNSUPPORTED_BATCH_SCENARIO_FIELDS:
+                if getattr(scenario, field_name) not in (None, ''):
+                    raise ValueError(f"{field_name} is not supported on batch scenarios "
+                                     f"(batches run on the numpy engine with the batch's quantity and seed)")
+            validate_simulation_request(scenario)
+        except ValueError as e:
+            raise ValueError(f"scenario {scenario_id}: {e}")
+    validate_quantity_and_seed(batch_request.quantity, batch_request.seed, MAX_SIMULATION_QUANTITY)
+
+
+def validate_sweep_request(simulation_request: RoundSimulationRequest):
+    if simulation_request.flipped_card:
+        raise ValueError("flipped_card must be blank for a flipped card sweep")
+    for field_name in UNSUPPORTED_SWEEP_FIELDS:
+        if getattr(simulation_request, field_name) not in (None, ''):
+            raise ValueError(f"{field_name} is not supported on flipped card sweeps "
+                             f"(every stratum plays its share of the quantity)")
+    validate_simulation_request(simulation_request)
+    validate_quantity_and_seed(simulation_request.quantity, simulation_request.seed, MAX_SIMULATION_QUANTITY,
+                               quantity_required=True)
+
+
+def validate_simulation_request(simulation_request: RoundSimulationRequest,
+                                max_quantity: int = MAX_SIMULATION_QUANTITY):
     if not simulation_request.call_type:
         raise ValueError("call_type is required (e.g. REGULAR_P1, REGULAR_P2, LONER_P1, LONER_P2)")
-    if simulation_request.quantity is not None and simulation_request.quantity <= 0:
-        raise ValueError(f"quantity must be a positive integer, got {simulation_request.quantity}")
-    if simulation_request.quantity is not None and simulation_request.quantity > MAX_SIMULATION_QUANTITY:
-        raise ValueError(f"quantity must not exceed {MAX_SIMULATION_QUANTITY}, got {simulation_request.quantity}")
+    validate_quantity_and_seed(simulation_request.quantity, simulation_request.seed, max_quantity)
+    # an exact deal costs as much as EXACT_ROUND_COST sampled rounds, so it gets a proportionally smaller cap
+    # unless a time budget bounds the run
+    max_exact_quantity = max_quantity // EXACT_ROUND_COST
+    if (get_engine_or_default(simulation_request.engine) == SimulationEngineEnum.EXACT
+            and simulation_request.time_budget_ms is None
+            and simulation_request.quantity is not None and simulation_request.quantity > max_exact_quantity):
+        raise ValueError(f"quantity must not exceed {max_exact_quantity} on the exact engine without a "
+                         f"time_budget_ms, got {simulation_request.quantity}")
+    for field_name in ('target_win_prob_ci', 'target_avg_points_ci'):
+        target = getattr(simulation_request, field_name)
+        if target is not None and (not isinstance(target, (int, float)) or isinstance(target, bool) or target <= 0):
+            raise ValueError(f"{field_name} must be a positive number, got {target}")
+    time_budget_ms = simulation_request.time_budget_ms
+    if time_budget_ms is not None and (not isinstance(time_budget_ms, int) or isinstance(time_budget_ms, bool)
+                                       or not 0 < time_budget_ms <= MAX_TIME_BUDGET_MS):
+        raise ValueError(f"time_budget_ms must be an integer between 1 and {MAX_TIME_BUDGET_MS}, got {time_budget_ms}")
+    get_outputs_or_default(simulation_request.outputs)
+
+
+# quantity may be None where a default applies (a batch or a time budget) unless it is required
+def validate_quantity_and_seed(quantity: int, seed: int, max_quantity: int, quantity_required: bool = False):
+    if quantity is None and quantity_required:
+        raise ValueError("quantity must be a positive integer, got None")
+    if quantity is not None and (not isinstance(quantity, int) or isinstance(quantity, bool)):
+        raise ValueError(f"quantity must be a positive integer, got {quantity}")
+    if quantity is not None and quantity <= 0:
+        raise ValueError(f"quantity must be a positive integer, got {quantity}")
+    if quantity is not None and quantity > max_quantity:
+        raise ValueError(f"quantity must not exceed {max_quantity}, got {quantity}")
+    if seed is not None and (not isinstance(seed, int) or isinstance(seed, bool) or seed < 0):
+        raise ValueError(f"seed must be a non-negative integer, got {seed}")
 
 
 def validate_simulation(simulation: RoundSimulation):
@@ -148,7 +522,8 @@ def validate_simulation(simulation: RoundSimulation):
         )
 
 
-def transform_simulation_request_to_simulation(simulation_request: RoundSimulationRequest) -> RoundSimulation:
+def transform_simulation_request_to_simulation(simulation_request: RoundSimulationRequest,
+                                               max_quantity: int = MAX_SIMULATION_QUANTITY) -> RoundSimulation:
     players = get_players_from_sim(simulation_request)
     player_name_map = create_player_name_map(players)
 
@@ -167,17 +542,165 @@ def transform_simulation_request_to_simulation(simulation_request: RoundSimulati
     if passing_player_ids and set(passing_player_ids) >= all_player_ids:
         raise ValueError("passing_player_names cannot include all players — someone must be eligible to call")
 
+    # a time budget without a quantity simulates as many rounds as fit, up to the maximum
+    quantity = simulation_request.quantity
+    if quantity is None and simulation_request.time_budget_ms is not None:
+        quantity = max_quantity
+
     return RoundSimulation(
         players=players,
         call=get_call_from_sim(simulation_request, player_name_map),
         rounds=[],
         flipped_card=get_card_by_name(simulation_request.flipped_card),
         dealer_id=get_id_or_default(simulation_request.dealer_name, player_name_map, 0),
-        quantity=simulation_request.quantity,
+        quantity=quantity,
         passing_player_ids=passing_player_ids,
+        engine=get_engine_or_default(simulation_request.engine),
+        workers=SIMULATION_WORKERS,
+        seed=simulation_request.seed,
+        target_win_prob_ci=simulation_request.target_win_prob_ci,
+        target_avg_points_ci=simulation_request.target_avg_points_ci,
+        time_budget_ms=simulation_request.time_budget_ms,
+        outputs=get_outputs_or_default(simulation_request.outputs),
+    )
+
+
+# every scenario plays the same number of rounds on the numpy engine, which shares draws across scenarios
+def transform_batch_request_to_batch(batch_request: RoundSimulationBatchRequest) -> RoundSimulationBatch:
+    simulations = []
+    for scenario_id, scenario in enumerate(batch_request.scenarios):
+        try:
+            simulation = transform_simulation_request_to_simulation(scenario)
+            validate_simulation(simulation)
+        except ValueError as e:
+            raise ValueError(f"scenario {scenario_id}: {e}")
+        simulation.engine = SimulationEngineEnum.NUMPY
+        simulations.append(simulation)
+
+    quantity = batch_request.quantity
+    if quantity is None:
+        quantity = max((scenario.quantity or 0 for scenario in batch_request.scenarios), default=0)
+    if not quantity:
+        raise ValueError("quantity is required, either for the batch or for its scenarios")
+    for simulation in simulations:
+        simulation.quantity = quantity
+
+    return RoundSimulationBatch(
+        simulations=simulations,
+        quantity=quantity,
+        workers=SIMULATION_WORKERS,
+        seed=batch_request.seed,
+    )
+
+
+def transform_sweep_to_response(simulation: RoundSimulation, batch: RoundSimulationBatch) -> FlippedCardSweepResponse:
+    return FlippedCardSweepResponse(
+        overall=transform_simulation_to_response(simulation),
+        by_flipped_card={
+            str(stratum.flipped_card): transform_simulation_to_response(stratum) for stratum in batch.simulations
+        },
+        rounds_simulated=simulation.rounds_completed,
+    )
+
+
+def transform_batch_to_response(batch: RoundSimulationBatch) -> RoundSimulationBatchResponse:
+    return RoundSimulationBatchResponse(
+        results=[transform_simulation_to_response(simulation) for simulation in batch.simulations],
+        rounds_simulated=batch.rounds_completed,
+        rounds_per_sec=round(batch.rounds_per_sec),
     )
 
 
+def transform_decision_request_to_decision(decision_request: CallDecisionRequest) -> CallDecision:
+    for field_name in ('decider_name', 'dealer_name', 'flipped_card'):
+        if not getattr(decision_request, field_name):
+            raise ValueError(f"{field_name} is required")
+    players = get_players_from_sim(decision_request)
+    player_name_map = create_player_name_map(players)
+    flipped_card = get_card_by_name(decision_request.flipped_card)
+
+    all_cards = [card for player in players for card in player.hand.remaining_cards]
+    if len(all_cards) != len(set(all_cards)):
+        raise ValueError("Duplicate card found across player hands")
+    if flipped_card in all_cards:
+        raise ValueError(f"Flipped card '{flipped_card}' is already in a player's hand")
+
+    return CallDecision(
+        players=players,
+        decider_id=get_id_or_default(decision_request.decider_name, player_name_map, 0),
+        dealer_id=get_id_or_default(decision_request.dealer_name, player_name_map, 0),
+        flipped_card=flipped_card,
+        quantity=decision_request.quantity,
+        workers=SIMULATION_WORKERS,
+        seed=decision_request.seed,
+    )
+
+
+def transform_discard_request_to_decision(decision_request: DiscardDecisionRequest) -> DiscardDecision:
+    for field_name in ('dealer_name', 'flipped_card'):
+        if not getattr(decision_request, field_name):
+            raise ValueError(f"{field_name} is required")
+    players = get_players_from_sim(decision_request)
+    player_name_map = create_player_name_map(players)
+    flipped_card = get_card_by_name(decision_request.flipped_card)
+
+    all_cards = [card for player in players for card in player.hand.remaining_cards]
+    if len(all_cards) != len(set(all_cards)):
+        raise ValueError("Duplicate card found across player hands")
+    if flipped_card in all_cards:
+        raise ValueError(f"Flipped card '{flipped_card}' is already in a player's hand")
+
+    dealer_id = get_id_or_default(decision_request.dealer_name, player_name_map, 0)
+    return DiscardDecision(
+        players=players,
+        dealer_id=dealer_id,
+        flipped_card=flipped_card,
+        call=Call(
+            suit=flipped_card.suit,
+            type=CallTypeEnum.create(decision_request.call_type),
+            player_id=get_id_or_default(decision_request.caller_name, player_name_map, dealer_id),
+        ),
+        quantity=decision_request.quantity,
+        workers=SIMULATION_WORKERS,
+        seed=decision_request.seed,
+    )
+
+
+def transform_discard_decision_to_response(decision: DiscardDecision) -> DiscardDecisionResponse:
+    return DiscardDecisionResponse(
+        options=[
+            DiscardOptionResponse(
+                discard=str(option.card),
+                expected_points=round(option.expected_points, 3),
+                standard_error=round(option.standard_error, 3),
+            )
+            for option in decision.options
+        ],
+        rounds_simulated=decision.quantity,
+    )
+
+
+def transform_decision_to_response(decision: CallDecision) -> CallDecisionResponse:
+    option_responses = []
+    for option in decision.options:
+        if option.is_pass():
+            action, call_type, suit = 'pass', None, None
+        else:
+            if option.call.type.is_phase_2():
+                action = 'call'
+            else:
+                action = 'pick_up' if decision.decider_id == decision.dealer_id else 'order_up'
+            call_type, suit = option.call.type.name, option.call.suit.name.name.lower()
+        option_responses.append(CallOptionResponse(
+            action=action,
+            call_type=call_type,
+            suit=suit,
+            expected_points=round(option.expected_points, 3),
+            standard_error=round(option.standard_error, 3),
+        ))
+    return CallDecisionResponse(options=option_responses, rounds_simulated=decision.quantity)
+
+
 def transform_simulation_to_response(simulation: RoundSimulation) -> RoundSimulationResponse:
     team_names = get_team_names(simulation.players)
     team_name_1 = team_names[0]
@@ -186,7 +709,7 @@ def transform_simulation_to_response(simulation: RoundSimulation) -> RoundSimula
     # Build player id -> name map
     player_name_by_id = {p.id: p.name for p in simulation.players}
 
-    rounds_count = simulation.quantity
+    rounds_count = simulation.rounds_completed or simulation.quantity
 
     # Use precomputed totals from the simulation
     tp = simulation.total_points
@@ -206,12 +729,110 @@ def transform_simulation_to_response(simulation: RoundSimulation) -> RoundSimula
         for pid, tricks in tt.items()
     }
 
-    return RoundSimulationResponse(
+    # unrequested statistics are partial or were never counted, so their maps are left empty
+    if SimulationOutputEnum.AVG_POINTS not in simulation.outputs:
+        avg_points_map = {}
+    if SimulationOutputEnum.WIN_PROB not in simulation.outputs:
+        win_prob_map = {}
+    if SimulationOutputEnum.AVG_TRICKS not in simulation.outputs:
+        avg_tricks_map = {}
+
+    simulation_response = RoundSimulationResponse(
         win_prob_map=win_prob_map,
         avg_points_map=avg_points_map,
-        avg_tricks_map=avg_tricks_map
+        avg_tricks_map=avg_tricks_map,
+        rounds_simulated=rounds_count,
+        rounds_per_sec=round(simulation.rounds_per_sec),
+        cached=simulation.is_cached,
     )
 
+    team_name_map = {SuitColorEnum.BLACK: team_name_1, SuitColorEnum.RED: team_name_2}
+    if SimulationOutputEnum.POINTS_HISTOGRAM in simulation.outputs:
+        simulation_response.points_histogram_map = {
+            team_name_map[team]: [round(count / rounds_count, 4) for count in counts]
+            for team, counts in simulation.total_points_histogram.items()
+        }
+    if SimulationOutputEnum.TRICKS_HISTOGRAM in simulation.outputs:
+        simulation_response.tricks_histogram_map = {
+            team_name_map[team]: [round(count / rounds_count, 4) for count in counts]
+            for team, counts in simulation.total_tricks_histogram.items()
+        }
+    if SimulationOutputEnum.STANDARD_ERRORS in simulation.outputs:
+        add_standard_errors_to_response(simulation_response, simulation, team_name_map, player_name_by_id,
+                                        rounds_count)
+
+    return simulation_response
+
+
+# standard errors and 95% confidence intervals of the requested means, from the running sums of squares
+# the exact engine's fractional wins get the binomial standard error, an upper bound on its deal noise
+# intervals are clamped to the values a statistic can take (probabilities 0-1, points 0-4, tricks 0-5)
+def add_standard_errors_to_response(simulation_response: RoundSimulationResponse, simulation: RoundSimulation,
+                                    team_name_map: Dict[SuitColorEnum, str], player_name_by_id: Dict[int, str],
+                                    rounds_count: int) -> None:
+    def to_interval(mean: float, standard_error: float, low: float, high: float) -> List[float]:
+        return [round(max(low, mean - Z_95 * standard_error), 4), round(min(high, mean + Z_95 * standard_error), 4)]
+
+    if SimulationOutputEnum.WIN_PROB in simulation.outputs:
+        standard_errors = {team: proportion_standard_error(wins, rounds_count)
+                           for team, wins in simulation.total_wins.items()}
+        simulation_response.win_prob_se_map = {team_name_map[team]: round(standard_error, 4)
+                                               for team, standard_error in standard_errors.items()}
+        simulation_response.win_prob_ci_map = {
+            team_name_map[team]: to_interval(simulation.total_wins[team] / rounds_count, standard_error, 0, 1)
+            for team, standard_error in standard_errors.items()
+        }
+    if SimulationOutputEnum.AVG_POINTS in simulation.outputs:
+        standard_errors = {team: mean_standard_error(points, simulation.total_points_squared[team], rounds_count)
+                           for team, points in simulation.total_points.items()}
+        simulation_response.avg_points_se_map = {team_name_map[team]: round(standard_error, 4)
+                                                 for team, standard_error in standard_errors.items()}
+        simulation_response.avg_points_ci_map = {
+            team_name_map[team]: to_interval(simulation.total_points[team] / rounds_count, standard_error, 0, 4)
+            for team, standard_error in standard_errors.items()
+        }
+    if SimulationOutputEnum.AVG_TRICKS in simulation.outputs:
+        standard_errors = {
+            player_id: mean_standard_error(tricks, simulation.total_tricks_squared_by_player[player_id], rounds_count)
+            for player_id, tricks in simulation.total_tricks_by_player.items()
+        }
+        simulation_response.avg_tricks_se_map = {player_name_by_id[player_id]: round(standard_error, 4)
+                                                 for player_id, standard_error in standard_errors.items()}
+        simulation_response.avg_tricks_ci_map = {
+            player_name_by_id[player_id]: to_interval(simulation.total_tricks_by_player[player_id] / rounds_count,
+                                                      standard_error, 0, TRICK_COUNT)
+            for player_id, standard_error in standard_errors.items()
+        }
+
+
+def transform_job_to_response(job: SimulationJob) -> SimulationJobResponse:
+    simulation = job.simulation
+    totals = job.totals
+    rounds_completed = totals.rounds if totals is not None else 0
+    elapsed = simulation_job_service.get_elapsed_seconds(job)
+    rounds_per_sec = rounds_completed / elapsed if elapsed > 0 else 0
+
+    return SimulationJobResponse(
+        job_id=job.id,
+        status=job.status.value,
+        rounds_completed=rounds_completed,
+        quantity=simulation.quantity,
+        percent_complete=round(rounds_completed / simulation.quantity * 100, 2),
+        rounds_per_sec=round(rounds_per_sec),
+        elapsed_seconds=round(elapsed, 2),
+        result=transform_totals_to_response(simulation, totals, rounds_per_sec) if rounds_completed else None,
+        error=job.error,
+    )
+
+
+# aggregates over the rounds played so far, built on a copy so the running simulation is untouched
+def transform_totals_to_response(simulation: RoundSimulation, totals: RoundTotals,
+                                 rounds_per_sec: float) -> RoundSimulationResponse:
+    partial_simulation = dataclasses.replace(simulation, players=list(simulation.players))
+    RoundSimulationService.update_simulation_with_totals(partial_simulation, totals)
+    partial_simulation.rounds_per_sec = rounds_per_sec
+    return transform_simulation_to_response(partial_simulation)
+
 
 def get_team_names(players: List[Player]) -> (str, str):
     team_1 = []
@@ -265,6 +886,28 @@ def get_call_from_sim(simulation_request: RoundSimulationRequest, player_name_ma
     )
 
 
+def get_outputs_or_default(output_names: List[str]) -> FrozenSet[SimulationOutputEnum]:
+    if output_names is None:
+        return DEFAULT_SIMULATION_OUTPUTS
+    if not isinstance(output_names, list) or not output_names:
+        raise ValueError(f"outputs must be a non-empty list, got {output_names}")
+    try:
+        return frozenset(SimulationOutputEnum(name) for name in output_names)
+    except ValueError:
+        valid_names = ', '.join(output.value for output in SimulationOutputEnum)
+        raise ValueError(f"outputs must only contain: {valid_names}, got {output_names}")
+
+
+def get_engine_or_default(engine_name: str) -> SimulationEngineEnum:
+    if not engine_name:
+        return SimulationEngineEnum.BITMASK
+    try:
+        return SimulationEngineEnum(engine_name)
+    except ValueError:
+        valid_names = ', '.join(engine.value for engine in SimulationEngineEnum)
+        raise ValueError(f"'{engine_name}' is not a valid engine. Valid engines: {valid_names}")
+
+
 def get_id_or_default(player_name: str, player_name_map: Dict[str, Player], default_value: int) -> int:
     if not player_name:
         return default_value
@@ -300,5 +943,12 @@ def plot_dict(dict_to_plot, xlabel, ylabel, title, ylim):
     plt.show()
 
 
+# server entry point (waitress --call RoundSimulationApi:create_app): warms the worker pool before the first request
+def create_app() -> Flask:
+    simulation_worker_pool.start()
+    return app
+
+
 if __name__ == '__main__':
+    create_app()
     app.run(debug=True, host='0.0.0.0', port=8080)
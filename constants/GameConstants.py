@@ -3,6 +3,10 @@ from dtos.BasicDto import Suit, SuitNameEnum, SuitColorEnum, Card, CardValueEnum
 
 PLAYER_COUNT = 4
 HAND_MAX_CARD_COUNT = 5
+TRICK_COUNT = 5
+
+# team ids used by the integer engines are indexes into teams
+teams = (SuitColorEnum.BLACK, SuitColorEnum.RED)
 
 
 spades = Suit(SuitNameEnum.SPADES, SuitColorEnum.BLACK)
@@ -250,3 +254,44 @@ flat_hierarchy = {}
 for _trump in suits:
     for _play_suit in suits:
         flat_hierarchy[(_trump, _play_suit)] = trump_and_play_suit_hierarchy[_trump][_play_suit]
+
+
+# Integer card tables used by the bitmask engine
+# card ids are indexes into euchre_deck (0-23), suit ids are indexes into suits (0-3),
+# and a hand is a 24-bit mask with bit card_id set for every card held
+CARD_COUNT = len(euchre_deck)
+card_id_map = {card: card_id for card_id, card in enumerate(euchre_deck)}
+suit_id_map = {suit: suit_id for suit_id, suit in enumerate(suits)}
+card_bits = tuple(1 << card_id for card_id in range(CARD_COUNT))
+
+# effective_suit_table[trump_id][card_id] -> effective suit_id (accounts for jacks)
+effective_suit_table = tuple(
+    tuple(suit_id_map[_trump] if _card in trump_suit_hierarchy[_trump] else suit_id_map[_card.suit]
+          for _card in euchre_deck)
+    for _trump in suits
+)
+
+# suit_mask_table[trump_id][suit_id] -> mask of the cards whose effective suit is suit_id
+suit_mask_table = tuple(
+    tuple(sum(card_bits[_card_id] for _card_id in range(CARD_COUNT)
+              if effective_suit_table[_trump_id][_card_id] == _suit_id)
+          for _suit_id in range(len(suits)))
+    for _trump_id in range(len(suits))
+)
+
+# card_rank_table[trump_id][card_id] -> rank of the card for the trump suit alone, trump ranks first
+# (as utils.CardUtil.get_card_rank_by_trump_suit, without the is_trump check per card)
+card_rank_table = tuple(
+    tuple(trump_suit_hierarchy[_trump][_card] if _card in trump_suit_hierarchy[_trump]
+          else play_suit_hierarchy[_card.suit][_card]
+          for _card in euchre_deck)
+    for _trump in suits
+)
+CARD_RANK_COUNT = max(max(_ranks) for _ranks in card_rank_table)
+
+# rank_table[trump_id][play_suit_id][card_id] -> rank from flat_hierarchy (lower wins)
+rank_table = tuple(
+    tuple(tuple(flat_hierarchy[(_trump, _play_suit)][_card] for _card in euchre_deck)
+          for _play_suit in suits)
+    for _trump in suits
+)
@@ -1,21 +1,68 @@
 import os
 from dataclasses import dataclass, field
-from typing import Tuple, List, Dict
+from enum import Enum
+from typing import Tuple, List, Dict, FrozenSet
 
-from dtos.BasicDto import Player, Game, Round, Call, Card
+import numpy as np
+
+from constants.GameConstants import euchre_deck, suits, teams, card_id_map, suit_id_map, effective_suit_table, \
+    TRICK_COUNT, CARD_RANK_COUNT
+from dtos.BasicDto import Player, Game, Round, Call, Card, CallTypeEnum, Trick, Play
+
+
+class SimulationEngineEnum(Enum):
+    OBJECT = "object"  # plays Round/Trick/Play objects through RoundService
+    BITMASK = "bitmask"  # plays card ids and 24-bit hand masks through BitmaskRoundService
+    NUMPY = "numpy"  # plays blocks of rounds as arrays through NumpyRoundService
+    STRATIFIED = "stratified"  # the numpy engine with stratified random choices and antithetic deals
+    EXACT = "exact"  # averages every possible play of each sampled deal through ExactRoundService
+
+    # the engines that play chunks of integer totals (all but OBJECT), as a comma separated list
+    @staticmethod
+    def get_integer_engine_names() -> str:
+        return ', '.join(engine.value for engine in SimulationEngineEnum if engine != SimulationEngineEnum.OBJECT)
+
+
+class SimulationOutputEnum(Enum):
+    WIN_PROB = "win_prob"
+    AVG_POINTS = "avg_points"
+    AVG_TRICKS = "avg_tricks"
+    POINTS_HISTOGRAM = "points_histogram"  # share of rounds each team scores 0, 1, 2 or 4 points
+    TRICKS_HISTOGRAM = "tricks_histogram"  # share of rounds each team takes 0-5 tricks
+    STANDARD_ERRORS = "standard_errors"  # standard error and 95% confidence interval of every requested mean
+
+
+DEFAULT_SIMULATION_OUTPUTS = frozenset({SimulationOutputEnum.WIN_PROB, SimulationOutputEnum.AVG_POINTS,
+                                        SimulationOutputEnum.AVG_TRICKS})
+
+
+class SimulationJobStatusEnum(Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    CANCELLED = "cancelled"
+    FAILED = "failed"
+
+    def is_finished(self):
+        return self in (SimulationJobStatusEnum.COMPLETED, SimulationJobStatusEnum.CANCELLED,
+                        SimulationJobStatusEnum.FAILED)
 
 
 @dataclass
 class GameSimulation:
     players: Tuple[Player]
-    games: List[Game]
+    games: List[Game]  # not filled: recorded games are streamed to the play log as they finish
     output_directory: str
     file_name: str
     id: int = 0
     quantity: int = 0  # number of games to be simulated
-    record_batch_size: int = 100  # only used if record_games=True
+    record_batch_size: int = 100  # only used if record_games=True, games queued for the log writer at most
     is_complete: bool = False
-    record_games: bool = False  # indicates whether games will be stored and recorded
+    record_games: bool = False  # indicates whether games will be recorded to a binary play log
+    card_win_totals: "CardWinTotals" = None  # plays and trick wins by card rank, set when recording games
+    keep_round_snapshots: bool = False  # indicates whether a RoundSnapshot of every round is kept
+    round_snapshots: List["RoundSnapshot"] = field(default_factory=list)  # in play order across games
+    totals: "GameTotals" = None  # running game statistics, set when the simulation runs
 
     def get_full_file_path(self):
         return os.path.join(self.output_directory, self.file_name)
@@ -25,7 +72,7 @@ class GameSimulation:
 class RoundSimulation:
     players: List[Player]
     call: Call
-    rounds: List[Round]
+    rounds: List[Round]  # a RoundStore of every played round once simulated with keep_rounds
     flipped_card: Card
     dealer_id: int = 0  # 0 represents a random dealer (1-4 are valid player ids)
     id: int = 0
@@ -35,7 +82,336 @@ class RoundSimulation:
     total_points: dict = None
     total_wins: dict = None
     total_tricks_by_player: dict = None
+    total_points_squared: dict = None  # sum of squared round points per team
     passing_player_ids: List[int] = field(default_factory=list)
+    discarded_card: Card = None  # the dealer's discard after picking up the flipped card, out of play
+    engine: SimulationEngineEnum = SimulationEngineEnum.OBJECT
+    workers: int = 1  # processes to shard the integer engines across
+    seed: int = None  # makes integer engine results reproducible for a given seed and worker count
+    chunk_size: int = 0  # rounds played between progress checks (0 picks a size automatically)
+    target_win_prob_ci: float = None  # stop once the 95% CI half-width of each team's win probability is this small
+    target_avg_points_ci: float = None  # stop once the 95% CI half-width of each team's average points is this small
+    time_budget_ms: int = None  # stop playing new rounds once this much time has passed, quantity becomes a ceiling
+    rounds_completed: int = 0  # rounds actually played (may be below quantity when stopping early)
+    rounds_per_sec: float = 0  # achieved simulation throughput
+    is_cached: bool = False  # totals were reused from an identical earlier simulation instead of simulated
+    # statistics to compute, engines skip the work that only feeds the others (without AVG_TRICKS or
+    # TRICKS_HISTOGRAM the object and bitmask engines stop each round once its points are decided)
+    outputs: FrozenSet[SimulationOutputEnum] = DEFAULT_SIMULATION_OUTPUTS
+    total_tricks_squared_by_player: dict = None  # sum of squared tricks per round for each player
+    total_points_histogram: dict = None  # key=team, value=rounds by points won (index 0-4)
+    total_tricks_histogram: dict = None  # key=team, value=rounds by tricks won (index 0-5)
+
+
+@dataclass
+class RoundSimulationBatch:
+    simulations: List[RoundSimulation]  # scenarios evaluated against the same deals and play draws
+    quantity: int = 1  # rounds simulated for every scenario
+    workers: int = 1
+    seed: int = None
+    rounds_completed: int = 0
+    rounds_per_sec: float = 0  # rounds of one scenario per second
+
+
+@dataclass
+class CallOption:
+    call: Call  # player_id 0 and suit None (a random caller and suit) represent a pass
+    expected_points: float = 0  # deciding team's points minus the opponents' points per round
+    standard_error: float = 0
+
+    def is_pass(self) -> bool:
+        return self.call.player_id == 0
+
+
+@dataclass
+class CallDecision:
+    players: List[Player]  # hands hold the known cards, usually only the decider's
+    decider_id: int
+    dealer_id: int
+    flipped_card: Card
+    quantity: int = 1  # rounds simulated for every option
+    workers: int = 1
+    seed: int = None
+    options: List[CallOption] = field(default_factory=list)  # best first once evaluated
+
+
+@dataclass
+class DiscardOption:
+    card: Card
+    expected_points: float = 0  # dealer's team points minus the opponents' points per round
+    standard_error: float = 0
+
+
+@dataclass
+class DiscardDecision:
+    players: List[Player]  # the dealer's hand holds its 5 cards before picking up
+    dealer_id: int
+    flipped_card: Card
+    call: Call  # the phase 1 call that makes the dealer pick up
+    quantity: int = 1  # rounds simulated for every candidate discard
+    workers: int = 1
+    seed: int = None
+    options: List[DiscardOption] = field(default_factory=list)  # best first once evaluated
+
+
+# running sums of a simulation: integer counts on the sampled engines, while the exact engine adds each deal's
+# expected values and outcome probabilities, so its sums are fractional
+@dataclass(slots=True)
+class RoundTotals:
+    points: List[float]  # index=team_id (0=black, 1=red), value=points won
+    points_squared: List[float]  # index=team_id, value=sum of squared points per round (expected points when exact)
+    wins: List[float]  # index=team_id, value=rounds won (expected wins when exact)
+    tricks_by_player: List[float]  # index=player_id (index 0 unused), value=tricks won (expected when exact)
+    tricks_squared_by_player: List[float]  # index=player_id, value=sum of squared tricks per round
+    points_histogram: List[List[float]]  # index=team_id, value=rounds by points won (index 0-4, 3 is never scored)
+    tricks_histogram: List[List[float]]  # index=team_id, value=rounds by tricks won (index 0-5)
+    rounds: int = 0
+
+    @staticmethod
+    def create():
+        return RoundTotals(points=[0, 0], points_squared=[0, 0], wins=[0, 0], tricks_by_player=[0] * 5,
+                           tricks_squared_by_player=[0] * 5, points_histogram=[[0] * 5, [0] * 5],
+                           tricks_histogram=[[0] * 6, [0] * 6])
+
+    def merge(self, other: "RoundTotals") -> None:
+        for team_id in range(2):
+            self.points[team_id] += other.points[team_id]
+            self.points_squared[team_id] += other.points_squared[team_id]
+            self.wins[team_id] += other.wins[team_id]
+            for points in range(len(self.points_histogram[team_id])):
+                self.points_histogram[team_id][points] += other.points_histogram[team_id][points]
+            for tricks in range(len(self.tricks_histogram[team_id])):
+                self.tricks_histogram[team_id][tricks] += other.tricks_histogram[team_id][tricks]
+        for player_id in range(len(self.tricks_by_player)):
+            self.tricks_by_player[player_id] += other.tricks_by_player[player_id]
+            self.tricks_squared_by_player[player_id] += other.tricks_squared_by_player[player_id]
+        self.rounds += other.rounds
+
+
+@dataclass(frozen=True, slots=True)
+class BlockRandoms:
+    deal_keys: np.ndarray  # (rounds, card_id) -> sort key, unassigned cards are dealt in key order
+    dealer_draws: np.ndarray  # (rounds,) -> uniform draw picking a random dealer
+    trump_draws: np.ndarray  # (rounds,) -> uniform draw picking a random trump suit
+    caller_draws: np.ndarray  # (rounds,) -> uniform draw picking a random caller
+    play_keys: np.ndarray = None  # (rounds, trick, card_id) -> key, each player plays its legal card with the highest key
+
+
+@dataclass(frozen=True, slots=True)
+class DealOutcome:
+    calling_team_trick_probs: Tuple[float, ...]  # index=tricks won by the calling team (0-5), value=probability
+    expected_tricks_by_player: Tuple[float, ...]  # index=player_id (index 0 unused), value=expected tricks won
+
+
+# preallocated round, tricks and plays that the object engine resets and replays for every round
+# (kept rounds are copied into a RoundStore, so no round holds on to the pooled objects)
+@dataclass(slots=True)
+class RoundPool:
+    round: Round
+    tricks: List[Trick]  # index=trick id - 1
+    plays: List[List[Play]]  # index=trick id - 1, then play id - 1
+    matching: List[int]  # scratch list of the card indexes able to follow suit
+
+
+call_types = tuple(CallTypeEnum)  # call type ids used by RoundStore are indexes into call_types
+
+
+# immutable record of one played round in card and player ids, captured before the hands are cleared
+@dataclass(frozen=True, slots=True)
+class RoundSnapshot:
+    game_id: int
+    round_id: int
+    dealer_id: int
+    caller_id: int
+    call_type_id: int  # index into call_types
+    trump_id: int
+    flipped_card_id: int  # -1 when no card was flipped
+    # index=player_id (index 0 unused), value=dealt card ids, before any pick up and including a loner's teammate
+    starting_hands: Tuple[Tuple[int, ...], ...]
+    play_card_ids: Tuple[int, ...]  # card ids in play order
+    trick_winner_ids: Tuple[int, ...]  # index=trick id - 1, value=player_id
+    points: Tuple[int, int]  # index=team_id, value=points won
+    discarded_card_id: int = -1  # the dealer's discard after picking up the flipped card, -1 when not picked up
+
+
+# plays and trick wins by card rank for the trump suit (utils.CardUtil.get_card_rank_by_trump_suit)
+# win probabilities are only computed when written out, see RecordService.output_card_win_probabilities
+@dataclass
+class CardWinTotals:
+    plays: np.ndarray  # index=card rank (1-13, index 0 unused), value=times played
+    wins: np.ndarray  # index=card rank (1-13, index 0 unused), value=tricks won
+
+    @staticmethod
+    def create():
+        return CardWinTotals(plays=np.zeros(CARD_RANK_COUNT + 1, dtype=np.int64),
+                             wins=np.zeros(CARD_RANK_COUNT + 1, dtype=np.int64))
+
+    def merge(self, other: "CardWinTotals") -> None:
+        self.plays += other.plays
+        self.wins += other.wins
+
+
+# running statistics of simulated games, updated as each game ends
+@dataclass
+class GameTotals:
+    wins: List[int]  # index=team_id, value=games won
+    points: List[int]  # index=team_id, value=points scored
+    calls_by_seat: List[int]  # index=player_id, value=rounds the seat called
+    points_by_seat: List[int]  # index=player_id, value=net points of the seat's calls (euchres count against it)
+    games: int = 0
+    rounds: int = 0  # rounds / games is the average game length
+    rounds_squared: int = 0  # sum of squared rounds per game, for the standard error of the game length
+
+    @staticmethod
+    def create():
+        return GameTotals(wins=[0, 0], points=[0, 0], calls_by_seat=[0] * 5, points_by_seat=[0] * 5)
+
+
+# kept rounds as fixed-width integer columns (32 bytes per round instead of ~2.9 KB of Round, Trick and Play objects)
+# indexing or iterating builds a fresh Round for each round on demand, sharing the store's players
+@dataclass(slots=True)
+class RoundStore:
+    players: List[Player]  # players of every round (a loner's teammate excluded)
+    next_player_ids: Tuple[int, ...]  # index=player_id, value=id of the next player to play
+    dealer_ids: np.ndarray  # (capacity,) int8
+    caller_ids: np.ndarray  # (capacity,) int8
+    call_type_ids: np.ndarray  # (capacity,) int8, index into call_types
+    trump_ids: np.ndarray  # (capacity,) int8
+    flipped_card_ids: np.ndarray  # (capacity,) int8, -1 when no card was flipped
+    play_card_ids: np.ndarray  # (capacity, 20) int8, card ids in play order, -1 after the last play
+    trick_winner_ids: np.ndarray  # (capacity, 5) int8, -1 for tricks not played
+    points: np.ndarray  # (capacity, 2) int8, index=team_id, value=points won
+    size: int = 0
+
+    @staticmethod
+    def create(players: List[Player], next_player_map: Dict[int, Player], capacity: int) -> "RoundStore":
+        next_player_ids = [0] * 5
+        for player_id, next_player in next_player_map.items():
+            next_player_ids[player_id] = next_player.id
+        return RoundStore(
+            players=list(players),
+            next_player_ids=tuple(next_player_ids),
+            dealer_ids=np.zeros(capacity, dtype=np.int8),
+            caller_ids=np.zeros(capacity, dtype=np.int8),
+            call_type_ids=np.zeros(capacity, dtype=np.int8),
+            trump_ids=np.zeros(capacity, dtype=np.int8),
+            flipped_card_ids=np.full(capacity, -1, dtype=np.int8),
+            play_card_ids=np.full((capacity, 4 * TRICK_COUNT), -1, dtype=np.int8),
+            trick_winner_ids=np.full((capacity, TRICK_COUNT), -1, dtype=np.int8),
+            points=np.zeros((capacity, 2), dtype=np.int8),
+        )
+
+    # copies a played round into the next row, doubling the capacity when full
+    def append(self, euchre_round: Round) -> None:
+        if self.size == len(self.dealer_ids):
+            self.grow(max(1, 2 * self.size))
+        row = self.size
+        self.dealer_ids[row] = euchre_round.dealer_id
+        self.caller_ids[row] = euchre_round.call.player_id
+        self.call_type_ids[row] = call_types.index(euchre_round.call.type)
+        self.trump_ids[row] = suit_id_map[euchre_round.call.suit]
+        if euchre_round.flipped_card is not None:
+            self.flipped_card_ids[row] = card_id_map[euchre_round.flipped_card]
+        play_card_ids = self.play_card_ids[row]
+        play_index = 0
+        for trick_index, trick in enumerate(euchre_round.tricks):
+            for play in trick.plays:
+                play_card_ids[play_index] = card_id_map[play.card]
+                play_index += 1
+            self.trick_winner_ids[row, trick_index] = trick.winning_play.player.id
+        for team_id, team in enumerate(teams):
+            self.points[row, team_id] = euchre_round.points_won_map[team]
+        self.size += 1
+
+    def grow(self, capacity: int) -> None:
+        for name in ('dealer_ids', 'caller_ids', 'call_type_ids', 'trump_ids', 'flipped_card_ids', 'play_card_ids',
+                     'trick_winner_ids', 'points'):
+            column = getattr(self, name)
+            grown = np.full((capacity,) + column.shape[1:], -1, dtype=column.dtype)
+            grown[:len(column)] = column
+            setattr(self, name, grown)
+
+    # bytes used per stored round
+    def get_row_bytes(self) -> int:
+        return sum(column.itemsize * (column.size // len(column)) for column in (
+            self.dealer_ids, self.caller_ids, self.call_type_ids, self.trump_ids, self.flipped_card_ids,
+            self.play_card_ids, self.trick_winner_ids, self.points))
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __iter__(self):
+        for index in range(self.size):
+            yield self[index]
+
+    # rebuilds the round at index (round ids start at 1), replaying the stored cards in play order
+    def __getitem__(self, index: int) -> Round:
+        if index < 0:
+            index += self.size
+        if not 0 <= index < self.size:
+            raise IndexError('round index out of range')
+
+        player_id_map = {player.id: player for player in self.players}
+        trump_id = int(self.trump_ids[index])
+        call = Call(suit=suits[trump_id], type=call_types[self.call_type_ids[index]],
+                    player_id=int(self.caller_ids[index]))
+        flipped_card_id = int(self.flipped_card_ids[index])
+        euchre_round = Round(
+            players=self.players,
+            player_id_map=player_id_map,
+            tricks=[],
+            tricks_won_map={team: 0 for team in teams},
+            points_won_map={team: int(self.points[index, team_id]) for team_id, team in enumerate(teams)},
+            flipped_card=euchre_deck[flipped_card_id] if flipped_card_id >= 0 else None,
+            call=call,
+            id=index + 1,
+            dealer_id=int(self.dealer_ids[index]),
+            is_complete=True,
+        )
+
+        play_card_ids = self.play_card_ids[index]
+        play_index = 0
+        leader_id = self.next_player_ids[euchre_round.dealer_id]
+        for trick_index, winner_id in enumerate(self.trick_winner_ids[index]):
+            if winner_id < 0:
+                break
+            trick = Trick(plays=[], winning_play=None, call=call, play_suit=None, id=trick_index + 1,
+                          leader_id=leader_id, is_complete=True)
+            player_id = leader_id
+            for position in range(len(self.players)):
+                card_id = int(play_card_ids[play_index])
+                play_index += 1
+                play = Play(card=euchre_deck[card_id], player=player_id_map[player_id], id=position + 1,
+                            is_lead=position == 0)
+                trick.plays.append(play)
+                if position == 0:
+                    trick.play_suit = suits[effective_suit_table[trump_id][card_id]]
+                if player_id == winner_id:
+                    trick.winning_play = play
+                player_id = self.next_player_ids[player_id]
+            euchre_round.tricks.append(trick)
+            euchre_round.tricks_won_map[player_id_map[int(winner_id)].team] += 1
+            leader_id = int(winner_id)
+        return euchre_round
+
+
+@dataclass(frozen=True, slots=True)
+class BitmaskRoundSetup:
+    player_ids: Tuple[int, ...]  # active players (teammate removed for loners)
+    team_ids: Tuple[int, ...]  # index=player_id, value=team_id
+    fixed_masks: Tuple[int, ...]  # index=player_id, value=mask of pre-assigned cards
+    deal_counts: Tuple[Tuple[int, int], ...]  # (player_id, cards to deal) in dealing order
+    unassigned_card_ids: Tuple[int, ...]  # cards to shuffle each round (fixed flipped card excluded)
+    next_player_ids: Tuple[int, ...]  # index=player_id (1-4), value=next active player_id
+    trick_orders: Tuple[Tuple[int, ...], ...]  # index=leader_id, value=active player_ids in play order
+    eligible_caller_ids: Tuple[int, ...]
+    flipped_card_id: int = -1  # -1 represents a random flipped card
+    dealer_id: int = 0  # 0 represents a random dealer
+    trump_id: int = -1  # -1 represents a random trump suit
+    trump_ids: Tuple[int, ...] = (0, 1, 2, 3)  # suit ids a random trump suit is drawn from
+    caller_id: int = 0  # 0 represents a random caller
+    is_loner: bool = False
+    stop_when_decided: bool = False  # skip the tricks left once the points are decided (tricks_by_player goes partial)
 
 
 @dataclass
@@ -49,6 +425,12 @@ class RoundSimulationRequest:
     call_type: str  # maps to CallTypeEnum
     quantity: int = 0  # number of games to be simulated
     passing_player_names: List[str] = field(default_factory=list)
+    engine: str = ''  # maps to SimulationEngineEnum values, defaults to bitmask
+    seed: int = None  # optional seed for reproducible results
+    target_win_prob_ci: float = None  # optional 95% CI half-width to stop at, quantity becomes a ceiling
+    target_avg_points_ci: float = None  # optional 95% CI half-width to stop at, quantity becomes a ceiling
+    time_budget_ms: int = None  # optional time limit, quantity becomes a ceiling (defaults to the maximum)
+    outputs: List[str] = None  # SimulationOutputEnum values to compute, defaults to the three averages
 
 
 @dataclass
@@ -56,3 +438,122 @@ class RoundSimulationResponse:
     win_prob_map: Dict[str, float]  # key=player_name, value=win_prob
     avg_points_map: Dict[str, float]  # key=player_name, value=avg_points
     avg_tricks_map: Dict[str, float]  # key=player_name, value=avg_tricks
+    rounds_simulated: int = 0
+    rounds_per_sec: float = 0  # 0 when cached, since no rounds were played for this response
+    cached: bool = False  # answered from the simulation cache
+    # only filled in when requested through outputs
+    points_histogram_map: Dict[str, List[float]] = None  # key=team name, value=share of rounds by points (0-4)
+    tricks_histogram_map: Dict[str, List[float]] = None  # key=team name, value=share of rounds by tricks (0-5)
+    win_prob_se_map: Dict[str, float] = None  # key=team name, value=standard error of win_prob
+    avg_points_se_map: Dict[str, float] = None  # key=team name, value=standard error of avg_points
+    avg_tricks_se_map: Dict[str, float] = None  # key=player_name, value=standard error of avg_tricks
+    win_prob_ci_map: Dict[str, List[float]] = None  # key=team name, value=[low, high] 95% confidence interval
+    avg_points_ci_map: Dict[str, List[float]] = None  # key=team name, value=[low, high] 95% confidence interval
+    avg_tricks_ci_map: Dict[str, List[float]] = None  # key=player_name, value=[low, high] 95% confidence interval
+
+
+@dataclass
+class RoundSimulationBatchRequest:
+    scenarios: List[RoundSimulationRequest]
+    quantity: int = None  # rounds per scenario, defaults to the largest scenario quantity
+    seed: int = None
+
+
+@dataclass
+class RoundSimulationBatchResponse:
+    results: List[RoundSimulationResponse]  # in scenario order
+    rounds_simulated: int = 0
+    rounds_per_sec: float = 0
+
+
+@dataclass
+class FlippedCardSweepResponse:
+    overall: RoundSimulationResponse  # every candidate weighted equally, as a random flipped card would be
+    by_flipped_card: Dict[str, RoundSimulationResponse]  # key=flipped card name
+    rounds_simulated: int = 0  # across all candidates
+
+
+@dataclass
+class CallDecisionRequest:
+    player_names: List[str]  # clockwise-ordered list of player names around a table
+    player_hands: List[List[str]]  # clockwise-ordered list of players' hands around a table
+    dealer_name: str
+    flipped_card: str
+    decider_name: str  # player choosing between the options
+    quantity: int = 0  # rounds simulated for every option
+    seed: int = None
+
+
+@dataclass
+class CallOptionResponse:
+    action: str  # 'pass', 'order_up' (or 'pick_up' for the dealer) or 'call'
+    call_type: str  # maps to CallTypeEnum names, None for a pass
+    suit: str  # None for a pass
+    expected_points: float
+    standard_error: float
+
+
+@dataclass
+class CallDecisionResponse:
+    options: List[CallOptionResponse]  # best first
+    rounds_simulated: int = 0
+
+
+@dataclass
+class DiscardDecisionRequest:
+    player_names: List[str]  # clockwise-ordered list of player names around a table
+    player_hands: List[List[str]]  # clockwise-ordered list of players' hands, the dealer's must be complete
+    dealer_name: str
+    flipped_card: str
+    caller_name: str = ''  # player who ordered up, defaults to the dealer
+    call_type: str = 'REGULAR_P1'  # REGULAR_P1 or LONER_P1
+    quantity: int = 0  # rounds simulated for every candidate discard
+    seed: int = None
+
+
+@dataclass
+class DiscardOptionResponse:
+    discard: str  # card name
+    expected_points: float
+    standard_error: float
+
+
+@dataclass
+class DiscardDecisionResponse:
+    options: List[DiscardOptionResponse]  # best first
+    rounds_simulated: int = 0
+
+
+@dataclass
+class SimulationJob:
+    id: str
+    simulation: RoundSimulation
+    status: SimulationJobStatusEnum = SimulationJobStatusEnum.QUEUED
+    totals: RoundTotals = None  # copy of the running totals after the latest chunk
+    cancel_requested: bool = False
+    error: str = None
+    created_time: float = 0
+    start_time: float = None
+    end_time: float = None
+
+
+@dataclass
+class SimulationJobResponse:
+    job_id: str
+    status: str  # maps to SimulationJobStatusEnum values
+    rounds_completed: int = 0
+    quantity: int = 0
+    percent_complete: float = 0
+    rounds_per_sec: float = 0
+    elapsed_seconds: float = 0
+    result: RoundSimulationResponse = None  # aggregates over the rounds completed so far
+    error: str = None
+
+
+@dataclass(frozen=True, slots=True)
+class SuitCanonicalForm:
+    hands: Tuple[Tuple[int, ...], ...]  # per seat, sorted card ids after relabelling suits
+    flipped_card_id: int  # -1 when there is no flipped card
+    call_suit_id: int  # -1 when the call suit is random
+    suit_permutation: Tuple[int, ...]  # index=original suit_id, value=canonical suit_id
+    inverse_permutation: Tuple[int, ...]  # index=canonical suit_id, value=original suit_id
@@ -1 +1,41 @@
+from dtos.SimulationDto import RoundSimulationRequest, SimulationEngineEnum
+from utils.CardUtil import get_card_by_name, get_cards_by_names, get_suit_by_name
+from utils.SuitIsomorphismUtil import canonicalize, suit_permutations, IDENTITY_SUIT_PERMUTATION
 
+
+# builds a hashable key that is equal for requests describing the same scenario
+# hands are sorted, shorthand names are resolved and player names are replaced by seat ids (1-4)
+# suits are relabelled to their canonical form, so e.g. a clubs-trump scenario shares a key with its spades twin,
+# except on seeded runs: a twin draws its cards from the same random streams under other suits, so its totals
+# differ from the seeded run's and only the scenario with the same suits may share its entry
+# the engine, worker count and chunk size are part of the key: engines estimate differently, and on a seeded run
+# the workers and chunks decide how the random streams are split
+# the request must already be validated
+def to_simulation_cache_key(simulation_request: RoundSimulationRequest,
+                            engine: SimulationEngineEnum = SimulationEngineEnum.BITMASK, workers: int = 1,
+                            chunk_size: int = None) -> tuple:
+    seat_id_map = {name: seat_id for seat_id, name in enumerate(simulation_request.player_names, start=1)}
+    canonical_form = canonicalize(
+        [get_cards_by_names(hand) for hand in simulation_request.player_hands],
+        get_card_by_name(simulation_request.flipped_card),
+        get_suit_by_name(simulation_request.call_suit),
+        suit_permutations if simulation_request.seed is None else (IDENTITY_SUIT_PERMUTATION,),
+    )
+    return (
+        canonical_form.hands,
+        canonical_form.flipped_card_id,
+        seat_id_map.get(simulation_request.dealer_name, 0),
+        seat_id_map.get(simulation_request.caller_name, 0),
+        canonical_form.call_suit_id,
+        simulation_request.call_type,
+        tuple(sorted(seat_id_map[name] for name in simulation_request.passing_player_names)),
+        simulation_request.quantity,
+        simulation_request.seed,
+        simulation_request.target_win_prob_ci,
+        simulation_request.target_avg_points_ci,
+        simulation_request.time_budget_ms,
+        tuple(sorted(set(simulation_request.outputs))) if simulation_request.outputs is not None else None,
+        engine,
+        workers,
+        chunk_size,
+    )
@@ -0,0 +1,197 @@
+import random
+from typing import List
+
+from injector import inject
+
+from constants.GameConstants import card_id_map, suit_id_map, card_bits, effective_suit_table, suit_mask_table, \
+    rank_table, teams, HAND_MAX_CARD_COUNT, TRICK_COUNT
+from dtos.BasicDto import Player, Call, Card
+from dtos.SimulationDto import BitmaskRoundSetup, RoundTotals
+from services.CallService import CallService
+from utils.BasicsUtil import create_player_id_map, create_next_player_map
+from utils.CardUtil import mask_card_ids, cards_to_mask
+
+
+class BitmaskRoundService:
+    @inject
+    def __init__(self):
+        pass
+
+    # converts players, call and table state into the integer setup used by play_rounds
+    # players must already exclude the teammate of a loner caller
+    # a discarded card (the dealer's discard after picking up) is out of play like a fixed flipped card
+    @staticmethod
+    def create_setup(players: List[Player], call: Call, flipped_card: Card, dealer_id: int,
+                     passing_player_ids: List[int], discarded_card: Card = None,
+                     stop_when_decided: bool = False) -> BitmaskRoundSetup:
+        player_ids = tuple(player.id for player in players)
+        passing_set = set(passing_player_ids)
+
+        team_ids = [0] * 5
+        fixed_masks = [0] * 5
+        for player in players:
+            team_ids[player.id] = teams.index(player.team)
+            fixed_masks[player.id] = cards_to_mask(player.hand.remaining_cards)
+
+        # cards not assigned to any player, excluding the fixed flipped card if specified
+        assigned_mask = 0
+        for mask in fixed_masks:
+            assigned_mask |= mask
+        if flipped_card is not None:
+            assigned_mask |= card_bits[card_id_map[flipped_card]]
+        if discarded_card is not None:
+            assigned_mask |= card_bits[card_id_map[discarded_card]]
+        unassigned_card_ids = tuple(card_id for card_id in range(len(card_bits))
+                                    if not assigned_mask & card_bits[card_id])
+
+        next_player_map = create_next_player_map(create_player_id_map(players))
+        next_player_ids = [0] * 5
+        for player_id, next_player in next_player_map.items():
+            next_player_ids[player_id] = next_player.id
+
+        trick_orders = [()] * 5
+        for leader_id in player_ids:
+            order = [leader_id]
+            while len(order) < len(player_ids):
+                order.append(next_player_ids[order[-1]])
+            trick_orders[leader_id] = tuple(order)
+
+        return BitmaskRoundSetup(
+            player_ids=player_ids,
+            team_ids=tuple(team_ids),
+            fixed_masks=tuple(fixed_masks),
+            deal_counts=tuple((player.id, HAND_MAX_CARD_COUNT - len(player.hand.remaining_cards))
+                              for player in players),
+            unassigned_card_ids=unassigned_card_ids,
+            next_player_ids=tuple(next_player_ids),
+            trick_orders=tuple(trick_orders),
+            eligible_caller_ids=tuple(pid for pid in player_ids if pid not in passing_set),
+            flipped_card_id=card_id_map[flipped_card] if flipped_card is not None else -1,
+            dealer_id=dealer_id,
+            trump_id=suit_id_map[call.suit] if call is not None and call.suit is not None else -1,
+            trump_ids=tuple(suit_id_map[suit] for suit in CallService.get_possible_trump_suits(call, flipped_card)),
+            caller_id=call.player_id if call is not None else 0,
+            is_loner=call is not None and call.type.is_loner(),
+            stop_when_decided=stop_when_decided,
+        )
+
+    # deals, calls, plays and scores quantity rounds, adding the results to totals
+    # mirrors RoundSimulationService.simulate + RoundService.play_round with integer tables
+    @staticmethod
+    def play_rounds(setup: BitmaskRoundSetup, quantity: int, totals: RoundTotals, rng=random) -> RoundTotals:
+        rand = rng.random
+
+        player_ids = setup.player_ids
+        player_count = len(player_ids)
+        team_ids = setup.team_ids
+        fixed_masks = setup.fixed_masks
+        deal_counts = setup.deal_counts
+        next_player_ids = setup.next_player_ids
+        trick_followers = tuple(order[1:] for order in setup.trick_orders)
+        eligible_caller_ids = setup.eligible_caller_ids
+        eligible_count = len(eligible_caller_ids)
+        fixed_dealer_id = setup.dealer_id
+        fixed_trump_id = setup.trump_id
+        trump_ids = setup.trump_ids
+        trump_count = len(trump_ids)
+        fixed_caller_id = setup.caller_id
+        march_points = 4 if setup.is_loner else 2
+        # the defenders' third trick or the callers' third with a defender trick settles the points
+        stop_when_decided = setup.stop_when_decided
+
+        points = totals.points
+        points_squared = totals.points_squared
+        wins = totals.wins
+        tricks_by_player = totals.tricks_by_player
+        tricks_squared_by_player = totals.tricks_squared_by_player
+        points_histogram = totals.points_histogram
+        tricks_histogram = totals.tricks_histogram
+
+        # partial Fisher-Yates shuffle: deal slot k draws a uniform card from deck[:pos + 1] and swaps it to pos
+        # a random flipped card is never played, so it is simply one of the cards left undealt
+        # the deck restarts in the same order every round so results only depend on the random stream
+        unassigned_card_ids = list(setup.unassigned_card_ids)
+        deck = list(unassigned_card_ids)
+        deal_slots = []
+        pos = len(deck) - 1
+        for player_id, count in deal_counts:
+            for _ in range(count):
+                deal_slots.append((pos, pos + 1, player_id))
+                pos -= 1
+
+        for _ in range(quantity):
+            dealer_id = fixed_dealer_id or player_ids[int(rand() * player_count)]
+
+            # shuffle and deal remaining cards
+            deck[:] = unassigned_card_ids
+            hands = list(fixed_masks)
+            for pos, size, player_id in deal_slots:
+                swap_pos = int(rand() * size)
+                card_id = deck[swap_pos]
+                deck[swap_pos] = deck[pos]
+                deck[pos] = card_id
+                hands[player_id] |= card_bits[card_id]
+
+            # build call for this round
+            trump_id = fixed_trump_id if fixed_trump_id >= 0 else trump_ids[int(rand() * trump_count)]
+            caller_id = fixed_caller_id or eligible_caller_ids[int(rand() * eligible_count)]
+            calling_team_id = team_ids[caller_id]
+            effective_suits = effective_suit_table[trump_id]
+            suit_masks = suit_mask_table[trump_id]
+            ranks = rank_table[trump_id]
+
+            calling_team_tricks = 0
+            round_tricks = [0] * 5
+            leader_id = next_player_ids[dealer_id]
+            for trick_id in range(TRICK_COUNT):
+                # lead any card
+                hand = hands[leader_id]
+                card_ids = mask_card_ids[hand]
+                card_id = card_ids[int(rand() * len(card_ids))]
+                hands[leader_id] = hand ^ card_bits[card_id]
+                play_suit_id = effective_suits[card_id]
+                play_ranks = ranks[play_suit_id]
+                follow_mask = suit_masks[play_suit_id]
+                winning_rank = play_ranks[card_id]
+                winner_id = leader_id
+
+                # follow suit when able
+                for player_id in trick_followers[leader_id]:
+                    hand = hands[player_id]
+                    card_ids = mask_card_ids[hand & follow_mask or hand]
+                    card_id = card_ids[int(rand() * len(card_ids))]
+                    hands[player_id] = hand ^ card_bits[card_id]
+                    if play_ranks[card_id] < winning_rank:
+                        winning_rank = play_ranks[card_id]
+                        winner_id = player_id
+
+                round_tricks[winner_id] += 1
+                if team_ids[winner_id] == calling_team_id:
+                    calling_team_tricks += 1
+                leader_id = winner_id
+                if stop_when_decided:
+                    defending_team_tricks = trick_id + 1 - calling_team_tricks
+                    if defending_team_tricks >= 3 or (calling_team_tricks >= 3 and defending_team_tricks):
+                        break
+
+            # score the round
+            if calling_team_tricks >= 3:
+                team_id = calling_team_id
+                round_points = march_points if calling_team_tricks == TRICK_COUNT else 1
+            else:
+                team_id = 1 - calling_team_id
+                round_points = 2
+            points[team_id] += round_points
+            points_squared[team_id] += round_points * round_points
+            wins[team_id] += 1
+            points_histogram[team_id][round_points] += 1
+            points_histogram[1 - team_id][0] += 1
+            tricks_histogram[calling_team_id][calling_team_tricks] += 1
+            tricks_histogram[1 - calling_team_id][trick_id + 1 - calling_team_tricks] += 1
+            for player_id in player_ids:
+                count = round_tricks[player_id]
+                tricks_by_player[player_id] += count
+                tricks_squared_by_player[player_id] += count * count
+
+        totals.rounds += quantity
+        return totals
@@ -87,20 +87,45 @@ class CallService:
         euchre_round.players.remove(teammate)
         euchre_round.player_id_map = create_player_id_map(euchre_round.players)
 
+    # fills in a random suit (from trump_suits) and caller where the base call leaves them open
     @staticmethod
-    def build_round_call(base_call, player_ids):
+    def build_round_call(base_call, player_ids, trump_suits=suits):
         if base_call is None:
             return Call(
-                suit=random.choice(suits),
+                suit=random.choice(trump_suits),
                 type=CallTypeEnum.REGULAR_P1,
                 player_id=random.choice(player_ids),
             )
-        suit = base_call.suit if base_call.suit is not None else random.choice(suits)
+        suit = base_call.suit if base_call.suit is not None else random.choice(trump_suits)
         player_id = base_call.player_id if base_call.player_id != 0 else random.choice(player_ids)
         if suit == base_call.suit and player_id == base_call.player_id:
             return base_call
         return Call(suit=suit, type=base_call.type, player_id=player_id)
 
+    # suits a call without a suit can name: with a known flipped card, a phase 1 call orders up its suit
+    # and a phase 2 call names any other suit, since the flipped card's suit was turned down
+    @staticmethod
+    def get_possible_trump_suits(call, flipped_card):
+        if call is None or flipped_card is None:
+            return suits
+        if call.type.is_phase_1():
+            return [flipped_card.suit]
+        return [suit for suit in suits if suit != flipped_card.suit]
+
+    # every call the player could make once the flipped card is known:
+    # order up (regular and loner) in phase 1, then each other suit (regular and loner) in phase 2
+    @staticmethod
+    def create_call_options(flipped_card, player_id):
+        calls = [
+            Call(suit=flipped_card.suit, type=CallTypeEnum.REGULAR_P1, player_id=player_id),
+            Call(suit=flipped_card.suit, type=CallTypeEnum.LONER_P1, player_id=player_id),
+        ]
+        for suit in suits:
+            if suit != flipped_card.suit:
+                calls.append(Call(suit=suit, type=CallTypeEnum.REGULAR_P2, player_id=player_id))
+                calls.append(Call(suit=suit, type=CallTypeEnum.LONER_P2, player_id=player_id))
+        return calls
+
     @staticmethod
     def get_random_suit():
         return suit_map[random.randint(0, len(suit_map)-1)]
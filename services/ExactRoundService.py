@@ -0,0 +1,227 @@
+import random
+from typing import List, Tuple
+
+from injector import inject
+
+from constants.GameConstants import card_bits, effective_suit_table, rank_table, TRICK_COUNT
+from dtos.SimulationDto import BitmaskRoundSetup, DealOutcome, RoundTotals
+from utils.CardUtil import mask_card_ids
+
+
+class ExactRoundService:
+    @inject
+    def __init__(self):
+        pass
+
+    # exact outcome distribution of one deal when every player plays a uniformly random legal card
+    # (the play model of PlayService.choose_play), hands: index=player_id, value=mask of the player's cards
+    # states are the owners of the cards left in each suit, best first, with trump first and the off suits sorted,
+    # so states differing only in suit names or in which of two neighbouring cards a player kept are solved once
+    # a player's neighbouring cards are interchangeable plays, so each run of them is one weighted choice
+    @staticmethod
+    def evaluate_deal(setup: BitmaskRoundSetup, hands: List[int], trump_id: int, leader_id: int,
+                      calling_team_id: int) -> DealOutcome:
+        player_count = len(setup.player_ids)
+        team_ids = setup.team_ids
+        trick_orders = setup.trick_orders
+        memo = {}
+
+        # results are (black team trick probabilities, expected tricks by player)
+        no_tricks = ((1.0, 0.0, 0.0, 0.0, 0.0, 0.0), (0.0,) * 5)
+        last_trick_results = {
+            player_id: ((0.0, 1.0, 0.0, 0.0, 0.0, 0.0) if team_ids[player_id] == 0 else no_tricks[0],
+                        tuple(1.0 if index == player_id else 0.0 for index in range(5)))
+            for player_id in setup.player_ids
+        }
+
+        # appends (suit, index of first card, run length) for each run of the player's neighbouring cards,
+        # splitting a run at the trick's best card since only part of it would beat that card
+        def add_runs(owners, player_id, suit_id, choices, split=-1):
+            index = 0
+            count = len(owners)
+            while index < count:
+                if owners[index] == player_id:
+                    end = index + 1
+                    while end < count and owners[end] == player_id and end != split:
+                        end += 1
+                    choices.append((suit_id, index, end - index))
+                    index = end
+                else:
+                    index += 1
+
+        # suits: owners of the cards left per canonical suit (0=trump), best first
+        # position: players already in the current trick, led suit, and the best card so far
+        # (whether it is trump, how many cards left in its suit rank above it, and who played it)
+        def solve(suits, leader, position, lead_suit, best_is_trump, best_index, winner_id):
+            if position == player_count:
+                next_suits = (suits[0], *sorted(suits[1:]))
+                key = (next_suits, winner_id)
+                result = memo.get(key)
+                if result is None:
+                    result = solve(next_suits, winner_id, 0, 0, False, 0, 0)
+                    memo[key] = result
+                trick_probs, tricks_by_player = result
+                if team_ids[winner_id] == 0:
+                    trick_probs = (0.0,) + trick_probs[:-1]
+                tricks_by_player = list(tricks_by_player)
+                tricks_by_player[winner_id] += 1.0
+                return trick_probs, tuple(tricks_by_player)
+
+            if position == 0 and len(suits[0]) + len(suits[1]) + len(suits[2]) + len(suits[3]) == player_count:
+                # one card each: the best trump wins, otherwise the best card of the led suit
+                if suits[0]:
+                    return last_trick_results[suits[0][0]]
+                for suit_id in (1, 2, 3):
+                    if leader in suits[suit_id]:
+                        return last_trick_results[suits[suit_id][0]]
+
+            player_id = trick_orders[leader][position]
+            best_suit = 0 if best_is_trump else lead_suit
+            choices = []
+            if position:
+                add_runs(suits[lead_suit], player_id, lead_suit, choices,
+                         best_index if lead_suit == best_suit else -1)
+            if not choices:
+                for suit_id in range(4):
+                    add_runs(suits[suit_id], player_id, suit_id, choices,
+                             best_index if position and suit_id == best_suit else -1)
+                if not choices:
+                    return no_tricks
+
+            choice_count = 0
+            for choice in choices:
+                choice_count += choice[2]
+            trick_probs = [0.0] * 6
+            tricks_by_player = [0.0] * 5
+            for suit_id, index, run_length in choices:
+                owners = suits[suit_id]
+                next_suits = list(suits)
+                next_suits[suit_id] = owners[:index] + owners[index + 1:]
+                next_suits = tuple(next_suits)
+                if position == 0:
+                    result = solve(next_suits, leader, 1, suit_id, suit_id == 0, index, player_id)
+                elif suit_id == 0 and (not best_is_trump or index < best_index):
+                    result = solve(next_suits, leader, position + 1, lead_suit, True, index, player_id)
+                elif suit_id == lead_suit and not best_is_trump and index < best_index:
+                    result = solve(next_suits, leader, position + 1, lead_suit, False, index, player_id)
+                else:
+                    result = solve(next_suits, leader, position + 1, lead_suit, best_is_trump, best_index,
+                                   winner_id)
+                weight = run_length / choice_count
+                child_trick_probs, child_tricks_by_player = result
+                for tricks in range(6):
+                    trick_probs[tricks] += weight * child_trick_probs[tricks]
+                for slot in range(5):
+                    tricks_by_player[slot] += weight * child_tricks_by_player[slot]
+            return tuple(trick_probs), tuple(tricks_by_player)
+
+        effective_suits = effective_suit_table[trump_id]
+        ranks = rank_table[trump_id]
+        suits = [[] for _ in range(4)]
+        for player_id in setup.player_ids:
+            for card_id in mask_card_ids[hands[player_id]]:
+                suits[effective_suits[card_id]].append((ranks[effective_suits[card_id]][card_id], player_id))
+        owners_by_suit = [tuple(player_id for _, player_id in sorted(cards)) for cards in suits]
+        off_suits = sorted(owners for suit_id, owners in enumerate(owners_by_suit) if suit_id != trump_id)
+        black_trick_probs, tricks_by_player = solve((owners_by_suit[trump_id], *off_suits), leader_id, 0, 0,
+                                                    False, 0, 0)
+
+        # the trick total is the same for every outcome, so the red team's count mirrors the black team's
+        trick_total = len(mask_card_ids[hands[leader_id]])
+        if calling_team_id == 0:
+            calling_trick_probs = black_trick_probs
+        else:
+            calling_trick_probs = tuple(black_trick_probs[trick_total - tricks] if tricks <= trick_total else 0.0
+                                        for tricks in range(6))
+        return DealOutcome(calling_team_trick_probs=calling_trick_probs, expected_tricks_by_player=tricks_by_player)
+
+    # probability the calling team wins, with the expected points of the calling team and of the defenders
+    @staticmethod
+    def get_expected_points(outcome: DealOutcome, is_loner: bool) -> Tuple[float, float, float]:
+        trick_probs = outcome.calling_team_trick_probs
+        march_points = 4 if is_loner else 2
+        win_prob = trick_probs[3] + trick_probs[4] + trick_probs[TRICK_COUNT]
+        calling_points = trick_probs[3] + trick_probs[4] + march_points * trick_probs[TRICK_COUNT]
+        return win_prob, calling_points, 2 * (1 - win_prob)
+
+    # deals, calls and exactly evaluates quantity rounds, adding each deal's expected results to totals
+    # the deals, dealers, trumps and callers are drawn like BitmaskRoundService.play_rounds, but play is averaged
+    # over every possible sequence of random legal cards, so totals hold fractional expected wins and points
+    # points_squared and tricks_squared_by_player sum squared expectations per deal, so standard errors measure
+    # only the deal noise, while the histograms add each deal's outcome probabilities
+    @staticmethod
+    def play_rounds(setup: BitmaskRoundSetup, quantity: int, totals: RoundTotals, rng=random) -> RoundTotals:
+        rand = rng.random
+
+        player_ids = setup.player_ids
+        player_count = len(player_ids)
+        team_ids = setup.team_ids
+        fixed_masks = setup.fixed_masks
+        next_player_ids = setup.next_player_ids
+        eligible_caller_ids = setup.eligible_caller_ids
+        eligible_count = len(eligible_caller_ids)
+
+        points = totals.points
+        points_squared = totals.points_squared
+        wins = totals.wins
+        tricks_by_player = totals.tricks_by_player
+        tricks_squared_by_player = totals.tricks_squared_by_player
+        points_histogram = totals.points_histogram
+        tricks_histogram = totals.tricks_histogram
+        march_points = 4 if setup.is_loner else 2
+
+        # partial Fisher-Yates shuffle, as in BitmaskRoundService.play_rounds
+        unassigned_card_ids = list(setup.unassigned_card_ids)
+        deck = list(unassigned_card_ids)
+        deal_slots = []
+        pos = len(deck) - 1
+        for player_id, count in setup.deal_counts:
+            for _ in range(count):
+                deal_slots.append((pos, pos + 1, player_id))
+                pos -= 1
+
+        for _ in range(quantity):
+            dealer_id = setup.dealer_id or player_ids[int(rand() * player_count)]
+
+            deck[:] = unassigned_card_ids
+            hands = list(fixed_masks)
+            for pos, size, player_id in deal_slots:
+                swap_pos = int(rand() * size)
+                card_id = deck[swap_pos]
+                deck[swap_pos] = deck[pos]
+                deck[pos] = card_id
+                hands[player_id] |= card_bits[card_id]
+
+            trump_id = setup.trump_id if setup.trump_id >= 0 else \
+                setup.trump_ids[int(rand() * len(setup.trump_ids))]
+            caller_id = setup.caller_id or eligible_caller_ids[int(rand() * eligible_count)]
+            calling_team_id = team_ids[caller_id]
+
+            outcome = ExactRoundService.evaluate_deal(setup, hands, trump_id, next_player_ids[dealer_id],
+                                                      calling_team_id)
+            win_prob, calling_points, defending_points = ExactRoundService.get_expected_points(
+                outcome, setup.is_loner)
+
+            wins[calling_team_id] += win_prob
+            wins[1 - calling_team_id] += 1 - win_prob
+            points[calling_team_id] += calling_points
+            points[1 - calling_team_id] += defending_points
+            points_squared[calling_team_id] += calling_points * calling_points
+            points_squared[1 - calling_team_id] += defending_points * defending_points
+            trick_probs = outcome.calling_team_trick_probs
+            calling_points_histogram = points_histogram[calling_team_id]
+            calling_points_histogram[0] += 1 - win_prob
+            calling_points_histogram[1] += trick_probs[3] + trick_probs[4]
+            calling_points_histogram[march_points] += trick_probs[TRICK_COUNT]
+            points_histogram[1 - calling_team_id][0] += win_prob
+            points_histogram[1 - calling_team_id][2] += 1 - win_prob
+            for tricks in range(TRICK_COUNT + 1):
+                tricks_histogram[calling_team_id][tricks] += trick_probs[tricks]
+                tricks_histogram[1 - calling_team_id][TRICK_COUNT - tricks] += trick_probs[tricks]
+            for player_id in player_ids:
+                expected_tricks = outcome.expected_tricks_by_player[player_id]
+                tricks_by_player[player_id] += expected_tricks
+                tricks_squared_by_player[player_id] += expected_tricks * expected_tricks
+
+        totals.rounds += quantity
+        return totals
@@ -9,7 +9,8 @@ class GameService:
     def __init__(self, round_service):
         self.round_service = round_service
 
-    def play_game(self, game):
+    # snapshots, when given, receives a RoundSnapshot of every round as it is played
+    def play_game(self, game, snapshots=None):
         round_id = 1
         dealer_id = game.dealer_start_id
         while not game.is_complete:
@@ -27,7 +28,9 @@ class GameService:
             )
 
             # play the round
-            self.round_service.prepare_and_play_round(euchre_round)
+            snapshot = self.round_service.prepare_and_play_round(euchre_round, snapshots is not None, game.id)
+            if snapshots is not None:
+                snapshots.append(snapshot)
 
             # update game with results of round
             self.update_results(game, euchre_round)
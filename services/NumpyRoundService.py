@@ -0,0 +1,281 @@
+from typing import List
+
+import numpy as np
+from injector import inject
+
+from constants.GameConstants import CARD_COUNT, HAND_MAX_CARD_COUNT, TRICK_COUNT, effective_suit_table, rank_table
+from dtos.SimulationDto import BitmaskRoundSetup, RoundTotals, BlockRandoms
+
+# played or empty hand slots hold EMPTY_CARD_ID, which has no suit and can never win a trick
+EMPTY_CARD_ID = CARD_COUNT
+_NO_SUIT_ID = 4
+_NO_RANK = 99
+
+# EFFECTIVE_SUITS[trump_id, card_id] -> effective suit_id (4 for EMPTY_CARD_ID)
+EFFECTIVE_SUITS = np.full((4, CARD_COUNT + 1), _NO_SUIT_ID, dtype=np.int8)
+EFFECTIVE_SUITS[:, :CARD_COUNT] = effective_suit_table
+
+# RANKS[trump_id, play_suit_id, card_id] -> rank (lower wins, _NO_RANK for EMPTY_CARD_ID)
+RANKS = np.full((4, 4, CARD_COUNT + 1), _NO_RANK, dtype=np.int8)
+RANKS[:, :, :CARD_COUNT] = rank_table
+
+
+class NumpyRoundService:
+    DEFAULT_BLOCK_SIZE = 65_536
+    BATCH_BLOCK_SIZE = 16_384  # every scenario of a batch plays one block before the next is drawn
+
+    @inject
+    def __init__(self):
+        pass
+
+    # plays quantity rounds in blocks of block_size rounds, adding the results to totals
+    def play_rounds(self, setup: BitmaskRoundSetup, quantity: int, totals: RoundTotals,
+                    rng: np.random.Generator = None, block_size: int = DEFAULT_BLOCK_SIZE) -> RoundTotals:
+        if rng is None:
+            rng = np.random.default_rng()
+        remaining = quantity
+        while remaining > 0:
+            block = min(block_size, remaining)
+            self.play_block(setup, block, totals, rng)
+            remaining -= block
+        return totals
+
+    # plays quantity rounds of every scenario against the same random draws (common random numbers)
+    # so differences between scenarios are not drowned out by differences between their deals
+    def play_batch(self, setups: List[BitmaskRoundSetup], quantity: int, totals_list: List[RoundTotals],
+                   rng: np.random.Generator = None, block_size: int = BATCH_BLOCK_SIZE) -> List[RoundTotals]:
+        if rng is None:
+            rng = np.random.default_rng()
+        remaining = quantity
+        while remaining > 0:
+            block = min(block_size, remaining)
+            randoms = self.draw_block_randoms(block, rng)
+            for setup, totals in zip(setups, totals_list):
+                self.play_block_with_randoms(setup, randoms, totals)
+            remaining -= block
+        return totals_list
+
+    # plays quantity rounds with variance reduction, adding the results to totals:
+    # - every combination of random dealer, trump and caller (the strata) is played in turn, so each gets the same
+    #   number of rounds (give or take one per call) instead of a sampled share
+    # - rounds come in antithetic pairs: the twin deals the same deck with the dealt cards of opposite-team seats
+    #   swapped, and shares the play keys, so team results of a pair are negatively correlated
+    # both keep every round's distribution unchanged, so means stay unbiased
+    def play_rounds_stratified(self, setup: BitmaskRoundSetup, quantity: int, totals: RoundTotals,
+                               rng: np.random.Generator = None, block_size: int = BATCH_BLOCK_SIZE) -> RoundTotals:
+        if rng is None:
+            rng = np.random.default_rng()
+        strata = self.get_strata_draws(setup)
+        twin_positions = self.get_antithetic_positions(setup)
+        # whole sets of paired strata per block, so only the last block can be cut short
+        set_size = 2 * len(strata)
+        block_size = max(set_size, block_size // set_size * set_size)
+        remaining = quantity
+        while remaining > 0:
+            block = min(block_size, remaining)
+            randoms = self.draw_stratified_randoms(setup, strata, twin_positions, block, rng)
+            self.play_block_with_randoms(setup, randoms, totals)
+            remaining -= block
+        return totals
+
+    # one row per stratum: (dealer, trump, caller) draws that pick each combination of the random choices exactly
+    @staticmethod
+    def get_strata_draws(setup: BitmaskRoundSetup) -> np.ndarray:
+        dealer_count = 1 if setup.dealer_id else len(setup.player_ids)
+        trump_count = 1 if setup.trump_id >= 0 else len(setup.trump_ids)
+        caller_count = 1 if setup.caller_id else len(setup.eligible_caller_ids)
+        grid = np.stack(np.meshgrid(np.arange(dealer_count), np.arange(trump_count), np.arange(caller_count),
+                                    indexing='ij'), axis=-1).reshape(-1, 3)
+        # draws at the middle of each choice's interval, since choices are picked with int(draw * count)
+        return (grid + 0.5) / np.array([dealer_count, trump_count, caller_count])
+
+    # twin deck position -> original deck position, swapping the dealt cards of opposite-team seats that are
+    # dealt the same number of cards (their dealt cards are exchangeable, so the twin deal is still uniform)
+    @staticmethod
+    def get_antithetic_positions(setup: BitmaskRoundSetup) -> np.ndarray:
+        positions = np.arange(len(setup.unassigned_card_ids))
+        starts = {}
+        card_index = 0
+        for player_id, count in setup.deal_counts:
+            starts[player_id] = card_index
+            card_index += count
+        counts = dict(setup.deal_counts)
+        for count in set(counts.values()):
+            if count == 0:
+                continue
+            seats = [player_id for player_id, _ in setup.deal_counts if counts[player_id] == count]
+            black_seats = [player_id for player_id in seats if setup.team_ids[player_id] == 0]
+            red_seats = [player_id for player_id in seats if setup.team_ids[player_id] == 1]
+            for black_id, red_id in zip(black_seats, red_seats):
+                black_slice = slice(starts[black_id], starts[black_id] + count)
+                red_slice = slice(starts[red_id], starts[red_id] + count)
+                positions[black_slice], positions[red_slice] = positions[red_slice].copy(), positions[black_slice].copy()
+        return positions
+
+    # fresh rounds interleaved with their antithetic twins, each pair assigned to the next stratum in turn
+    # the strata start at a random offset, so a block cut short of whole sets still weights every stratum equally
+    # without any seats to swap a twin would repeat its round, so every round is drawn fresh instead
+    def draw_stratified_randoms(self, setup: BitmaskRoundSetup, strata: np.ndarray, twin_positions: np.ndarray,
+                                size: int, rng: np.random.Generator) -> BlockRandoms:
+        offset = rng.integers(len(strata))
+        if np.array_equal(twin_positions, np.arange(len(twin_positions))):
+            randoms = self.draw_block_randoms(size, rng)
+            stratum_draws = strata[(offset + np.arange(size)) % len(strata)]
+            return BlockRandoms(randoms.deal_keys, *stratum_draws.T, play_keys=randoms.play_keys)
+
+        pair_count = -(-size // 2)
+        randoms = self.draw_block_randoms(pair_count, rng)
+        stratum_draws = np.repeat(strata[(offset + np.arange(pair_count)) % len(strata)], 2, axis=0)[:size]
+
+        # the twin's deal keys put the card from original position twin_positions[j] at position j
+        unassigned = np.array(setup.unassigned_card_ids)
+        unassigned_keys = randoms.deal_keys[:, unassigned]
+        order = np.argsort(unassigned_keys, axis=1)
+        twin_deal_keys = randoms.deal_keys.copy()
+        twin_deal_keys[np.arange(pair_count)[:, None], unassigned[order[:, twin_positions]]] = \
+            np.take_along_axis(unassigned_keys, order, axis=1)
+
+        return BlockRandoms(
+            deal_keys=np.stack([randoms.deal_keys, twin_deal_keys], axis=1).reshape(2 * pair_count, -1)[:size],
+            dealer_draws=stratum_draws[:, 0],
+            trump_draws=stratum_draws[:, 1],
+            caller_draws=stratum_draws[:, 2],
+            play_keys=np.repeat(randoms.play_keys, 2, axis=0)[:size],
+        )
+
+    # a single scenario draws its play keys per hand slot as it goes, which is cheaper than keying every card
+    @staticmethod
+    def play_block(setup: BitmaskRoundSetup, size: int, totals: RoundTotals, rng: np.random.Generator) -> None:
+        randoms = NumpyRoundService.draw_block_randoms(size, rng, shared_play_keys=False)
+        NumpyRoundService.play_block_with_randoms(setup, randoms, totals, rng)
+
+    # every random number a block of rounds can use, indexed by card id rather than by deal or hand position
+    # so scenarios with different hands, callers or suits still share the draws for the cards they have in common
+    @staticmethod
+    def draw_block_randoms(size: int, rng: np.random.Generator, shared_play_keys: bool = True) -> BlockRandoms:
+        return BlockRandoms(
+            deal_keys=rng.random((size, CARD_COUNT)),
+            dealer_draws=rng.random(size),
+            trump_draws=rng.random(size),
+            caller_draws=rng.random(size),
+            play_keys=rng.random((size, TRICK_COUNT, CARD_COUNT + 1), dtype=np.float32) if shared_play_keys else None,
+        )
+
+    # deals, calls, plays and scores a block of rounds as arrays (one row per round)
+    # mirrors BitmaskRoundService.play_rounds: uniform random legal plays, same dealing and call rules
+    # without shared play keys, play choices draw from rng instead
+    @staticmethod
+    def play_block_with_randoms(setup: BitmaskRoundSetup, randoms: BlockRandoms, totals: RoundTotals,
+                                rng: np.random.Generator = None) -> None:
+        size = len(randoms.dealer_draws)
+        rows = np.arange(size)
+        player_ids = np.array(setup.player_ids)
+        team_ids = np.array(setup.team_ids)
+
+        # hands[round, player_id, slot] -> card_id (index 0 unused, absent players hold only empty slots)
+        hands = np.full((size, 5, HAND_MAX_CARD_COUNT), EMPTY_CARD_ID, dtype=np.int8)
+
+        # shuffle and deal remaining cards (a random flipped card is one of the undealt cards)
+        unassigned = np.array(setup.unassigned_card_ids, dtype=np.int8)
+        deck = unassigned[np.argsort(randoms.deal_keys[:, unassigned], axis=1)]
+        card_index = 0
+        for player_id, count in setup.deal_counts:
+            fixed = [card_id for card_id in range(CARD_COUNT) if setup.fixed_masks[player_id] >> card_id & 1]
+            hands[:, player_id, :len(fixed)] = fixed
+            hands[:, player_id, len(fixed):] = deck[:, card_index:card_index + count]
+            card_index += count
+
+        # dealer and call for each round
+        if setup.dealer_id:
+            dealer_ids = np.full(size, setup.dealer_id)
+        else:
+            dealer_ids = player_ids[(randoms.dealer_draws * len(player_ids)).astype(np.int64)]
+        if setup.trump_id >= 0:
+            trump_ids = np.full(size, setup.trump_id)
+        else:
+            trump_ids = np.array(setup.trump_ids)[(randoms.trump_draws * len(setup.trump_ids)).astype(np.int64)]
+        if setup.caller_id:
+            caller_ids = np.full(size, setup.caller_id)
+        else:
+            eligible_caller_ids = np.array(setup.eligible_caller_ids)
+            caller_ids = eligible_caller_ids[(randoms.caller_draws * len(eligible_caller_ids)).astype(np.int64)]
+        calling_team_ids = team_ids[caller_ids]
+
+        # trick_orders[leader_id, position] -> player_id
+        trick_orders = np.zeros((5, len(setup.player_ids)), dtype=np.int64)
+        for leader_id in setup.player_ids:
+            trick_orders[leader_id] = setup.trick_orders[leader_id]
+        effective_suits = EFFECTIVE_SUITS[trump_ids]  # (size, 25)
+        ranks = RANKS[trump_ids]  # (size, 4, 25)
+
+        next_player_ids = np.array(setup.next_player_ids)
+        leader_ids = next_player_ids[dealer_ids]
+        calling_team_tricks = np.zeros(size, dtype=np.int64)
+        round_tricks = np.zeros((size, 5), dtype=np.int64)  # [round, player_id] -> tricks won
+        for trick in range(TRICK_COUNT):
+            trick_keys = randoms.play_keys[:, trick] if randoms.play_keys is not None else None  # (size, 25)
+            winner_ids = leader_ids
+            for position in range(len(setup.player_ids)):
+                player_ids_at = trick_orders[leader_ids, position]
+                hand = hands[rows, player_ids_at]  # (size, 5)
+                playable = hand != EMPTY_CARD_ID
+                if position > 0:
+                    # follow suit when able
+                    following = np.take_along_axis(effective_suits, hand.astype(np.int64), axis=1) \
+                        == play_suit_ids[:, None]
+                    playable = np.where(following.any(axis=1)[:, None], following, playable)
+
+                # uniform choice among playable slots
+                if trick_keys is None:
+                    keys = rng.random(hand.shape)
+                else:
+                    keys = np.take_along_axis(trick_keys, hand.astype(np.int64), axis=1)
+                keys[~playable] = -1.0
+                slots = keys.argmax(axis=1)
+                card_ids = hand[rows, slots].astype(np.int64)
+                hands[rows, player_ids_at, slots] = EMPTY_CARD_ID
+
+                if position == 0:
+                    play_suit_ids = effective_suits[rows, card_ids]
+                    winning_ranks = ranks[rows, play_suit_ids, card_ids]
+                else:
+                    card_ranks = ranks[rows, play_suit_ids, card_ids]
+                    better = card_ranks < winning_ranks
+                    winning_ranks = np.where(better, card_ranks, winning_ranks)
+                    winner_ids = np.where(better, player_ids_at, winner_ids)
+
+            round_tricks[rows, winner_ids] += 1
+            calling_team_tricks += team_ids[winner_ids] == calling_team_ids
+            leader_ids = winner_ids
+
+        # score the rounds
+        march_points = 4 if setup.is_loner else 2
+        calling_team_won = calling_team_tricks >= 3
+        winning_team_ids = np.where(calling_team_won, calling_team_ids, 1 - calling_team_ids)
+        round_points = np.where(calling_team_won, np.where(calling_team_tricks == TRICK_COUNT, march_points, 1), 2)
+        points = np.bincount(winning_team_ids, weights=round_points, minlength=2)
+        points_squared = np.bincount(winning_team_ids, weights=round_points * round_points, minlength=2)
+        wins = np.bincount(winning_team_ids, minlength=2)
+        tricks_by_player = round_tricks.sum(axis=0)
+        tricks_squared_by_player = (round_tricks * round_tricks).sum(axis=0)
+
+        # histogram rows: the winners' round points (the losers score 0) and each team's tricks
+        black_points = np.where(winning_team_ids == 0, round_points, 0)
+        red_points = np.where(winning_team_ids == 1, round_points, 0)
+        black_tricks = np.where(calling_team_ids == 0, calling_team_tricks, TRICK_COUNT - calling_team_tricks)
+        points_histogram = (np.bincount(black_points, minlength=5), np.bincount(red_points, minlength=5))
+        tricks_histogram = (np.bincount(black_tricks, minlength=6),
+                            np.bincount(TRICK_COUNT - black_tricks, minlength=6))
+
+        for team_id in range(2):
+            totals.points[team_id] += int(points[team_id])
+            totals.points_squared[team_id] += int(points_squared[team_id])
+            totals.wins[team_id] += int(wins[team_id])
+            for points_won in range(5):
+                totals.points_histogram[team_id][points_won] += int(points_histogram[team_id][points_won])
+            for tricks_won in range(6):
+                totals.tricks_histogram[team_id][tricks_won] += int(tricks_histogram[team_id][tricks_won])
+        for player_id in range(5):
+            totals.tricks_by_player[player_id] += int(tricks_by_player[player_id])
+            totals.tricks_squared_by_player[player_id] += int(tricks_squared_by_player[player_id])
+        totals.rounds += size
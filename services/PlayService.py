@@ -12,15 +12,22 @@ class PlayService:
 
     # randomly determines a card to play and updates the play object
     # follows the general rules of play (i.e. respects play suit)
+    # a matching list is reused for the cards able to follow suit instead of allocating one
     @staticmethod
-    def choose_play(play, trump_suit, play_suit):
+    def choose_play(play, trump_suit, play_suit, matching=None):
         player_cards = play.player.hand.remaining_cards
 
         if play.is_lead:
             idx = random.randrange(len(player_cards))
         else:
-            matching = [i for i, c in enumerate(player_cards)
-                        if get_effective_suit(c, trump_suit) == play_suit]
+            if matching is None:
+                matching = [i for i, c in enumerate(player_cards)
+                            if get_effective_suit(c, trump_suit) == play_suit]
+            else:
+                matching.clear()
+                for i, c in enumerate(player_cards):
+                    if get_effective_suit(c, trump_suit) == play_suit:
+                        matching.append(i)
             idx = random.choice(matching) if matching else random.randrange(len(player_cards))
 
         play.card = player_cards.pop(idx)
@@ -1,15 +1,40 @@
-import collections
 import csv
 import logging
 from os.path import isfile
+from typing import Dict
 
+import numpy as np
 from injector import inject
 
-from constants.GameConstants import trump_and_play_suit_hierarchy
-from utils.CardUtil import get_card_rank_by_trump_suit, create_card_name
+from constants.GameConstants import trump_and_play_suit_hierarchy, card_id_map, suit_id_map, suit_name_map, \
+    euchre_deck_map, card_rank_table, CARD_RANK_COUNT
+from dtos.BasicDto import CallTypeEnum
+from dtos.SimulationDto import call_types, CardWinTotals
+from utils.CardUtil import get_card_rank_by_trump_suit
+from utils.PlayLog import PLAY_RECORD_DTYPE, PlayLogWriter, read_play_log
 
 logger = logging.getLogger(__name__)
 
+PLAY_CSV_HEADERS = [
+    'game_id',
+    'round_id',
+    'trick_id',
+    'dealer_name',
+    'caller_name',
+    'call_type',
+    'trump_suit',
+    'player_name',
+    'play_id',
+    'play_card_value',
+    'play_card_suit',
+    'play_card_rank',
+    'card_rank',
+    'trick_winner'
+]
+CSV_CONVERSION_BATCH_SIZE = 100_000
+PLAY_LOG_SCAN_CHUNK_SIZE = 10_000_000  # plays aggregated per step when scanning a play log
+CARD_RANKS = np.array(card_rank_table, dtype=np.int64)  # [trump_id, card_id] -> card rank for the trump suit
+
 
 class RecordService:
     @inject
@@ -21,26 +46,16 @@ class RecordService:
     def record_games(games, csv_file):
         logger.info('recording %s games to csv %s', len(games), csv_file)
 
-        headers = [
-            'game_id',
-            'round_id',
-            'trick_id',
-            'dealer_name',
-            'caller_name',
-            'call_type',
-            'trump_suit',
-            'player_name',
-            'play_id',
-            'play_card_value',
-            'play_card_suit',
-            'play_card_rank',
-            'card_rank',
-            'trick_winner'
-        ]
-
         rows = RecordService.generate_rows_to_write(games)
 
-        RecordService.write_rows(csv_file, rows, headers)
+        RecordService.write_rows(csv_file, rows, PLAY_CSV_HEADERS)
+
+    # appends one binary record per play (see utils.PlayLog), the binary counterpart of record_games
+    @staticmethod
+    def record_games_to_log(games, writer: PlayLogWriter):
+        records = RecordService.generate_play_records(games)
+        logger.info('recording %s games (%s plays) to play log %s', len(games), len(records), writer.log_file)
+        writer.write(records)
 
     @staticmethod
     def write_rows(csv_file, rows, headers):
@@ -104,35 +119,121 @@ class RecordService:
                         rows.append(row)
         return rows
 
+    # the rows of generate_rows_to_write as PLAY_RECORD_DTYPE records, with player, card and suit ids
+    # card_rank is looked up for all plays at once from their trump and card ids
     @staticmethod
-    def update_card_win_probabilities(games, card_rank_wins_map=None):
-
-        if card_rank_wins_map is None:
-            card_rank_wins_map = {}
-        logger.info('updating win probabilities')
-
+    def generate_play_records(games) -> np.ndarray:
+        rows = []
         for game in games:
-            for round_ in game.rounds:
-                for trick in round_.tricks:
+            for euchre_round in game.rounds:
+                for trick in euchre_round.tricks:
+                    call_type_id = call_types.index(trick.call.type)
+                    trump_id = suit_id_map[trick.call.suit]
+                    rank_map = trump_and_play_suit_hierarchy[trick.call.suit][trick.play_suit]
                     for play in trick.plays:
-                        card_rank = get_card_rank_by_trump_suit(play.card, trick.call.suit)
-
-                        if card_rank not in card_rank_wins_map:
-                            win_map = {'wins': 0, 'plays': 0, 'win_prob': 0.0}
-                            card_rank_wins_map[card_rank] = win_map
-
-                        win_map = card_rank_wins_map[card_rank]
-                        win_map['plays'] += 1
-
-                        if trick.winning_play.card == play.card:
-                            win_map['wins'] += 1
+                        rows.append((
+                            game.id,
+                            euchre_round.id,
+                            trick.id,
+                            euchre_round.dealer_id,
+                            trick.call.player_id,
+                            call_type_id,
+                            trump_id,
+                            play.player.id,
+                            play.id,
+                            card_id_map[play.card],
+                            rank_map[play.card],
+                            0,
+                            trick.winning_play.player.id,
+                            0,
+                        ))
+        records = np.array(rows, dtype=PLAY_RECORD_DTYPE)
+        records['card_rank'] = CARD_RANKS[records['trump_id'], records['card_id']]
+        return records
+
+    # converts a record_games csv into a binary play log, streaming the csv in batches
+    # without player_names, players are numbered from 1 in the order their names first appear in the csv,
+    # and every player must appear in the first batch
+    @staticmethod
+    def convert_csv_to_play_log(csv_file, log_file, player_names: Dict[int, str] = None,
+                                batch_size: int = CSV_CONVERSION_BATCH_SIZE) -> int:
+        player_ids = {name: player_id for player_id, name in (player_names or {}).items()}
+        writer = None
+        records_written = 0
+
+        def get_player_id(name):
+            if name not in player_ids:
+                if writer is not None:
+                    raise ValueError(f'player {name} first appears after the play log header was written, '
+                                     f'pass player_names to convert this csv')
+                player_ids[name] = len(player_ids) + 1
+            return player_ids[name]
+
+        try:
+            with open(csv_file, newline='') as f:
+                reader = csv.reader(f)
+                if next(reader, None) != PLAY_CSV_HEADERS:
+                    raise ValueError(f'{csv_file} does not have the record_games csv headers')
+                batch = []
+                for row in reader:
+                    batch.append(RecordService.csv_row_to_record(row, get_player_id))
+                    if len(batch) >= batch_size:
+                        writer = writer or PlayLogWriter(log_file, {pid: name for name, pid in player_ids.items()})
+                        writer.write(np.array(batch, dtype=PLAY_RECORD_DTYPE))
+                        records_written += len(batch)
+                        batch = []
+                writer = writer or PlayLogWriter(log_file, {pid: name for name, pid in player_ids.items()})
+                writer.write(np.array(batch, dtype=PLAY_RECORD_DTYPE))
+                records_written += len(batch)
+        finally:
+            if writer is not None:
+                writer.close()
+
+        logger.info('converted %s plays from csv %s to play log %s', records_written, csv_file, log_file)
+        return records_written
 
-                        win_map['win_prob'] = round(win_map['wins'] / win_map['plays'], 2)
+    @staticmethod
+    def csv_row_to_record(row, get_player_id) -> tuple:
+        (game_id, round_id, trick_id, dealer_name, caller_name, call_type, trump_suit, player_name, play_id,
+         play_card_value, play_card_suit, play_card_rank, card_rank, trick_winner) = row
+        card = euchre_deck_map[f'{play_card_value.lower()}_of_{play_card_suit.lower()}']
+        return (
+            int(game_id),
+            int(round_id),
+            int(trick_id),
+            get_player_id(dealer_name),
+            get_player_id(caller_name),
+            call_types.index(CallTypeEnum[call_type]),
+            suit_id_map[suit_name_map[trump_suit.lower()]],
+            get_player_id(player_name),
+            int(play_id),
+            card_id_map[card],
+            int(play_card_rank),
+            int(card_rank),
+            get_player_id(trick_winner),
+            0,
+        )
+
+    # counts plays and trick wins by card rank from arrays of trump ids, card ids and whether the play won
+    @staticmethod
+    def update_card_win_totals(totals: CardWinTotals, trump_ids: np.ndarray, card_ids: np.ndarray,
+                               won: np.ndarray) -> None:
+        card_ranks = CARD_RANKS[trump_ids, card_ids]
+        totals.plays += np.bincount(card_ranks, minlength=CARD_RANK_COUNT + 1)
+        totals.wins += np.bincount(card_ranks[won], minlength=CARD_RANK_COUNT + 1)
 
+    # scans a play log of any size in fixed chunks of its memory map
     @staticmethod
-    def output_card_win_probabilities(csv_file, card_rank_wins_map):
-        ordered_card_rank_wins_map = collections.OrderedDict(sorted(card_rank_wins_map.items()))
+    def update_card_win_totals_from_log(totals: CardWinTotals, log_file,
+                                        chunk_size: int = PLAY_LOG_SCAN_CHUNK_SIZE) -> None:
+        _, records = read_play_log(log_file)
+        for start in range(0, len(records), chunk_size):
+            chunk = records[start:start + chunk_size]
+            RecordService.update_card_win_totals(totals, chunk['trump_id'], chunk['card_id'],
+                                                 chunk['player_id'] == chunk['winner_id'])
 
+    @staticmethod
+    def output_card_win_probabilities(csv_file, totals: CardWinTotals):
         headers = [
             'card_rank',
             'wins',
@@ -141,14 +242,11 @@ class RecordService:
         ]
 
         rows = []
-        for key, value in ordered_card_rank_wins_map.items():
-            row = [
-                key,
-                value['wins'],
-                value['plays'],
-                value['win_prob']
-            ]
-            rows.append(row)
+        for card_rank in range(1, len(totals.plays)):
+            plays = int(totals.plays[card_rank])
+            if plays:
+                wins = int(totals.wins[card_rank])
+                rows.append([card_rank, wins, plays, round(wins / plays, 2)])
 
         RecordService.write_rows(csv_file, rows, headers)
 
@@ -177,11 +275,11 @@ class RecordService:
                         game.id,
                         euchre_round.id,
                         player.name,
-                        create_card_name(player.hand.starting_cards[0]),
-                        create_card_name(player.hand.starting_cards[1]),
-                        create_card_name(player.hand.starting_cards[2]),
-                        create_card_name(player.hand.starting_cards[3]),
-                        create_card_name(player.hand.starting_cards[4]),
+                        str(player.hand.starting_cards[0]),
+                        str(player.hand.starting_cards[1]),
+                        str(player.hand.starting_cards[2]),
+                        str(player.hand.starting_cards[3]),
+                        str(player.hand.starting_cards[4]),
                     ]
                     rows.append(row)
 
@@ -1,7 +1,8 @@
 from injector import inject
 
-from constants.GameConstants import euchre_deck
-from dtos.BasicDto import Trick, CallTypeEnum
+from constants.GameConstants import euchre_deck, teams, card_id_map, suit_id_map, HAND_MAX_CARD_COUNT
+from dtos.BasicDto import Trick, CallTypeEnum, Round, Play
+from dtos.SimulationDto import RoundPool, RoundSnapshot, call_types
 from utils.BasicsUtil import get_next_player, get_opposing_team
 
 
@@ -13,42 +14,128 @@ class RoundService:
         self.call_service = call_service
         self.shuffle_service = shuffle_service
 
-    def prepare_and_play_round(self, euchre_round):
+    # returns a snapshot of the played round when requested
+    def prepare_and_play_round(self, euchre_round, capture_snapshot=False, game_id=0):
         cards = list(euchre_deck)
         self.shuffle_service.shuffle_cards(cards)
         self.dealing_service.deal_cards(euchre_round.players, cards)
         euchre_round.flipped_card = cards[20]
+        if not capture_snapshot:
+            self.call_service.update_call(euchre_round)
+            self.play_round(euchre_round)
+            return None
+
+        # the dealt hands are copied before the call, which removes a loner's teammate from the round
+        # and swaps one of the dealer's cards for the flipped card on a pick up
+        dealer = euchre_round.player_id_map[euchre_round.dealer_id]
+        dealt_hands = {player.id: list(player.hand.remaining_cards) for player in euchre_round.players}
         self.call_service.update_call(euchre_round)
+        discarded_card = next((card for card in dealt_hands[dealer.id] if card not in dealer.hand.remaining_cards),
+                              None)
         self.play_round(euchre_round)
+        return self.create_snapshot(euchre_round, dealt_hands, discarded_card, game_id)
+
+    # copies the round into card and player ids
+    # dealt_hands: key=player_id, value=cards dealt to the player, discarded_card: the dealer's discard if any
+    @staticmethod
+    def create_snapshot(euchre_round, dealt_hands, discarded_card=None, game_id=0) -> RoundSnapshot:
+        starting_hands = [()] * 5
+        for player_id, cards in dealt_hands.items():
+            starting_hands[player_id] = tuple(card_id_map[card] for card in cards)
+        return RoundSnapshot(
+            game_id=game_id,
+            round_id=euchre_round.id,
+            dealer_id=euchre_round.dealer_id,
+            caller_id=euchre_round.call.player_id,
+            call_type_id=call_types.index(euchre_round.call.type),
+            trump_id=suit_id_map[euchre_round.call.suit],
+            flipped_card_id=card_id_map[euchre_round.flipped_card] if euchre_round.flipped_card is not None else -1,
+            starting_hands=tuple(starting_hands),
+            play_card_ids=tuple(card_id_map[play.card] for trick in euchre_round.tricks for play in trick.plays),
+            trick_winner_ids=tuple(trick.winning_play.player.id for trick in euchre_round.tricks),
+            points=tuple(euchre_round.points_won_map[team] for team in teams),
+            discarded_card_id=card_id_map[discarded_card] if discarded_card is not None else -1,
+        )
 
     # plays the round assuming cards are dealt and a call is made
-    def play_round(self, euchre_round, next_player_map=None):
+    # with stop_when_decided the round ends as soon as its points can no longer change,
+    # so its tricks (and tricks_won_map) only cover the tricks actually played
+    # with a pool the round must be pool.round, and its tricks and plays are reused from the pool
+    def play_round(self, euchre_round, next_player_map=None, stop_when_decided=False, pool: RoundPool = None):
         if next_player_map is None:
             next_player_map = {}
             for pid in euchre_round.player_id_map:
                 next_player_map[pid] = get_next_player(euchre_round.player_id_map, pid)
         leader_id = next_player_map[euchre_round.dealer_id].id
-        trick = Trick(
-            plays=[],
-            winning_play=None,
-            call=euchre_round.call,
-            play_suit=None,
-            id=1,
-            leader_id=leader_id
-        )
+        if pool is None:
+            trick = Trick(
+                plays=[],
+                winning_play=None,
+                call=euchre_round.call,
+                play_suit=None,
+                id=1,
+                leader_id=leader_id
+            )
+        else:
+            trick = self.trick_service.reset_trick(pool.tricks[0], euchre_round.call, 1, leader_id)
         while not euchre_round.is_complete:
             # play trick
-            self.trick_service.play_trick(trick, euchre_round.player_id_map, next_player_map)
+            if pool is None:
+                self.trick_service.play_trick(trick, euchre_round.player_id_map, next_player_map)
+            else:
+                self.trick_service.play_trick(trick, euchre_round.player_id_map, next_player_map,
+                                              pool.plays[trick.id - 1], pool.matching)
 
             # update round
             self.update_round_with_trick(euchre_round, trick)
+            if stop_when_decided and self.is_points_decided(euchre_round):
+                euchre_round.is_complete = True
 
             # prepare next trick
-            leader_id = trick.winning_play.player.id
-            trick = Trick([], None, euchre_round.call, None, trick.id + 1, leader_id)
+            if not euchre_round.is_complete:
+                leader_id = trick.winning_play.player.id
+                if pool is None:
+                    trick = Trick([], None, euchre_round.call, None, trick.id + 1, leader_id)
+                else:
+                    trick = self.trick_service.reset_trick(pool.tricks[trick.id], euchre_round.call, trick.id + 1,
+                                                           leader_id)
 
         self.update_team_points_won(euchre_round)
 
+    # allocates one round with every trick and play it can need, for play_round to reuse
+    @staticmethod
+    def create_round_pool(players, player_id_map) -> RoundPool:
+        euchre_round = Round(
+            players=players,
+            player_id_map=player_id_map,
+            tricks=[],
+            tricks_won_map={team: 0 for team in teams},
+            points_won_map={team: 0 for team in teams},
+            flipped_card=None,
+            call=None,
+        )
+        return RoundPool(
+            round=euchre_round,
+            tricks=[Trick([], None, None, None) for _ in range(HAND_MAX_CARD_COUNT)],
+            plays=[[Play(None, None) for _ in players] for _ in range(HAND_MAX_CARD_COUNT)],
+            matching=[],
+        )
+
+    # clears the pooled round for the next deal, as a freshly built Round would be
+    @staticmethod
+    def reset_round(pool: RoundPool, flipped_card, call, round_id: int, dealer_id: int) -> Round:
+        euchre_round = pool.round
+        euchre_round.tricks.clear()
+        for team in teams:
+            euchre_round.tricks_won_map[team] = 0
+            euchre_round.points_won_map[team] = 0
+        euchre_round.flipped_card = flipped_card
+        euchre_round.call = call
+        euchre_round.id = round_id
+        euchre_round.dealer_id = dealer_id
+        euchre_round.is_complete = False
+        return euchre_round
+
     # update round values based on completed trick
     @staticmethod
     def update_round_with_trick(euchre_round, trick):
@@ -62,6 +149,15 @@ class RoundService:
         # add 1 trick to the winning team's score
         euchre_round.tricks_won_map[trick.winning_play.player.team] += 1
 
+    # true once the remaining tricks cannot change update_team_points_won: the defenders have a euchre,
+    # or the callers have their point and a march is no longer possible
+    @staticmethod
+    def is_points_decided(euchre_round):
+        calling_team = euchre_round.player_id_map[euchre_round.call.player_id].team
+        calling_team_wins = euchre_round.tricks_won_map[calling_team]
+        defending_team_wins = euchre_round.tricks_won_map[get_opposing_team(calling_team)]
+        return defending_team_wins >= 3 or (calling_team_wins >= 3 and defending_team_wins >= 1)
+
     # updates points won for each team based on tricks won and call made
     @staticmethod
     def update_team_points_won(euchre_round):
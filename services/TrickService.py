@@ -1,9 +1,9 @@
-from typing import Dict
+from typing import Dict, List
 
 from injector import inject
 
 from constants.GameConstants import flat_hierarchy
-from dtos.BasicDto import Play, Trick, Player
+from dtos.BasicDto import Play, Trick, Player, Call
 from utils.BasicsUtil import create_next_player_map
 from utils.CardUtil import get_effective_suit
 
@@ -13,19 +13,24 @@ class TrickService:
     def __init__(self, play_service):
         self.play_service = play_service
 
-    def play_trick(self, trick: Trick, player_id_map: Dict[int, Player], next_player_map=None) -> None:
+    # plays, when given, are reset and reused in order instead of allocating a Play per card
+    def play_trick(self, trick: Trick, player_id_map: Dict[int, Player], next_player_map=None,
+                   plays: List[Play] = None, matching: List[int] = None) -> None:
         if next_player_map is None:
             next_player_map = create_next_player_map(player_id_map)
         player = player_id_map[trick.leader_id]
-        play = Play(
-            card=None,
-            player=player,
-            id=1,
-            is_lead=True
-        )
+        if plays is None:
+            play = Play(
+                card=None,
+                player=player,
+                id=1,
+                is_lead=True
+            )
+        else:
+            play = self.reset_play(plays[0], player, 1, True)
 
         while not trick.is_complete:
-            self.play_service.choose_play(play, trick.call.suit, trick.play_suit)
+            self.play_service.choose_play(play, trick.call.suit, trick.play_suit, matching)
 
             # update results of play
             self.update_play_results(trick, play)
@@ -36,12 +41,34 @@ class TrickService:
             else:
                 # prepare next play
                 player = next_player_map[play.player.id]
-                play = Play(
-                    card=None,
-                    player=player,
-                    id=play.id + 1,
-                    is_lead=False
-                )
+                if plays is None:
+                    play = Play(
+                        card=None,
+                        player=player,
+                        id=play.id + 1,
+                        is_lead=False
+                    )
+                else:
+                    play = self.reset_play(plays[play.id], player, play.id + 1, False)
+
+    @staticmethod
+    def reset_play(play: Play, player: Player, play_id: int, is_lead: bool) -> Play:
+        play.card = None
+        play.player = player
+        play.id = play_id
+        play.is_lead = is_lead
+        return play
+
+    @staticmethod
+    def reset_trick(trick: Trick, call: Call, trick_id: int, leader_id: int) -> Trick:
+        trick.plays.clear()
+        trick.winning_play = None
+        trick.call = call
+        trick.play_suit = None
+        trick.id = trick_id
+        trick.leader_id = leader_id
+        trick.is_complete = False
+        return trick
 
     # updates the result of the play to the trick object
     @staticmethod
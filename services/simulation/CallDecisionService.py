@@ -0,0 +1,133 @@
+import copy
+from typing import List, Tuple
+
+from injector import inject
+
+from constants.GameConstants import HAND_MAX_CARD_COUNT, card_id_map, suit_id_map, effective_suit_table, rank_table
+from dtos.BasicDto import Call, CallTypeEnum, Card, SuitColorEnum
+from dtos.SimulationDto import CallDecision, CallOption, RoundSimulation, RoundSimulationBatch, SimulationEngineEnum, \
+    DiscardDecision, DiscardOption
+from services.CallService import CallService
+from services.simulation.RoundSimulationService import RoundSimulationService
+from utils.BasicsUtil import get_teammate
+from utils.StatisticsUtil import mean_standard_error
+
+
+class CallDecisionService:
+    @inject
+    def __init__(self, call_service: CallService, round_simulation_service: RoundSimulationService):
+        self.call_service = call_service
+        self.round_simulation_service = round_simulation_service
+
+    # scores passing and every call the decider could make over one shared batch of deals, best option first
+    # a pass leaves the call to a random other player and suit, as the simulator does for an unknown caller
+    def evaluate(self, decision: CallDecision) -> CallDecision:
+        options = [CallOption(call=Call(suit=None, type=CallTypeEnum.REGULAR_P2, player_id=0))]
+        options.extend(CallOption(call=call)
+                       for call in self.call_service.create_call_options(decision.flipped_card, decision.decider_id))
+
+        batch = self.round_simulation_service.simulate_batch(RoundSimulationBatch(
+            simulations=[self.create_option_simulation(decision, option) for option in options],
+            quantity=decision.quantity,
+            workers=decision.workers,
+            seed=decision.seed,
+        ))
+
+        decider = next(p for p in decision.players if p.id == decision.decider_id)
+        for option, simulation in zip(options, batch.simulations):
+            option.expected_points, option.standard_error = self.get_expected_net_points(simulation, decider.team)
+        decision.options = sorted(options, key=lambda option: option.expected_points, reverse=True)
+        return decision
+
+    # scores each of the dealer's 6 candidate discards after picking up, best first
+    # all candidates leave the same cards to deal, so every discard is played on exactly the same deals
+    def evaluate_discards(self, decision: DiscardDecision) -> DiscardDecision:
+        dealer = next(p for p in decision.players if p.id == decision.dealer_id)
+        if len(dealer.hand.remaining_cards) != HAND_MAX_CARD_COUNT:
+            raise ValueError(f"the dealer's hand must have {HAND_MAX_CARD_COUNT} cards to choose a discard")
+        if not decision.call.type.is_phase_1():
+            raise ValueError("the dealer only discards after a phase 1 call")
+        caller = next(p for p in decision.players if p.id == decision.call.player_id)
+        if decision.call.type.is_loner() and get_teammate(decision.players, caller) is dealer:
+            raise ValueError("the dealer sits out when their teammate goes alone, so there is no discard")
+        candidates = list(dealer.hand.remaining_cards) + [decision.flipped_card]
+        options = [DiscardOption(card=card) for card in candidates]
+
+        simulations = []
+        for option in options:
+            players = copy.deepcopy(decision.players)
+            option_dealer = next(p for p in players if p.id == decision.dealer_id)
+            option_dealer.hand.remaining_cards = [card for card in candidates if card != option.card]
+            simulations.append(RoundSimulation(
+                players=players,
+                call=decision.call,
+                rounds=[],
+                flipped_card=decision.flipped_card,
+                dealer_id=decision.dealer_id,
+                quantity=decision.quantity,
+                discarded_card=option.card,
+                engine=SimulationEngineEnum.NUMPY,
+            ))
+
+        batch = self.round_simulation_service.simulate_batch(RoundSimulationBatch(
+            simulations=simulations,
+            quantity=decision.quantity,
+            workers=decision.workers,
+            seed=decision.seed,
+        ))
+
+        for option, simulation in zip(options, batch.simulations):
+            option.expected_points, option.standard_error = self.get_expected_net_points(simulation, dealer.team)
+        decision.options = sorted(options, key=lambda option: option.expected_points, reverse=True)
+        return decision
+
+    # copies the table for one option: the dealer picks up the flipped card on an order up,
+    # otherwise the card is turned down and stays out of play
+    def create_option_simulation(self, decision: CallDecision, option: CallOption) -> RoundSimulation:
+        players = copy.deepcopy(decision.players)
+        call = option.call
+        if not option.is_pass() and call.type.is_phase_1():
+            dealer = next(p for p in players if p.id == decision.dealer_id)
+            caller = next(p for p in players if p.id == call.player_id)
+            dealer_sits_out = call.type.is_loner() and get_teammate(players, caller) is dealer
+            if not dealer_sits_out:
+                dealer.hand.remaining_cards = self.pick_up_flipped_card(
+                    dealer.hand.remaining_cards, decision.flipped_card)
+
+        return RoundSimulation(
+            players=players,
+            call=call,
+            rounds=[],
+            flipped_card=decision.flipped_card,
+            dealer_id=decision.dealer_id,
+            quantity=decision.quantity,
+            passing_player_ids=[decision.decider_id] if option.is_pass() else [],
+            engine=SimulationEngineEnum.NUMPY,
+        )
+
+    # adds the flipped card to the dealer's known cards, discarding the weakest card when the hand is full
+    # the weakest card is the lowest non-trump card (or the lowest trump when the hand is all trump)
+    @staticmethod
+    def pick_up_flipped_card(cards: List[Card], flipped_card: Card) -> List[Card]:
+        if len(cards) < HAND_MAX_CARD_COUNT:
+            return list(cards) + [flipped_card]
+
+        trump_id = suit_id_map[flipped_card.suit]
+
+        def strength(card):
+            card_id = card_id_map[card]
+            suit_id = effective_suit_table[trump_id][card_id]
+            return suit_id == trump_id, -rank_table[trump_id][suit_id][card_id]
+
+        discard = min(cards, key=strength)
+        return [card for card in cards if card != discard] + [flipped_card]
+
+    # expected net points per round for the team, with the standard error of that mean
+    @staticmethod
+    def get_expected_net_points(simulation: RoundSimulation, team: SuitColorEnum) -> Tuple[float, float]:
+        rounds = simulation.rounds_completed
+        net_points = sum(points if points_team == team else -points
+                         for points_team, points in simulation.total_points.items())
+        # only one team scores in a round, so the squared net points are the squared points of either team
+        net_points_squared = sum(simulation.total_points_squared.values())
+        return net_points / rounds, mean_standard_error(net_points, net_points_squared, rounds)
@@ -1,13 +1,15 @@
-import copy
 import time
 import logging
 
 from injector import inject
 
-from dtos.BasicDto import Game, SuitColorEnum, GameSimulation
+from constants.GameConstants import teams
+from dtos.BasicDto import Game, SuitColorEnum
+from dtos.SimulationDto import GameSimulation, GameTotals, CardWinTotals
 from services.GameService import GameService
 from services.RecordService import RecordService
 from utils.BasicsUtil import create_player_id_map
+from utils.PlayLog import BackgroundPlayLogWriter
 
 logger = logging.getLogger(__name__)
 
@@ -23,44 +25,69 @@ class GameSimulationService:
                                + '-games-' + str(simulation.quantity) \
                                + '-batch-' + str(simulation.record_batch_size) \
                                + '-date-' + time.strftime("%Y%m%d-%H%M%S") \
-                               + '.csv'
+                               + '.log'
 
-        game_id = 1
-        while not simulation.is_complete:
-            logger.debug('simulating game %s', game_id)
+        # recorded plays stream to a background writer, so memory stays constant whatever the quantity
+        log_writer = None
+        if simulation.record_games:
+            simulation.card_win_totals = CardWinTotals.create()
+            log_writer = BackgroundPlayLogWriter(simulation.get_full_file_path(),
+                                                 {p.id: p.name for p in simulation.players},
+                                                 simulation.record_batch_size)
+
+        simulation.totals = GameTotals.create()
+        snapshots = simulation.round_snapshots if simulation.keep_round_snapshots else None
+        try:
+            game_id = 1
+            while not simulation.is_complete:
+                logger.debug('simulating game %s', game_id)
 
-            game = Game(
-                players=simulation.players,
-                player_id_map=create_player_id_map(simulation.players),
-                dealer_start_id=simulation.players[0].id,
-                rounds=[],
-                team_score_map={SuitColorEnum.BLACK: 0, SuitColorEnum.RED: 0},
-                winning_team=None,
-                id=game_id
-            )
+                game = Game(
+                    players=simulation.players,
+                    player_id_map=create_player_id_map(simulation.players),
+                    dealer_start_id=simulation.players[0].id,
+                    rounds=[],
+                    team_score_map={SuitColorEnum.BLACK: 0, SuitColorEnum.RED: 0},
+                    winning_team=None,
+                    id=game_id
+                )
 
-            self.game_service.play_game(game)
+                self.game_service.play_game(game, snapshots)
 
-            self.update_simulation_with_game(simulation, game)
+                self.update_simulation_with_game(simulation, game, log_writer)
 
-            game_id += 1
+                game_id += 1
+        finally:
+            if log_writer is not None:
+                log_writer.close()
+                logger.info('recorded %s plays to %s', f'{log_writer.records_written:,}',
+                            simulation.get_full_file_path())
 
-    # records game data to the simulation object
-    def update_simulation_with_game(self, simulation: GameSimulation, game: Game) -> None:
+    # records game data as soon as the game ends, keeping only the extracted play records
+    def update_simulation_with_game(self, simulation: GameSimulation, game: Game,
+                                    log_writer: BackgroundPlayLogWriter = None) -> None:
         if game.id >= simulation.quantity:
             simulation.is_complete = True
 
+        self.update_totals_with_game(simulation.totals, game)
+
         if simulation.record_games:
-            simulation.games.append(copy.deepcopy(game))  # deepcopy to retain player card info
-
-            # record game data
-            if len(simulation.games) >= simulation.record_batch_size:
-                self.record_service.update_card_win_probabilities(simulation.games)
-                # record_games(
-                #     simulation.games,
-                #     simulation.output_directory + 'games' + simulation.file_postfix
-                # )
-
-                # record_player_hands(simulation.games, simulation.get_full_file_path())
-                simulation.output_game_data = False
-                simulation.games = []
+            records = self.record_service.generate_play_records([game])
+            self.record_service.update_card_win_totals(simulation.card_win_totals, records['trump_id'],
+                                                       records['card_id'],
+                                                       records['player_id'] == records['winner_id'])
+            log_writer.write(records)
+
+    @staticmethod
+    def update_totals_with_game(totals: GameTotals, game: Game) -> None:
+        totals.games += 1
+        totals.rounds += len(game.rounds)
+        totals.rounds_squared += len(game.rounds) * len(game.rounds)
+        totals.wins[teams.index(game.winning_team)] += 1
+        for euchre_round in game.rounds:
+            caller = euchre_round.player_id_map[euchre_round.call.player_id]
+            totals.calls_by_seat[caller.id] += 1
+            for team_id, team in enumerate(teams):
+                points = euchre_round.points_won_map[team]
+                totals.points[team_id] += points
+                totals.points_by_seat[caller.id] += points if team == caller.team else -points
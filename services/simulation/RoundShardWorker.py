@@ -0,0 +1,77 @@
+import os
+import random
+import time
+from typing import List
+
+import numpy as np
+
+from constants.GameConstants import PLAYER_COUNT
+from dtos.SimulationDto import BitmaskRoundSetup, RoundTotals, SimulationEngineEnum
+from services.BitmaskRoundService import BitmaskRoundService
+from services.ExactRoundService import ExactRoundService
+from services.NumpyRoundService import NumpyRoundService
+from services.PlayerService import PlayerService
+
+# functions in this module run inside worker processes, so they only depend on picklable integer setups
+
+# rounds played between deadline checks, roughly 20-50ms of work per slice on any engine
+TIME_SLICE_SIZES = {SimulationEngineEnum.BITMASK: 1_000, SimulationEngineEnum.NUMPY: 8_192,
+                    SimulationEngineEnum.STRATIFIED: 8_192, SimulationEngineEnum.EXACT: 1}
+
+
+# creates the random stream for one shard of an integer engine simulation
+def create_shard_rng(engine: SimulationEngineEnum, seed_sequence: np.random.SeedSequence):
+    if engine in (SimulationEngineEnum.NUMPY, SimulationEngineEnum.STRATIFIED):
+        return np.random.default_rng(seed_sequence)
+    return random.Random(int.from_bytes(seed_sequence.generate_state(4).tobytes(), 'little'))
+
+
+# plays one shard of rounds with its own random stream and returns the shard's running totals
+# with a deadline (time.time() seconds) the shard stops at the first slice boundary past it
+def play_round_shard(engine: SimulationEngineEnum, setup: BitmaskRoundSetup, quantity: int,
+                     seed_sequence: np.random.SeedSequence, deadline: float = None) -> RoundTotals:
+    totals = RoundTotals.create()
+    rng = create_shard_rng(engine, seed_sequence)
+    if engine == SimulationEngineEnum.NUMPY:
+        play_rounds = NumpyRoundService().play_rounds
+    elif engine == SimulationEngineEnum.STRATIFIED:
+        play_rounds = NumpyRoundService().play_rounds_stratified
+    elif engine == SimulationEngineEnum.EXACT:
+        play_rounds = ExactRoundService.play_rounds
+    else:
+        play_rounds = BitmaskRoundService.play_rounds
+    play_rounds_until(engine, play_rounds, setup, quantity, totals, deadline, rng=rng)
+    return totals
+
+
+# plays quantity rounds in time slices, stopping early once the deadline has passed
+# at least one slice is always played so a late start still returns some rounds
+def play_rounds_until(engine: SimulationEngineEnum, play_rounds, setup: BitmaskRoundSetup, quantity: int,
+                      totals: RoundTotals, deadline: float = None, **kwargs) -> RoundTotals:
+    if deadline is None:
+        return play_rounds(setup, quantity, totals, **kwargs)
+    slice_size = TIME_SLICE_SIZES[engine]
+    remaining = quantity
+    while remaining > 0:
+        rounds = min(slice_size, remaining)
+        play_rounds(setup, rounds, totals, **kwargs)
+        remaining -= rounds
+        if time.time() >= deadline:
+            break
+    return totals
+
+
+# plays one shard of a common random numbers batch, every scenario against the same draws
+def play_batch_shard(setups: List[BitmaskRoundSetup], quantity: int,
+                     seed_sequence: np.random.SeedSequence) -> List[RoundTotals]:
+    totals_list = [RoundTotals.create() for _ in setups]
+    return NumpyRoundService().play_batch(setups, quantity, totals_list, np.random.default_rng(seed_sequence))
+
+
+# runs once per worker at pool start-up so the first real shard does not pay for imports or cache misses
+def warm_worker() -> int:
+    setup = BitmaskRoundService.create_setup(
+        PlayerService.create_players(PLAYER_COUNT), None, None, 0, [])
+    play_round_shard(SimulationEngineEnum.BITMASK, setup, 2_000, np.random.SeedSequence(0))
+    play_round_shard(SimulationEngineEnum.NUMPY, setup, 2_000, np.random.SeedSequence(0))
+    return os.getpid()
@@ -1,46 +1,74 @@
-from typing import List
+import copy
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import closing
+from functools import partial
+from typing import List, Iterator, Callable
 
+import numpy as np
 from injector import inject
 
 from constants.GameConstants import *
-from dtos.BasicDto import Round, SuitColorEnum, Player, Card, Call, CallTypeEnum
-from dtos.SimulationDto import RoundSimulation
+from dtos.BasicDto import Player, Card, Call
+from dtos.SimulationDto import RoundSimulation, RoundTotals, SimulationEngineEnum, RoundSimulationBatch, \
+    SimulationOutputEnum, RoundStore
+from services.BitmaskRoundService import BitmaskRoundService
 from services.CallService import CallService
 from services.DealingService import DealingService
-from services.PlayService import PlayService
+from services.ExactRoundService import ExactRoundService
+from services.NumpyRoundService import NumpyRoundService
 from services.PlayerService import PlayerService
 from services.RoundService import RoundService
 from services.ShuffleService import ShuffleService
-from services.TrickService import TrickService
+from services.simulation.RoundShardWorker import create_shard_rng, play_round_shard, play_rounds_until, \
+    play_batch_shard
+from services.simulation.SimulationWorkerPool import SimulationWorkerPool
 from utils.BasicsUtil import create_player_id_map, create_next_player_map, get_teammate
+from utils.StatisticsUtil import Z_95, proportion_standard_error, mean_standard_error
 import random
 import logging
 import time
-import matplotlib.pyplot as plt
 
 logger = logging.getLogger(__name__)
 
+# smallest number of rounds worth sending to a worker process
+MIN_SHARD_SIZE = 10_000
+# rounds between confidence interval checks, and rounds required before the first check
+ADAPTIVE_CHUNK_SIZE = 10_000
+MIN_ADAPTIVE_ROUNDS = 1_000
+# fewest rounds before the first check on engines whose rounds cost more (an exact deal averages every play)
+MIN_ADAPTIVE_DEALS = 30
+# rounds each worker plays between progress reports to a caller (roughly a second of work)
+PROGRESS_CHUNK_SIZE_PER_WORKER = 5 * MIN_SHARD_SIZE
+# rounds per exactly evaluated deal that keep shards and chunks at a similar amount of work on the exact engine
+# (a deal takes around 30ms, the time of thousands of sampled rounds)
+EXACT_ROUND_COST = 1_000
+
 
 class RoundSimulationService:
     @inject
     def __init__(self, dealing_service: DealingService, shuffle_service: ShuffleService, call_service: CallService,
-                 player_service: PlayerService, round_service: RoundService):
+                 player_service: PlayerService, round_service: RoundService,
+                 bitmask_round_service: BitmaskRoundService, numpy_round_service: NumpyRoundService,
+                 exact_round_service: ExactRoundService, worker_pool: SimulationWorkerPool = None):
         self.dealing_service = dealing_service
         self.shuffle_service = shuffle_service
         self.call_service = call_service
         self.player_service = player_service
         self.round_service = round_service
+        self.bitmask_round_service = bitmask_round_service
+        self.numpy_round_service = numpy_round_service
+        self.exact_round_service = exact_round_service
+        self.worker_pool = worker_pool  # when set, all integer engine work runs in its worker processes
 
-    def simulate(self, round_simulation: RoundSimulation) -> RoundSimulation:
-        if round_simulation.players is None:
-            round_simulation.players = self.player_service.create_players(PLAYER_COUNT)
+    # on_chunk is called with the running totals after each chunk of an integer engine simulation
+    # and stops the simulation early by returning True
+    def simulate(self, round_simulation: RoundSimulation,
+                 on_chunk: Callable[[RoundTotals], bool] = None) -> RoundSimulation:
+        self.prepare_players(round_simulation)
 
-        if round_simulation.call and round_simulation.call.type.is_loner():
-            players = round_simulation.players
-            call = round_simulation.call
-            caller = next((p for p in players if p.id == call.player_id), None)
-            # remove teammate from players
-            round_simulation.players.remove(get_teammate(round_simulation.players, caller))
+        # the integer engines do not build Round objects, so keep_rounds always uses the object engine
+        if round_simulation.engine != SimulationEngineEnum.OBJECT and not round_simulation.keep_rounds:
+            return self.simulate_integer(round_simulation, on_chunk)
 
         player_ids = [player.id for player in round_simulation.players]
         passing_set = set(round_simulation.passing_player_ids)
@@ -48,16 +76,19 @@ class RoundSimulationService:
 
         fixed_flipped = round_simulation.flipped_card
         random_dealer = round_simulation.dealer_id == 0
+        trump_suits = self.call_service.get_possible_trump_suits(round_simulation.call, fixed_flipped)
 
         # retain player starting cards in a map
         player_cards_map = {}
         for player in round_simulation.players:
             player_cards_map[player.id] = list(player.hand.remaining_cards)
 
-        # cards not assigned to any player, excluding the fixed flipped card if specified
+        # cards not assigned to any player, excluding the fixed flipped card and any discard if specified
         unassigned_cards = self.get_remaining_cards(round_simulation.players)
         if fixed_flipped is not None:
             unassigned_cards = [c for c in unassigned_cards if c != fixed_flipped]
+        if round_simulation.discarded_card is not None:
+            unassigned_cards = [c for c in unassigned_cards if c != round_simulation.discarded_card]
         player_id_map = create_player_id_map(round_simulation.players)
         next_player_map = create_next_player_map(player_id_map)
         players_list = list(round_simulation.players)
@@ -65,15 +96,32 @@ class RoundSimulationService:
         total = round_simulation.quantity
         log_interval = max(1, total // 10)
         start_time = time.time()
+        deadline = self.get_deadline(round_simulation, start_time)
         logger.info("Starting simulation of %s rounds", f'{total:,}')
 
         # running totals
-        total_points = {SuitColorEnum.BLACK: 0, SuitColorEnum.RED: 0}
-        total_wins = {SuitColorEnum.BLACK: 0, SuitColorEnum.RED: 0}
-        total_tricks_by_player = {p.id: 0 for p in round_simulation.players}
+        totals = RoundTotals.create()
         keep_rounds = round_simulation.keep_rounds
+        outputs = round_simulation.outputs
+        # confidence interval targets are checked against the running points and wins, requested or not
+        adaptive = self.is_adaptive(round_simulation)
+        track_points = SimulationOutputEnum.AVG_POINTS in outputs or round_simulation.target_avg_points_ci is not None
+        track_wins = SimulationOutputEnum.WIN_PROB in outputs or round_simulation.target_win_prob_ci is not None
+        track_tricks = SimulationOutputEnum.AVG_TRICKS in outputs
+        track_points_histogram = SimulationOutputEnum.POINTS_HISTOGRAM in outputs
+        track_tricks_histogram = SimulationOutputEnum.TRICKS_HISTOGRAM in outputs
+        stop_when_decided = self.can_stop_when_decided(outputs) and not keep_rounds
+        # one pooled round (with its tricks and plays) is reset and replayed every round,
+        # kept rounds are copied into a compact columnar store
+        pool = self.round_service.create_round_pool(players_list, player_id_map)
+        if keep_rounds:
+            round_simulation.rounds = RoundStore.create(players_list, next_player_map, total)
 
+        rounds_completed = 0
         for round_id in range(1, total + 1):
+            if deadline is not None and rounds_completed and time.time() >= deadline:
+                logger.info("Time budget reached after %s rounds", f'{rounds_completed:,}')
+                break
             logger.debug('Playing round %s...', f'{round_id:,}')
 
             # get random dealer
@@ -87,30 +135,32 @@ class RoundSimulationService:
             self.dealing_service.deal_cards(round_simulation.players, remaining_cards, track_starting_cards=False)
 
             # build call for this round
-            round_call = self.call_service.build_round_call(round_simulation.call, eligible_caller_ids)
-
-            euchre_round = Round(
-                players=players_list,
-                player_id_map=player_id_map,
-                tricks=[],
-                tricks_won_map={SuitColorEnum.BLACK: 0, SuitColorEnum.RED: 0},
-                points_won_map={SuitColorEnum.BLACK: 0, SuitColorEnum.RED: 0},
-                flipped_card=round_flipped_card,
-                call=round_call,
-                id=round_id,
-                dealer_id=round_simulation.dealer_id,
-            )
+            round_call = self.call_service.build_round_call(round_simulation.call, eligible_caller_ids, trump_suits)
+
+            euchre_round = self.round_service.reset_round(pool, round_flipped_card, round_call, round_id,
+                                                          round_simulation.dealer_id)
 
-            self.round_service.play_round(euchre_round, next_player_map)
+            self.round_service.play_round(euchre_round, next_player_map, stop_when_decided, pool)
 
             # update running totals
-            for team in (SuitColorEnum.BLACK, SuitColorEnum.RED):
+            for team_id, team in enumerate(teams):
                 pts = euchre_round.points_won_map[team]
-                total_points[team] += pts
-                if pts > 0:
-                    total_wins[team] += 1
-            for trick in euchre_round.tricks:
-                total_tricks_by_player[trick.winning_play.player.id] += 1
+                if track_points:
+                    totals.points[team_id] += pts
+                    totals.points_squared[team_id] += pts * pts
+                if track_wins and pts > 0:
+                    totals.wins[team_id] += 1
+                if track_points_histogram:
+                    totals.points_histogram[team_id][pts] += 1
+                if track_tricks_histogram:
+                    totals.tricks_histogram[team_id][euchre_round.tricks_won_map[team]] += 1
+            if track_tricks:
+                round_tricks = [0] * 5
+                for trick in euchre_round.tricks:
+                    round_tricks[trick.winning_play.player.id] += 1
+                for player_id, tricks in enumerate(round_tricks):
+                    totals.tricks_by_player[player_id] += tricks
+                    totals.tricks_squared_by_player[player_id] += tricks * tricks
 
             if keep_rounds:
                 round_simulation.rounds.append(euchre_round)
@@ -127,17 +177,364 @@ class RoundSimulationService:
 
             for player in round_simulation.players:
                 player.hand.remaining_cards[:] = player_cards_map[player.id]
+            rounds_completed = round_id
+
+            if adaptive and round_id % ADAPTIVE_CHUNK_SIZE == 0:
+                totals.rounds = round_id
+                if self.is_precise_enough(round_simulation, totals):
+                    logger.info("Target confidence interval reached after %s rounds", f'{round_id:,}')
+                    break
 
         elapsed = time.time() - start_time
-        logger.info("Simulation complete: %s rounds in %.1fs (%.0f rounds/sec)", f'{total:,}', elapsed,
-                    total / elapsed if elapsed > 0 else 0)
+        logger.info("Simulation complete: %s rounds in %.1fs (%.0f rounds/sec)", f'{rounds_completed:,}', elapsed,
+                    rounds_completed / elapsed if elapsed > 0 else 0)
 
-        round_simulation.total_points = total_points
-        round_simulation.total_wins = total_wins
-        round_simulation.total_tricks_by_player = total_tricks_by_player
+        totals.rounds = rounds_completed
+        self.update_simulation_with_totals(round_simulation, totals)
+        round_simulation.rounds_per_sec = rounds_completed / elapsed if elapsed > 0 else 0
 
         return round_simulation
 
+    # safe to call again on a prepared simulation, the loner's teammate is only removed once
+    def prepare_players(self, round_simulation: RoundSimulation) -> None:
+        if round_simulation.players is None:
+            round_simulation.players = self.player_service.create_players(PLAYER_COUNT)
+
+        if round_simulation.call and round_simulation.call.type.is_loner():
+            players = round_simulation.players
+            call = round_simulation.call
+            caller = next((p for p in players if p.id == call.player_id), None)
+            # remove teammate from players
+            teammate = get_teammate(round_simulation.players, caller)
+            if teammate is not None:
+                round_simulation.players.remove(teammate)
+
+    # rounds can end once their points are decided unless an output needs every trick
+    @staticmethod
+    def can_stop_when_decided(outputs) -> bool:
+        return SimulationOutputEnum.AVG_TRICKS not in outputs and SimulationOutputEnum.TRICKS_HISTOGRAM not in outputs
+
+    def create_setup(self, round_simulation: RoundSimulation):
+        return self.bitmask_round_service.create_setup(
+            round_simulation.players,
+            round_simulation.call,
+            round_simulation.flipped_card,
+            round_simulation.dealer_id,
+            round_simulation.passing_player_ids,
+            round_simulation.discarded_card,
+            RoundSimulationService.can_stop_when_decided(round_simulation.outputs),
+        )
+
+    # plays every scenario of the batch against one shared stream of deals and play draws (common random numbers)
+    # shards split the rounds, not the scenarios, so each shard still evaluates all scenarios on the same deals
+    def simulate_batch(self, batch: RoundSimulationBatch) -> RoundSimulationBatch:
+        setups = []
+        for round_simulation in batch.simulations:
+            self.prepare_players(round_simulation)
+            setups.append(self.create_setup(round_simulation))
+
+        start_time = time.time()
+        logger.info("Starting batch simulation of %s scenarios x %s rounds", len(setups), f'{batch.quantity:,}')
+        seed_sequence = np.random.SeedSequence(batch.seed)
+        shard_count = max(1, min(batch.workers, -(-batch.quantity // MIN_SHARD_SIZE)))
+        if shard_count == 1 and self.worker_pool is None:
+            totals_list = play_batch_shard(setups, batch.quantity, seed_sequence.spawn(1)[0])
+        else:
+            totals_list = self.play_sharded_batch(setups, batch, seed_sequence.spawn(shard_count))
+
+        elapsed = time.time() - start_time
+        logger.info("Batch simulation complete: %s scenarios x %s rounds in %.1fs", len(setups),
+                    f'{batch.quantity:,}', elapsed)
+        for round_simulation, totals in zip(batch.simulations, totals_list):
+            self.update_simulation_with_totals(round_simulation, totals)
+            round_simulation.rounds_per_sec = totals.rounds / elapsed if elapsed > 0 else 0
+        batch.rounds_completed = batch.quantity
+        batch.rounds_per_sec = batch.quantity / elapsed if elapsed > 0 else 0
+        return batch
+
+    # replaces the random flipped card with one stratum per possible up-card, each played on the sweep's engine
+    # the quantity is split as evenly as possible (strata differ by at most one round), so summing the strata
+    # weights the up-cards equally, as a random flipped card would; the summed totals are stored on round_simulation
+    # strata share one seed, so on the numpy engine they draw the same deals for the cards they have in common
+    def sweep_flipped_cards(self, round_simulation: RoundSimulation) -> RoundSimulationBatch:
+        call = round_simulation.call
+        unassigned_cards = set(self.get_remaining_cards(round_simulation.players))
+        candidates = [card for card in euchre_deck
+                      if card in unassigned_cards and self.is_possible_flipped_card(call, card)]
+        if not candidates:
+            raise ValueError("no unassigned card can be the flipped card for this call")
+        if round_simulation.quantity < len(candidates):
+            raise ValueError(f"quantity must be at least the number of possible flipped cards ({len(candidates)}), "
+                             f"got {round_simulation.quantity}")
+
+        seed = round_simulation.seed
+        if seed is None:
+            seed = int(np.random.SeedSequence().generate_state(1)[0])
+        stratum_quantity, remainder = divmod(round_simulation.quantity, len(candidates))
+
+        start_time = time.time()
+        simulations = []
+        totals = RoundTotals.create()
+        for stratum_id, card in enumerate(candidates):
+            stratum_call = call
+            if call is not None and call.type.is_phase_1() and call.suit is None:
+                # ordering up always names the flipped card's suit
+                stratum_call = Call(suit=card.suit, type=call.type, player_id=call.player_id)
+            stratum = self.simulate(RoundSimulation(
+                players=copy.deepcopy(round_simulation.players),
+                call=stratum_call,
+                rounds=[],
+                flipped_card=card,
+                quantity=stratum_quantity + (1 if stratum_id < remainder else 0),
+                dealer_id=round_simulation.dealer_id,
+                passing_player_ids=list(round_simulation.passing_player_ids),
+                engine=round_simulation.engine,
+                workers=round_simulation.workers,
+                seed=seed,
+                outputs=round_simulation.outputs,
+            ))
+            totals.merge(self.get_totals_from_simulation(stratum))
+            simulations.append(stratum)
+
+        elapsed = time.time() - start_time
+        round_simulation.players = simulations[0].players
+        self.update_simulation_with_totals(round_simulation, totals)
+        round_simulation.rounds_per_sec = totals.rounds / elapsed if elapsed > 0 else 0
+        return RoundSimulationBatch(
+            simulations=simulations,
+            quantity=round_simulation.quantity,
+            workers=round_simulation.workers,
+            seed=round_simulation.seed,
+            rounds_completed=totals.rounds,
+        )
+
+    # a phase 1 call names the flipped card's suit and a phase 2 call can never name it
+    @staticmethod
+    def is_possible_flipped_card(call: Call, card: Card) -> bool:
+        if call is None or call.suit is None:
+            return True
+        if call.type.is_phase_1():
+            return card.suit == call.suit
+        return card.suit != call.suit
+
+    def play_sharded_batch(self, setups, batch: RoundSimulationBatch, seed_sequences) -> List[RoundTotals]:
+        executor = None
+        if self.worker_pool is not None:
+            submit = self.worker_pool.submit
+        else:
+            executor = ProcessPoolExecutor(max_workers=batch.workers)
+            submit = executor.submit
+        try:
+            shard_count = len(seed_sequences)
+            futures = [
+                submit(play_batch_shard, setups,
+                       batch.quantity // shard_count + (1 if shard_id < batch.quantity % shard_count else 0),
+                       seed_sequences[shard_id])
+                for shard_id in range(shard_count)
+            ]
+            totals_list = [RoundTotals.create() for _ in setups]
+            for future in as_completed(futures):
+                for totals, shard_totals in zip(totals_list, future.result()):
+                    totals.merge(shard_totals)
+            return totals_list
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+    # plays the simulation with card ids and hand masks instead of Round/Trick/Play objects
+    def simulate_integer(self, round_simulation: RoundSimulation,
+                         on_chunk: Callable[[RoundTotals], bool] = None) -> RoundSimulation:
+        setup = self.create_setup(round_simulation)
+
+        total = round_simulation.quantity
+        start_time = time.time()
+        deadline = self.get_deadline(round_simulation, start_time)
+        logger.info("Starting %s simulation of up to %s rounds", round_simulation.engine.value, f'{total:,}')
+
+        totals = RoundTotals.create()
+        with closing(self.iterate_integer_chunks(round_simulation, setup, deadline)) as chunks:
+            for totals in chunks:
+                self.log_progress(totals.rounds, total, start_time)
+                if on_chunk is not None and on_chunk(totals):
+                    logger.info("Simulation stopped after %s rounds", f'{totals.rounds:,}')
+                    break
+                if self.is_precise_enough(round_simulation, totals):
+                    logger.info("Target confidence interval reached after %s rounds", f'{totals.rounds:,}')
+                    break
+        if deadline is not None and totals.rounds < total and time.time() >= deadline:
+            logger.info("Time budget reached after %s rounds", f'{totals.rounds:,}')
+
+        elapsed = time.time() - start_time
+        logger.info("Simulation complete: %s rounds in %.1fs (%.0f rounds/sec)", f'{totals.rounds:,}', elapsed,
+                    totals.rounds / elapsed if elapsed > 0 else 0)
+
+        self.update_simulation_with_totals(round_simulation, totals)
+        round_simulation.rounds_per_sec = totals.rounds / elapsed if elapsed > 0 else 0
+        return round_simulation
+
+    # yields the running totals after each chunk of rounds until quantity rounds have been played or the deadline passes
+    # a chunk runs in this process, or is split into shards with their own random streams across a process pool
+    # every stream is spawned from one SeedSequence, so results are reproducible for a given seed and worker count
+    # (unless a deadline cuts the streams short)
+    def iterate_integer_chunks(self, round_simulation: RoundSimulation, setup,
+                               deadline: float = None) -> Iterator[RoundTotals]:
+        engine = round_simulation.engine
+        total = round_simulation.quantity
+        chunk_size = self.get_chunk_size(round_simulation)
+        seed_sequence = np.random.SeedSequence(round_simulation.seed)
+
+        totals = RoundTotals.create()
+        play_rounds = None
+        executor = None
+        try:
+            while totals.rounds < total and (deadline is None or time.time() < deadline):
+                chunk = min(chunk_size, total - totals.rounds)
+                min_shard_size = max(1, MIN_SHARD_SIZE // self.get_round_cost(engine))
+                shard_count = max(1, min(round_simulation.workers, -(-chunk // min_shard_size)))
+                if shard_count == 1 and self.worker_pool is None:
+                    if play_rounds is None:
+                        play_rounds = self.create_play_rounds(engine, seed_sequence.spawn(1)[0])
+                    play_rounds_until(engine, play_rounds, setup, chunk, totals, deadline)
+                else:
+                    if self.worker_pool is not None:
+                        submit = self.worker_pool.submit
+                    else:
+                        executor = executor or ProcessPoolExecutor(max_workers=round_simulation.workers)
+                        submit = executor.submit
+                    totals.merge(self.play_sharded_rounds(submit, engine, setup, chunk,
+                                                          seed_sequence.spawn(shard_count), deadline))
+                yield totals
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+    def create_play_rounds(self, engine, seed_sequence):
+        rng = create_shard_rng(engine, seed_sequence)
+        if engine == SimulationEngineEnum.NUMPY:
+            return partial(self.numpy_round_service.play_rounds, rng=rng)
+        if engine == SimulationEngineEnum.STRATIFIED:
+            return partial(self.numpy_round_service.play_rounds_stratified, rng=rng)
+        if engine == SimulationEngineEnum.EXACT:
+            return partial(self.exact_round_service.play_rounds, rng=rng)
+        return partial(self.bitmask_round_service.play_rounds, rng=rng)
+
+    # splits the rounds evenly into one shard per seed sequence and merges the shards' running totals
+    @staticmethod
+    def play_sharded_rounds(submit, engine, setup, quantity, seed_sequences, deadline=None) -> RoundTotals:
+        shard_count = len(seed_sequences)
+        futures = [
+            submit(play_round_shard, engine, setup,
+                   quantity // shard_count + (1 if shard_id < quantity % shard_count else 0),
+                   seed_sequences[shard_id], deadline)
+            for shard_id in range(shard_count)
+        ]
+        totals = RoundTotals.create()
+        for future in as_completed(futures):
+            totals.merge(future.result())
+        return totals
+
+    # rounds played between progress checks: small chunks when stopping early, one wave per worker pool,
+    # otherwise a tenth of the simulation so progress is logged as before
+    def get_chunk_size(self, round_simulation: RoundSimulation) -> int:
+        if round_simulation.chunk_size:
+            return round_simulation.chunk_size
+        if self.is_adaptive(round_simulation):
+            return max(1, max(ADAPTIVE_CHUNK_SIZE, round_simulation.workers * MIN_SHARD_SIZE)
+                       // self.get_round_cost(round_simulation.engine))
+        if round_simulation.workers > 1 or self.worker_pool is not None:
+            return max(1, round_simulation.quantity)
+        return max(1, round_simulation.quantity // 10)
+
+    # rounds between progress reports to a caller watching a simulation
+    @staticmethod
+    def get_progress_chunk_size(round_simulation: RoundSimulation) -> int:
+        return max(1, PROGRESS_CHUNK_SIZE_PER_WORKER * round_simulation.workers
+                   // RoundSimulationService.get_round_cost(round_simulation.engine))
+
+    @staticmethod
+    def get_round_cost(engine: SimulationEngineEnum) -> int:
+        return EXACT_ROUND_COST if engine == SimulationEngineEnum.EXACT else 1
+
+    # wall clock time (time.time() seconds, comparable across worker processes) at which to stop playing rounds
+    @staticmethod
+    def get_deadline(round_simulation: RoundSimulation, start_time: float):
+        if round_simulation.time_budget_ms is None:
+            return None
+        return start_time + round_simulation.time_budget_ms / 1000
+
+    @staticmethod
+    def is_adaptive(round_simulation: RoundSimulation) -> bool:
+        return round_simulation.target_win_prob_ci is not None or round_simulation.target_avg_points_ci is not None
+
+    # rounds required before the first confidence interval check, scaled down by the engine's round cost
+    @staticmethod
+    def get_min_adaptive_rounds(engine: SimulationEngineEnum) -> int:
+        return max(MIN_ADAPTIVE_DEALS, MIN_ADAPTIVE_ROUNDS // RoundSimulationService.get_round_cost(engine))
+
+    # true once every requested 95% confidence interval is at most its target half-width
+    @staticmethod
+    def is_precise_enough(round_simulation: RoundSimulation, totals: RoundTotals) -> bool:
+        if (not RoundSimulationService.is_adaptive(round_simulation)
+                or totals.rounds < RoundSimulationService.get_min_adaptive_rounds(round_simulation.engine)):
+            return False
+        for team_id in range(2):
+            if round_simulation.target_win_prob_ci is not None:
+                half_width = Z_95 * proportion_standard_error(totals.wins[team_id], totals.rounds)
+                if half_width > round_simulation.target_win_prob_ci:
+                    return False
+            if round_simulation.target_avg_points_ci is not None:
+                half_width = Z_95 * mean_standard_error(totals.points[team_id], totals.points_squared[team_id],
+                                                         totals.rounds)
+                if half_width > round_simulation.target_avg_points_ci:
+                    return False
+        return True
+
+    @staticmethod
+    def log_progress(rounds_completed, total, start_time):
+        elapsed = time.time() - start_time
+        pct = rounds_completed / total * 100
+        rate = rounds_completed / elapsed if elapsed > 0 else 0
+        logger.info("Progress: %s/%s (%.0f%%) | %.0f rounds/sec | elapsed: %.1fs", f'{rounds_completed:,}',
+                    f'{total:,}', pct, rate, elapsed)
+
+    # copies integer running totals onto the team/player keyed maps of the simulation
+    @staticmethod
+    def update_simulation_with_totals(round_simulation: RoundSimulation, totals: RoundTotals) -> None:
+        round_simulation.rounds_completed = totals.rounds
+        round_simulation.total_points = {team: totals.points[team_id] for team_id, team in enumerate(teams)}
+        round_simulation.total_wins = {team: totals.wins[team_id] for team_id, team in enumerate(teams)}
+        round_simulation.total_points_squared = {
+            team: totals.points_squared[team_id] for team_id, team in enumerate(teams)
+        }
+        round_simulation.total_tricks_by_player = {
+            p.id: totals.tricks_by_player[p.id] for p in round_simulation.players
+        }
+        round_simulation.total_tricks_squared_by_player = {
+            p.id: totals.tricks_squared_by_player[p.id] for p in round_simulation.players
+        }
+        round_simulation.total_points_histogram = {
+            team: list(totals.points_histogram[team_id]) for team_id, team in enumerate(teams)
+        }
+        round_simulation.total_tricks_histogram = {
+            team: list(totals.tricks_histogram[team_id]) for team_id, team in enumerate(teams)
+        }
+
+    # inverse of update_simulation_with_totals
+    @staticmethod
+    def get_totals_from_simulation(round_simulation: RoundSimulation) -> RoundTotals:
+        totals = RoundTotals.create()
+        for team_id, team in enumerate(teams):
+            totals.points[team_id] = round_simulation.total_points[team]
+            totals.points_squared[team_id] = round_simulation.total_points_squared[team]
+            totals.wins[team_id] = round_simulation.total_wins[team]
+            totals.points_histogram[team_id] = list(round_simulation.total_points_histogram[team])
+            totals.tricks_histogram[team_id] = list(round_simulation.total_tricks_histogram[team])
+        for player_id, tricks in round_simulation.total_tricks_by_player.items():
+            totals.tricks_by_player[player_id] = tricks
+            totals.tricks_squared_by_player[player_id] = round_simulation.total_tricks_squared_by_player[player_id]
+        totals.rounds = round_simulation.rounds_completed
+        return totals
+
     @staticmethod
     def get_remaining_cards(players: List[Player]) -> List[Card]:
         cards_in_use = []
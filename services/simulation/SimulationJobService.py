@@ -0,0 +1,104 @@
+import logging
+import threading
+import time
+import uuid
+from typing import Dict
+
+from injector import inject
+
+from dtos.SimulationDto import RoundSimulation, RoundTotals, SimulationJob, SimulationJobStatusEnum, \
+    SimulationEngineEnum
+from services.simulation.RoundSimulationService import RoundSimulationService
+
+logger = logging.getLogger(__name__)
+
+
+class SimulationJobService:
+    # runs simulations in background threads so callers can poll progress and cancel instead of waiting
+    # shard work still goes through the simulation service (and its worker pool), threads only drive the chunks
+    @inject
+    def __init__(self, round_simulation_service: RoundSimulationService, max_running_jobs: int = 2,
+                 retention_seconds: float = 3600):
+        self.round_simulation_service = round_simulation_service
+        self.retention_seconds = retention_seconds  # finished jobs are forgotten after this long
+        self.jobs: Dict[str, SimulationJob] = {}
+        self.lock = threading.Lock()
+        self.running_slots = threading.BoundedSemaphore(max_running_jobs)
+
+    def submit(self, round_simulation: RoundSimulation) -> SimulationJob:
+        if round_simulation.engine == SimulationEngineEnum.OBJECT or round_simulation.keep_rounds:
+            raise ValueError(f"simulation jobs require one of the engines: "
+                             f"{SimulationEngineEnum.get_integer_engine_names()}")
+        if not round_simulation.chunk_size:
+            round_simulation.chunk_size = self.round_simulation_service.get_progress_chunk_size(round_simulation)
+        # players are settled before the job thread starts, so polls never see a loner's teammate being removed
+        self.round_simulation_service.prepare_players(round_simulation)
+
+        job = SimulationJob(id=uuid.uuid4().hex, simulation=round_simulation, created_time=time.time())
+        with self.lock:
+            self.remove_expired_jobs()
+            self.jobs[job.id] = job
+        # daemon threads so an abandoned job never blocks interpreter shutdown
+        threading.Thread(target=self.run_job, args=(job,), name=f'simulation-job-{job.id[:8]}', daemon=True).start()
+        logger.info('Submitted simulation job %s: quantity=%s', job.id, round_simulation.quantity)
+        return job
+
+    def get_job(self, job_id: str) -> SimulationJob:
+        with self.lock:
+            self.remove_expired_jobs()
+            return self.jobs.get(job_id)
+
+    # asks a job to stop after its current chunk; its partial totals are kept
+    def cancel(self, job_id: str) -> SimulationJob:
+        job = self.get_job(job_id)
+        if job is not None and not job.status.is_finished():
+            job.cancel_requested = True
+            logger.info('Cancel requested for simulation job %s', job_id)
+        return job
+
+    def run_job(self, job: SimulationJob) -> None:
+        with self.running_slots:
+            if job.cancel_requested:
+                self.finish_job(job, SimulationJobStatusEnum.CANCELLED)
+                return
+            job.start_time = time.time()
+            job.status = SimulationJobStatusEnum.RUNNING
+            try:
+                self.round_simulation_service.simulate(job.simulation, lambda totals: self.record_chunk(job, totals))
+            except Exception as e:
+                logger.error('Simulation job %s failed: %s', job.id, e, exc_info=True)
+                job.error = str(e)
+                self.finish_job(job, SimulationJobStatusEnum.FAILED)
+                return
+            status = SimulationJobStatusEnum.CANCELLED if job.cancel_requested else SimulationJobStatusEnum.COMPLETED
+            self.finish_job(job, status)
+
+    # publishes a copy of the running totals, since the simulation keeps adding to the original
+    # returns True to stop the simulation once the job is cancelled
+    @staticmethod
+    def record_chunk(job: SimulationJob, totals: RoundTotals) -> bool:
+        snapshot = RoundTotals.create()
+        snapshot.merge(totals)
+        job.totals = snapshot
+        return job.cancel_requested
+
+    @staticmethod
+    def finish_job(job: SimulationJob, status: SimulationJobStatusEnum) -> None:
+        job.end_time = time.time()
+        job.status = status
+        logger.info('Simulation job %s %s after %s rounds', job.id, status.value,
+                    f'{job.totals.rounds if job.totals else 0:,}')
+
+    # seconds the job has been running, frozen once it finishes
+    @staticmethod
+    def get_elapsed_seconds(job: SimulationJob) -> float:
+        if job.start_time is None:
+            return 0
+        return (job.end_time or time.time()) - job.start_time
+
+    def remove_expired_jobs(self) -> None:
+        now = time.time()
+        expired_ids = [job_id for job_id, job in self.jobs.items()
+                       if job.end_time is not None and now - job.end_time > self.retention_seconds]
+        for job_id in expired_ids:
+            del self.jobs[job_id]
@@ -0,0 +1,56 @@
+import atexit
+import logging
+import multiprocessing
+import os
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor, wait
+
+from services.simulation.RoundShardWorker import warm_worker
+
+logger = logging.getLogger(__name__)
+
+
+class SimulationWorkerPool:
+    # long-lived process pool shared by every simulation request
+    # started on first use (or explicitly by an entry point), so importing the app never spawns processes
+    # workers come from a forkserver where available, so starting from a request thread never forks its threads
+    def __init__(self, workers: int = None):
+        self.workers = workers or os.cpu_count() or 1
+        self.executor = None
+        self.lock = threading.Lock()
+
+    # starts the worker processes and sends one warm-up task per worker to import the engines and fill caches
+    # the executor may hand several warm-up tasks to the same process, so not every worker is guaranteed warm
+    def start(self) -> None:
+        with self.lock:
+            if self.executor is not None:
+                return
+            self.executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=self.get_mp_context())
+            futures = [self.executor.submit(warm_worker) for _ in range(self.workers)]
+            wait(futures)
+            pids = {future.result() for future in futures}
+            logger.info('Simulation worker pool started with %s workers (warm-up ran in %s distinct processes)',
+                        self.workers, len(pids))
+            atexit.register(self.shutdown)
+
+    def submit(self, fn, *args):
+        if self.executor is None:
+            self.start()
+        return self.executor.submit(fn, *args)
+
+    def shutdown(self) -> None:
+        with self.lock:
+            if self.executor is not None:
+                self.executor.shutdown(cancel_futures=True)
+                self.executor = None
+            atexit.unregister(self.shutdown)
+
+    # a forkserver re-imports the main module in each worker, which a script read from stdin or an interactive
+    # session does not have, so those keep the platform default
+    @staticmethod
+    def get_mp_context():
+        main_path = getattr(sys.modules['__main__'], '__file__', None)
+        if 'forkserver' in multiprocessing.get_all_start_methods() and main_path and os.path.isfile(main_path):
+            return multiprocessing.get_context('forkserver')
+        return multiprocessing.get_context()
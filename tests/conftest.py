@@ -8,8 +8,11 @@ from dtos.BasicDto import (
     Call, CallTypeEnum, Game, Round, SuitColorEnum,
 )
 from dtos.SimulationDto import RoundSimulation
+from services.BitmaskRoundService import BitmaskRoundService
 from services.CallService import CallService
 from services.DealingService import DealingService
+from services.ExactRoundService import ExactRoundService
+from services.NumpyRoundService import NumpyRoundService
 from services.GameService import GameService
 from services.PlayService import PlayService
 from services.PlayerService import PlayerService
@@ -18,6 +21,7 @@ from services.ShuffleService import ShuffleService
 from services.TrickService import TrickService
 from services.simulation.RoundSimulationService import RoundSimulationService
 from utils.BasicsUtil import create_player_id_map
+from utils.CardUtil import mask_card_ids
 
 EUCHRE_DECK_SET = set(euchre_deck)
 
@@ -44,6 +48,9 @@ def make_simulation_service():
         call_service=CallService(),
         player_service=PlayerService(),
         round_service=make_round_service(),
+        bitmask_round_service=BitmaskRoundService(),
+        numpy_round_service=NumpyRoundService(),
+        exact_round_service=ExactRoundService(),
     )
 
 
@@ -107,6 +114,11 @@ def run_simulation(player_card_names, trump, caller_id, dealer_id, quantity,
 
 # ---- round introspection ----------------------------------------------------
 
+def mask_to_cards(mask):
+    """Cards set in a hand mask, in card id order."""
+    return [euchre_deck[card_id] for card_id in mask_card_ids[mask]]
+
+
 def played_cards(rd):
     """All cards played in a round, in play order."""
     return [play.card for trick in rd.tricks for play in trick.plays]
@@ -1,17 +1,30 @@
 """Unit tests for individual euchre services: dealing, play selection, and call building."""
+import collections
+import csv
+import os
 import random
+import tempfile
 import unittest
 
 import dtos.BasicDto
 from constants.GameConstants import (
-    euchre_deck, euchre_deck_map, spades, hearts, diamonds, suits,
+    euchre_deck, euchre_deck_map, spades, clubs, hearts, diamonds, suits,
     HAND_MAX_CARD_COUNT,
 )
 from dtos.BasicDto import Call, CallTypeEnum, Hand, Play, Player, SuitColorEnum
 from services.CallService import CallService
 from services.DealingService import DealingService
 from services.PlayService import PlayService
-from utils.CardUtil import get_effective_suit
+from services.RecordService import RecordService
+from constants.GameConstants import card_id_map, suit_id_map, effective_suit_table, rank_table, flat_hierarchy
+from dtos.SimulationDto import RoundSimulationRequest, CardWinTotals, SimulationEngineEnum
+from mappers.SimulationMapper import to_simulation_cache_key
+from utils.CardUtil import get_effective_suit, cards_to_mask, get_card_rank_by_trump_suit
+from utils.LruCache import LruCache
+from utils.PlayLog import PlayLogWriter, read_play_log
+from utils.SuitIsomorphismUtil import suit_permutations, canonicalize, permute_card, permute_card_id, \
+    permute_round_simulation, canonicalize_round_simulation
+from tests.conftest import make_game, make_game_service, mask_to_cards
 
 
 class TestDealing(unittest.TestCase):
@@ -169,6 +182,164 @@ class TestBuildRoundCall(unittest.TestCase):
             result = CallService.build_round_call(base, self.PLAYER_IDS)
             self.assertEqual(result.type, call_type)
 
+    def test_trump_suits_limit_random_suit(self):
+        base = Call(suit=None, type=CallTypeEnum.REGULAR_P2, player_id=0)
+        flipped = euchre_deck_map["queen_of_hearts"]
+        trump_suits = CallService.get_possible_trump_suits(base, flipped)
+        self.assertEqual(set(trump_suits), set(suits) - {hearts})
+        seen_suits = {CallService.build_round_call(base, self.PLAYER_IDS, trump_suits).suit
+                      for _ in range(self.ITERATIONS)}
+        self.assertEqual(seen_suits, set(suits) - {hearts})
+
+    def test_phase_1_trump_is_the_flipped_suit(self):
+        base = Call(suit=None, type=CallTypeEnum.LONER_P1, player_id=3)
+        self.assertEqual(CallService.get_possible_trump_suits(base, euchre_deck_map["nine_of_clubs"]), [clubs])
+        self.assertEqual(CallService.get_possible_trump_suits(base, None), suits)
+
+    def test_call_options_cover_order_up_and_other_suits(self):
+        flipped = euchre_deck_map["queen_of_hearts"]
+        calls = CallService.create_call_options(flipped, 2)
+        self.assertEqual(len(calls), 8)
+        self.assertTrue(all(call.player_id == 2 for call in calls))
+        phase_1 = [call for call in calls if call.type.is_phase_1()]
+        self.assertEqual({call.type for call in phase_1}, {CallTypeEnum.REGULAR_P1, CallTypeEnum.LONER_P1})
+        self.assertTrue(all(call.suit == hearts for call in phase_1))
+        phase_2_suits = {call.suit for call in calls if call.type.is_phase_2()}
+        self.assertEqual(phase_2_suits, set(suits) - {hearts})
+
+
+class TestCardIdTables(unittest.TestCase):
+    """Integer tables must agree with the object-keyed hierarchies."""
+
+    def test_effective_suit_table_matches_card_util(self):
+        for trump in suits:
+            for card in euchre_deck:
+                self.assertEqual(effective_suit_table[suit_id_map[trump]][card_id_map[card]],
+                                 suit_id_map[get_effective_suit(card, trump)])
+
+    def test_rank_table_matches_flat_hierarchy(self):
+        for trump in suits:
+            for play_suit in suits:
+                for card in euchre_deck:
+                    self.assertEqual(
+                        rank_table[suit_id_map[trump]][suit_id_map[play_suit]][card_id_map[card]],
+                        flat_hierarchy[(trump, play_suit)][card])
+
+    def test_mask_round_trip(self):
+        cards = [euchre_deck_map[n] for n in ["nine_of_spades", "jack_of_clubs", "ace_of_diamonds"]]
+        self.assertEqual(mask_to_cards(cards_to_mask(cards)), cards)
+
+
+class TestLruCache(unittest.TestCase):
+    """The cache must evict least-recently-used entries, expire old ones and count both."""
+
+    def test_evicts_least_recently_used(self):
+        cache = LruCache(max_size=2, ttl_seconds=60)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get("a")
+        cache.put("c", 3)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), 1)
+        self.assertEqual(cache.get("c"), 3)
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+    def test_expired_entries_are_misses(self):
+        cache = LruCache(max_size=2, ttl_seconds=0)
+        cache.put("a", 1)
+        self.assertIsNone(cache.get("a"))
+        stats = cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["expirations"]), (0, 1, 1))
+
+
+class TestSimulationCacheKey(unittest.TestCase):
+    """Requests describing the same scenario must share a cache key."""
+
+    def _request(self, names, hands, **overrides):
+        fields = dict(player_names=names, player_hands=hands, dealer_name=names[0], flipped_card="ace_of_spades",
+                      caller_name=names[1], call_suit="spades", call_type="REGULAR_P1", quantity=100,
+                      passing_player_names=[names[2], names[3]])
+        fields.update(overrides)
+        return RoundSimulationRequest(**fields)
+
+    def test_equivalent_requests_share_key(self):
+        first = self._request(["A", "B", "C", "D"], [["nine_of_spades", "jack_of_hearts"], [], [], []])
+        second = self._request(["W", "X", "Y", "Z"], [["JH", "9S"], [], [], []], flipped_card="AS",
+                               call_suit="S", passing_player_names=["Z", "Y"])
+        self.assertEqual(to_simulation_cache_key(first), to_simulation_cache_key(second))
+
+    def test_suit_isomorphic_requests_share_key(self):
+        spades_trump = self._request(["A", "B", "C", "D"], [["JS", "AH"], [], [], []], flipped_card="KS")
+        clubs_trump = self._request(["A", "B", "C", "D"], [["JC", "AD"], [], [], []], flipped_card="KC",
+                                    call_suit="clubs")
+        self.assertEqual(to_simulation_cache_key(spades_trump), to_simulation_cache_key(clubs_trump))
+
+    def test_seeded_suit_isomorphic_requests_differ(self):
+        spades_trump = self._request(["A", "B", "C", "D"], [["JS", "AH"], [], [], []], flipped_card="KS", seed=7)
+        clubs_trump = self._request(["A", "B", "C", "D"], [["JC", "AD"], [], [], []], flipped_card="KC",
+                                    call_suit="clubs", seed=7)
+        self.assertNotEqual(to_simulation_cache_key(spades_trump), to_simulation_cache_key(clubs_trump))
+        same_suits = self._request(["A", "B", "C", "D"], [["AH", "JS"], [], [], []], flipped_card="KS", seed=7)
+        self.assertEqual(to_simulation_cache_key(spades_trump), to_simulation_cache_key(same_suits))
+
+    def test_different_scenarios_differ(self):
+        first = self._request(["A", "B", "C", "D"], [["nine_of_spades"], [], [], []])
+        second = self._request(["A", "B", "C", "D"], [[], ["nine_of_spades"], [], []])
+        self.assertNotEqual(to_simulation_cache_key(first), to_simulation_cache_key(second))
+
+    def test_engine_workers_and_chunk_size_differ(self):
+        request = self._request(["A", "B", "C", "D"], [["nine_of_spades"], [], [], []], seed=7)
+        key = to_simulation_cache_key(request, SimulationEngineEnum.BITMASK, 4)
+        self.assertNotEqual(key, to_simulation_cache_key(request, SimulationEngineEnum.EXACT, 4))
+        self.assertNotEqual(key, to_simulation_cache_key(request, SimulationEngineEnum.BITMASK, 2))
+        self.assertNotEqual(key, to_simulation_cache_key(request, SimulationEngineEnum.BITMASK, 4, 50_000))
+
+
+class TestSuitIsomorphism(unittest.TestCase):
+    """Relabelling suits by a color-preserving symmetry must not change the game."""
+
+    def test_eight_symmetries_keep_partners_paired(self):
+        self.assertEqual(len(set(suit_permutations)), 8)
+        for perm in suit_permutations:
+            for suit_id in range(4):
+                self.assertEqual(perm[suit_id ^ 1], perm[suit_id] ^ 1)
+
+    def test_rank_table_is_invariant(self):
+        for perm in suit_permutations:
+            for trump_id in range(4):
+                for play_suit_id in range(4):
+                    for card_id in range(24):
+                        self.assertEqual(
+                            rank_table[trump_id][play_suit_id][card_id],
+                            rank_table[perm[trump_id]][perm[play_suit_id]][permute_card_id(card_id, perm)])
+
+    def test_equivalent_scenarios_share_canonical_form(self):
+        hands = [[euchre_deck_map[n] for n in ["jack_of_clubs", "ace_of_hearts"]], [],
+                 [euchre_deck_map["nine_of_diamonds"]], []]
+        flipped = euchre_deck_map["king_of_clubs"]
+        expected = canonicalize(hands, flipped, suits[1])
+        for perm in suit_permutations:
+            permuted = canonicalize([[permute_card(c, perm) for c in hand] for hand in hands],
+                                    permute_card(flipped, perm), suits[perm[1]])
+            self.assertEqual((permuted.hands, permuted.flipped_card_id, permuted.call_suit_id),
+                             (expected.hands, expected.flipped_card_id, expected.call_suit_id))
+
+    def test_inverse_permutation_restores_simulation(self):
+        from tests.conftest import make_players
+        from dtos.SimulationDto import RoundSimulation
+        players = make_players()
+        players[0].hand.remaining_cards = [euchre_deck_map["ten_of_hearts"], euchre_deck_map["jack_of_spades"]]
+        sim = RoundSimulation(players=players, call=Call(suit=hearts, type=CallTypeEnum.REGULAR_P2, player_id=1),
+                              rounds=[], flipped_card=euchre_deck_map["queen_of_diamonds"])
+        form = canonicalize_round_simulation(sim)
+        canonical = permute_round_simulation(sim, form.suit_permutation)
+        self.assertEqual(canonicalize_round_simulation(canonical).suit_permutation, (0, 1, 2, 3))
+        restored = permute_round_simulation(canonical, form.inverse_permutation)
+        self.assertEqual(restored.players[0].hand.remaining_cards, players[0].hand.remaining_cards)
+        self.assertEqual(restored.flipped_card, sim.flipped_card)
+        self.assertEqual(restored.call.suit, hearts)
+
+
 class TestTrickResolution(unittest.TestCase):
     """Direct tests for TrickService.update_play_results()."""
 
@@ -242,5 +413,113 @@ class TestTrickResolution(unittest.TestCase):
         self.assertIs(trick.winning_play, lead)
 
 
+class TestPlayLog(unittest.TestCase):
+    """Binary play logs must hold the same plays as the csv rows and convert from existing csvs."""
+
+    def setUp(self):
+        random.seed(6)
+        self.games = []
+        for game_id in (1, 2):
+            game = make_game()
+            game.id = game_id
+            make_game_service().play_game(game)
+            self.games.append(game)
+        self.player_names = {p.id: p.name for p in self.games[0].players}
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_log_matches_csv_rows(self):
+        log_file = os.path.join(self.directory.name, 'games.log')
+        with PlayLogWriter(log_file, self.player_names) as writer:
+            for game in self.games:
+                RecordService.record_games_to_log([game], writer)
+
+        player_names, records = read_play_log(log_file)
+        rows = RecordService.generate_rows_to_write(self.games)
+        self.assertEqual(player_names, self.player_names)
+        self.assertEqual(len(records), len(rows))
+        for record, row in zip(records, rows):
+            self.assertEqual((record['game_id'], record['round_id'], record['trick_id']), tuple(row[:3]))
+            self.assertEqual(player_names[record['player_id']], row[7])
+            self.assertEqual(player_names[record['winner_id']], row[13])
+            self.assertEqual(str(euchre_deck[record['card_id']]), f'{row[9]}_of_{row[10]}'.lower())
+            self.assertEqual((record['play_card_rank'], record['card_rank']), tuple(row[11:13]))
+
+    def test_csv_converts_to_same_log(self):
+        csv_file = os.path.join(self.directory.name, 'games.csv')
+        log_file = os.path.join(self.directory.name, 'games.log')
+        converted_file = os.path.join(self.directory.name, 'converted.log')
+        RecordService.record_games(self.games, csv_file)
+        with PlayLogWriter(log_file, self.player_names) as writer:
+            RecordService.record_games_to_log(self.games, writer)
+
+        count = RecordService.convert_csv_to_play_log(csv_file, converted_file, self.player_names, batch_size=100)
+        self.assertEqual(read_play_log(converted_file)[1].tolist(), read_play_log(log_file)[1].tolist())
+        self.assertEqual(count, len(read_play_log(log_file)[1]))
+
+    def test_appending_requires_same_players(self):
+        log_file = os.path.join(self.directory.name, 'games.log')
+        PlayLogWriter(log_file, self.player_names).close()
+        self.assertEqual(len(read_play_log(log_file)[1]), 0)
+        with self.assertRaises(ValueError):
+            PlayLogWriter(log_file, {1: 'Someone Else'})
+
+    def test_names_longer_than_header_field_rejected(self):
+        log_file = os.path.join(self.directory.name, 'games.log')
+        with self.assertRaises(ValueError):
+            PlayLogWriter(log_file, {1: 'é' * 17})
+        self.assertFalse(os.path.exists(log_file))
+        names = {1: 'é' * 16, 2: 'B', 3: 'C', 4: 'D'}
+        PlayLogWriter(log_file, names).close()
+        PlayLogWriter(log_file, names).close()
+        self.assertEqual(read_play_log(log_file)[0], names)
+
+
+class TestCardWinTotals(unittest.TestCase):
+    """Array-based card win counts must match counting every play by its rank for the trump suit."""
+
+    def setUp(self):
+        random.seed(10)
+        self.game = make_game()
+        make_game_service().play_game(self.game)
+
+    def _expected(self):
+        plays, wins = collections.Counter(), collections.Counter()
+        for euchre_round in self.game.rounds:
+            for trick in euchre_round.tricks:
+                for play in trick.plays:
+                    card_rank = get_card_rank_by_trump_suit(play.card, trick.call.suit)
+                    plays[card_rank] += 1
+                    wins[card_rank] += trick.winning_play is play
+        return plays, wins
+
+    def test_card_id_arrays_match_play_ranks(self):
+        plays, wins = self._expected()
+        records = RecordService.generate_play_records([self.game])
+        totals = CardWinTotals.create()
+        RecordService.update_card_win_totals(totals, records['trump_id'], records['card_id'],
+                                             records['player_id'] == records['winner_id'])
+        self.assertEqual({rank: int(count) for rank, count in enumerate(totals.plays) if count}, dict(plays))
+        self.assertEqual({rank: int(count) for rank, count in enumerate(totals.wins) if count},
+                         {rank: count for rank, count in wins.items() if count})
+
+    def test_probabilities_written_per_rank(self):
+        totals = CardWinTotals.create()
+        records = RecordService.generate_play_records([self.game])
+        RecordService.update_card_win_totals(totals, records['trump_id'], records['card_id'],
+                                             records['player_id'] == records['winner_id'])
+        with tempfile.TemporaryDirectory() as directory:
+            csv_file = os.path.join(directory, 'win-probs.csv')
+            RecordService.output_card_win_probabilities(csv_file, totals)
+            with open(csv_file) as f:
+                rows = list(csv.reader(f))
+        self.assertEqual(rows[0], ['card_rank', 'wins', 'plays', 'win_prob'])
+        for card_rank, card_wins, card_plays, win_prob in rows[1:]:
+            self.assertEqual(int(card_plays), totals.plays[int(card_rank)])
+            self.assertAlmostEqual(float(win_prob), int(card_wins) / int(card_plays), places=2)
+
+
 if __name__ == "__main__":
     unittest.main()
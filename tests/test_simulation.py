@@ -1,15 +1,37 @@
 """Integration tests for euchre round and multi-round simulation."""
+import os
 import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
 import unittest
 
+import numpy as np
+
 from constants.GameConstants import (
-    euchre_deck_map, spades, clubs, hearts, diamonds,
+    euchre_deck_map, spades, clubs, hearts, diamonds, card_id_map, suit_id_map,
 )
 from dtos.BasicDto import Call, CallTypeEnum, SuitColorEnum
-from dtos.SimulationDto import RoundSimulation
+from dtos.SimulationDto import RoundSimulation, SimulationEngineEnum, SimulationJobStatusEnum, RoundSimulationBatch, \
+    CallDecision, DiscardDecision, RoundTotals, SimulationOutputEnum, RoundStore, GameSimulation, \
+    CardWinTotals, CallOption, call_types, DEFAULT_SIMULATION_OUTPUTS
+from services.BitmaskRoundService import BitmaskRoundService
+from services.CallService import CallService
+from services.ExactRoundService import ExactRoundService
+from services.NumpyRoundService import NumpyRoundService
+from services.RecordService import RecordService
+from services.simulation.CallDecisionService import CallDecisionService
+from services.simulation.GameSimulationService import GameSimulationService
+from services.simulation.SimulationJobService import SimulationJobService
+from services.simulation.SimulationWorkerPool import SimulationWorkerPool
+from utils.PlayLog import read_play_log
+from utils.BasicsUtil import create_player_id_map, create_next_player_map
 from tests.conftest import (
     assert_valid_round,
     build_round,
+    deal_full_hands,
     make_game,
     make_game_service,
     make_players,
@@ -61,10 +83,89 @@ class TestRound(unittest.TestCase):
         self.assertEqual(rd.tricks_won_map[SuitColorEnum.BLACK], 5)
         self.assertEqual(rd.points_won_map[SuitColorEnum.BLACK], 2)
 
+    def test_stops_once_points_are_decided(self):
+        random.seed(5)
+        stopped = 0
+        for _ in range(100):
+            players = make_players()
+            rd = build_round(players, spades, 1, 1)
+            make_round_service().play_round(rd, stop_when_decided=True)
+            calling_tricks = rd.tricks_won_map[SuitColorEnum.BLACK]
+            defending_tricks = rd.tricks_won_map[SuitColorEnum.RED]
+            if len(rd.tricks) < 5:
+                stopped += 1
+                self.assertTrue(defending_tricks == 3 or (calling_tricks == 3 and defending_tricks >= 1))
+                self.assertIn(tuple(rd.points_won_map.values()), {(1, 0), (0, 2)})
+        self.assertGreater(stopped, 0)
+
+    def test_pooled_round_is_reset_between_rounds(self):
+        svc = make_round_service()
+        players = make_players()
+        pool = svc.create_round_pool(players, create_player_id_map(players))
+        for round_id, trump in enumerate([spades, hearts, clubs], start=1):
+            deal_full_hands(players)
+            call = Call(suit=trump, type=CallTypeEnum.REGULAR_P1, player_id=1)
+            rd = svc.reset_round(pool, euchre_deck_map["ace_of_hearts"], call, round_id, 1)
+            svc.play_round(rd, pool=pool)
+            self.assertIs(rd, pool.round)
+            assert_valid_round(self, rd)
+            self.assertEqual(sum(rd.tricks_won_map.values()), 5)
+            self.assertEqual([trick.id for trick in rd.tricks], [1, 2, 3, 4, 5])
+
+
+class TestRoundStore(unittest.TestCase):
+    """Stored rounds must rebuild into the rounds that were played."""
+
+    def test_views_match_played_rounds(self):
+        random.seed(4)
+        players = make_players()
+        player_id_map = create_player_id_map(players)
+        store = RoundStore.create(players, create_next_player_map(player_id_map), capacity=1)
+        played = []
+        for trump in (spades, hearts, clubs):
+            rd = build_round(players, trump, caller_id=2, dealer_id=3)
+            make_round_service().play_round(rd)
+            store.append(rd)
+            played.append(rd)
+
+        self.assertEqual(len(store), 3)
+        self.assertEqual(store.get_row_bytes(), 32)
+        for index, rd in enumerate(played):
+            view = store[index]
+            self.assertEqual(view.id, index + 1)
+            self.assertEqual((view.call.suit, view.call.type, view.call.player_id),
+                             (rd.call.suit, rd.call.type, rd.call.player_id))
+            self.assertEqual((view.dealer_id, view.flipped_card), (rd.dealer_id, rd.flipped_card))
+            self.assertEqual(view.points_won_map, rd.points_won_map)
+            self.assertEqual(view.tricks_won_map, rd.tricks_won_map)
+            self.assertEqual(played_cards_by_player(view), played_cards_by_player(rd))
+            for view_trick, trick in zip(view.tricks, rd.tricks):
+                self.assertEqual([play.card for play in view_trick.plays], [play.card for play in trick.plays])
+                self.assertIs(view_trick.winning_play.player, trick.winning_play.player)
+                self.assertEqual((view_trick.play_suit, view_trick.leader_id), (trick.play_suit, trick.leader_id))
+            assert_valid_round(self, view)
+
 
 class TestSimulation(unittest.TestCase):
     """Multi-round simulation must produce independent, valid rounds."""
 
+    def test_pooled_rounds_match_kept_rounds(self):
+        """Reusing one pooled round must not change the random stream or the totals."""
+        results = []
+        for keep_rounds in (True, False):
+            random.seed(3)
+            sim = make_simulation_service().simulate(RoundSimulation(
+                players=make_players(),
+                call=Call(suit=spades, type=CallTypeEnum.REGULAR_P1, player_id=1),
+                rounds=[],
+                flipped_card=None,
+                quantity=300,
+                keep_rounds=keep_rounds,
+            ))
+            results.append((sim.total_points, sim.total_wins, sim.total_tricks_by_player))
+            self.assertEqual(len(sim.rounds), 300 if keep_rounds else 0)
+        self.assertEqual(results[0], results[1])
+
     def test_round_structural_integrity(self):
         """Every round in a large sim must pass all structural invariants."""
         sim = run_simulation([[], [], [], []], spades, 1, 1, quantity=200)
@@ -266,6 +367,687 @@ class TestRandomFlippedCard(unittest.TestCase):
                                msg=f"Win rates vary too much by 9's suit: {win_rates}")
 
 
+class TestBitmaskEngine(unittest.TestCase):
+    """The bitmask engine must reproduce the statistics of the object engine."""
+
+    ENGINE = SimulationEngineEnum.BITMASK
+
+    def _simulate(self, engine, quantity, caller_cards=(), call_type=CallTypeEnum.REGULAR_P1,
+                  trump=spades, caller_id=1, dealer_id=0, flipped=None):
+        svc = make_simulation_service()
+        players = make_players()
+        players[caller_id - 1].hand.remaining_cards = [euchre_deck_map[n] for n in caller_cards]
+        return svc.simulate(RoundSimulation(
+            players=players,
+            call=Call(suit=trump, type=call_type, player_id=caller_id),
+            rounds=[],
+            flipped_card=euchre_deck_map[flipped] if flipped else None,
+            quantity=quantity,
+            dealer_id=dealer_id,
+            engine=engine,
+        ))
+
+    def test_top_five_trump_always_sweep(self):
+        sim = self._simulate(self.ENGINE, 500,
+                             ["jack_of_spades", "jack_of_clubs", "ace_of_spades",
+                              "king_of_spades", "queen_of_spades"])
+        self.assertEqual(sim.total_points[SuitColorEnum.BLACK], 1000)
+        self.assertEqual(sim.total_wins[SuitColorEnum.RED], 0)
+        self.assertEqual(sim.total_tricks_by_player[1], 2500)
+
+    def test_loner_sweep_scores_four_points(self):
+        sim = self._simulate(self.ENGINE, 200,
+                             ["jack_of_hearts", "jack_of_diamonds", "ace_of_hearts",
+                              "king_of_hearts", "queen_of_hearts"],
+                             call_type=CallTypeEnum.LONER_P1, trump=hearts, flipped="ten_of_hearts")
+        self.assertEqual(sim.total_points[SuitColorEnum.BLACK], 800)
+        self.assertEqual(set(sim.total_tricks_by_player), {1, 2, 4})
+
+    def test_totals_are_consistent(self):
+        sim = self._simulate(self.ENGINE, 1000, trump=None, caller_id=2)
+        self.assertEqual(sum(sim.total_wins.values()), 1000)
+        self.assertEqual(sum(sim.total_tricks_by_player.values()), 5000)
+
+    def test_matches_object_engine_statistics(self):
+        cards = ["jack_of_spades", "ace_of_hearts", "king_of_spades", "nine_of_clubs", "ten_of_diamonds"]
+        random.seed(11)
+        expected = self._simulate(SimulationEngineEnum.OBJECT, 4000, cards)
+        actual = self._simulate(self.ENGINE, 20000, cards)
+        for team in (SuitColorEnum.BLACK, SuitColorEnum.RED):
+            self.assertAlmostEqual(expected.total_wins[team] / 4000, actual.total_wins[team] / 20000, delta=0.04)
+            self.assertAlmostEqual(expected.total_points[team] / 4000, actual.total_points[team] / 20000,
+                                   delta=0.08)
+        for pid in range(1, 5):
+            self.assertAlmostEqual(expected.total_tricks_by_player[pid] / 4000,
+                                   actual.total_tricks_by_player[pid] / 20000, delta=0.08)
+
+
+class TestNumpyEngine(TestBitmaskEngine):
+    """The batched NumPy engine must reproduce the statistics of the object engine."""
+
+    ENGINE = SimulationEngineEnum.NUMPY
+
+    def test_random_dealer_and_passing_players(self):
+        svc = make_simulation_service()
+        sim = svc.simulate(RoundSimulation(
+            players=make_players(),
+            call=Call(suit=None, type=CallTypeEnum.REGULAR_P2, player_id=0),
+            rounds=[],
+            flipped_card=None,
+            quantity=3000,
+            passing_player_ids=[2, 4],
+            engine=self.ENGINE,
+        ))
+        # only the black team can call, so red only scores by euchring them
+        self.assertEqual(sim.total_points[SuitColorEnum.RED], 2 * sim.total_wins[SuitColorEnum.RED])
+        self.assertEqual(sum(sim.total_tricks_by_player.values()), 15000)
+
+
+class TestStratifiedEngine(TestNumpyEngine):
+    """Stratified choices and antithetic deals keep the numpy engine's statistics with less noise."""
+
+    ENGINE = SimulationEngineEnum.STRATIFIED
+
+    def _setup(self, hands=None):
+        players = make_players()
+        for player_id, cards in (hands or {}).items():
+            players[player_id - 1].hand.remaining_cards = [euchre_deck_map[n] for n in cards]
+        return BitmaskRoundService.create_setup(players, None, None, 0, [])
+
+    def test_strata_cover_every_random_choice(self):
+        strata = NumpyRoundService.get_strata_draws(self._setup())
+        choices = {tuple(int(draw * 4) for draw in row) for row in strata}
+        self.assertEqual(len(strata), 64)
+        self.assertEqual(len(choices), 64)
+
+    def test_twin_deal_swaps_opposite_team_seats(self):
+        setup = self._setup()
+        positions = NumpyRoundService.get_antithetic_positions(setup)
+        self.assertEqual(sorted(positions), list(range(len(setup.unassigned_card_ids))))
+        # seat 1 (black) is dealt the first 5 positions and trades them with seat 2 (red)
+        self.assertEqual(list(positions[:5]), list(range(5, 10)))
+
+    def test_no_twin_without_opposite_seats_to_swap(self):
+        five_cards = ["nine_of_spades", "ten_of_spades", "queen_of_spades", "king_of_spades", "ace_of_spades"]
+        five_more = ["nine_of_hearts", "ten_of_hearts", "queen_of_hearts", "king_of_hearts", "ace_of_hearts"]
+        setup = self._setup({1: five_cards, 3: five_more})
+        positions = NumpyRoundService.get_antithetic_positions(setup)
+        self.assertEqual(list(positions), list(range(len(setup.unassigned_card_ids))))
+        totals = NumpyRoundService().play_rounds_stratified(setup, 999, RoundTotals.create(),
+                                                            np.random.default_rng(0))
+        self.assertEqual(totals.rounds, 999)
+
+    def test_plays_exact_quantity_off_whole_strata(self):
+        totals = NumpyRoundService().play_rounds_stratified(self._setup(), 1_001, RoundTotals.create(),
+                                                            np.random.default_rng(0), block_size=300)
+        self.assertEqual(totals.rounds, 1_001)
+        self.assertEqual(sum(totals.wins), 1_001)
+
+    def test_lower_variance_when_choices_are_random(self):
+        setup = self._setup()
+        svc = NumpyRoundService()
+
+        def black_win_rates(play_rounds):
+            rates = []
+            for seed in range(40):
+                totals = play_rounds(setup, 2_048, RoundTotals.create(), np.random.default_rng(seed))
+                rates.append(totals.wins[0] / totals.rounds)
+            return rates
+
+        plain = black_win_rates(svc.play_rounds)
+        stratified = black_win_rates(svc.play_rounds_stratified)
+        self.assertAlmostEqual(statistics.mean(stratified), 0.5, delta=0.01)
+        self.assertGreater(statistics.variance(plain), 1.5 * statistics.variance(stratified))
+
+
+class TestExactEngine(unittest.TestCase):
+    """Exact evaluation averages every random play of a deal, matching the sampled engines without play noise."""
+
+    HANDS = {
+        1: ["jack_of_spades", "ace_of_hearts", "king_of_spades", "nine_of_clubs", "ten_of_diamonds"],
+        2: ["jack_of_clubs", "queen_of_hearts", "nine_of_spades", "ace_of_clubs", "king_of_diamonds"],
+        3: ["ace_of_spades", "ten_of_hearts", "queen_of_clubs", "jack_of_diamonds", "nine_of_diamonds"],
+        4: ["queen_of_spades", "king_of_hearts", "ten_of_clubs", "king_of_clubs", "ace_of_diamonds"],
+    }
+
+    def _simulation(self, engine, quantity, call_type=CallTypeEnum.REGULAR_P2, caller_id=2, hands=HANDS):
+        players = make_players()
+        for player in players:
+            player.hand.remaining_cards = [euchre_deck_map[n] for n in hands.get(player.id, [])]
+        return RoundSimulation(
+            players=players,
+            call=Call(suit=spades, type=call_type, player_id=caller_id),
+            rounds=[],
+            flipped_card=None,
+            quantity=quantity,
+            dealer_id=4,
+            engine=engine,
+        )
+
+    def _evaluate(self, simulation):
+        svc = make_simulation_service()
+        svc.prepare_players(simulation)
+        setup = svc.create_setup(simulation)
+        hands = list(setup.fixed_masks)
+        return ExactRoundService.evaluate_deal(setup, hands, setup.trump_id, setup.next_player_ids[4],
+                                               setup.team_ids[setup.caller_id])
+
+    def test_distribution_is_consistent(self):
+        outcome = self._evaluate(self._simulation(SimulationEngineEnum.EXACT, 1))
+        self.assertAlmostEqual(sum(outcome.calling_team_trick_probs), 1.0)
+        self.assertAlmostEqual(sum(outcome.expected_tricks_by_player), 5.0)
+
+    def test_top_five_trump_always_sweep(self):
+        top_trump = ["jack_of_spades", "jack_of_clubs", "ace_of_spades", "king_of_spades", "queen_of_spades"]
+        others = [name for name in euchre_deck_map if name not in top_trump]
+        hands = {1: top_trump, 2: others[0:5], 3: others[5:10], 4: others[10:15]}
+        outcome = self._evaluate(self._simulation(SimulationEngineEnum.EXACT, 1, caller_id=1, hands=hands))
+        self.assertEqual(outcome.calling_team_trick_probs, (0.0, 0.0, 0.0, 0.0, 0.0, 1.0))
+
+    def test_known_deal_matches_sampled_play(self):
+        for call_type, caller_id in ((CallTypeEnum.REGULAR_P2, 2), (CallTypeEnum.LONER_P2, 3)):
+            exact = make_simulation_service().simulate(self._simulation(SimulationEngineEnum.EXACT, 2, call_type,
+                                                                        caller_id))
+            sampled = make_simulation_service().simulate(self._simulation(SimulationEngineEnum.BITMASK, 40_000,
+                                                                          call_type, caller_id))
+            self.assertEqual(exact.rounds_completed, 2)
+            for team in (SuitColorEnum.BLACK, SuitColorEnum.RED):
+                self.assertAlmostEqual(exact.total_wins[team] / 2, sampled.total_wins[team] / 40_000, delta=0.015)
+                self.assertAlmostEqual(exact.total_points[team] / 2, sampled.total_points[team] / 40_000,
+                                       delta=0.04)
+            for pid in exact.total_tricks_by_player:
+                self.assertAlmostEqual(exact.total_tricks_by_player[pid] / 2,
+                                       sampled.total_tricks_by_player[pid] / 40_000, delta=0.03)
+
+    def test_sampled_deals_add_up(self):
+        sim = make_simulation_service().simulate(self._simulation(SimulationEngineEnum.EXACT, 5, hands={}))
+        self.assertEqual(sim.rounds_completed, 5)
+        self.assertAlmostEqual(sum(sim.total_wins.values()), 5)
+        self.assertAlmostEqual(sum(sim.total_tricks_by_player.values()), 25)
+
+
+class TestSimulationOutputs(unittest.TestCase):
+    """Unrequested outputs are skipped: without trick statistics rounds stop once decided."""
+
+    def _simulate(self, engine, quantity, outputs):
+        random.seed(2)
+        return make_simulation_service().simulate(RoundSimulation(
+            players=make_players(),
+            call=Call(suit=spades, type=CallTypeEnum.REGULAR_P1, player_id=1),
+            rounds=[],
+            flipped_card=None,
+            quantity=quantity,
+            engine=engine,
+            seed=2,
+            outputs=outputs,
+        ))
+
+    def test_skips_decided_tricks(self):
+        for engine, quantity in ((SimulationEngineEnum.OBJECT, 2_000), (SimulationEngineEnum.BITMASK, 20_000)):
+            full = self._simulate(engine, quantity, frozenset(SimulationOutputEnum))
+            short = self._simulate(engine, quantity, frozenset({SimulationOutputEnum.AVG_POINTS,
+                                                                SimulationOutputEnum.WIN_PROB}))
+            self.assertEqual(sum(short.total_wins.values()), quantity, engine)
+            self.assertLess(sum(short.total_tricks_by_player.values()), 0.95 * 5 * quantity, engine)
+            # stopping early consumes fewer random draws, so the two runs are independent samples
+            for team in (SuitColorEnum.BLACK, SuitColorEnum.RED):
+                self.assertAlmostEqual(full.total_points[team] / quantity, short.total_points[team] / quantity,
+                                       delta=0.1 if engine == SimulationEngineEnum.OBJECT else 0.03)
+
+    def test_object_engine_skips_unrequested_totals(self):
+        sim = self._simulate(SimulationEngineEnum.OBJECT, 200, frozenset({SimulationOutputEnum.WIN_PROB}))
+        self.assertEqual(sum(sim.total_wins.values()), 200)
+        self.assertEqual(sum(sim.total_points.values()), 0)
+        self.assertEqual(sum(sim.total_tricks_by_player.values()), 0)
+
+    def test_histograms_match_totals(self):
+        engines = ((SimulationEngineEnum.OBJECT, 500), (SimulationEngineEnum.BITMASK, 5_000),
+                   (SimulationEngineEnum.NUMPY, 5_000), (SimulationEngineEnum.EXACT, 10))
+        for engine, quantity in engines:
+            sim = self._simulate(engine, quantity, frozenset(SimulationOutputEnum))
+            for team in (SuitColorEnum.BLACK, SuitColorEnum.RED):
+                points_histogram = sim.total_points_histogram[team]
+                tricks_histogram = sim.total_tricks_histogram[team]
+                self.assertAlmostEqual(sum(points_histogram), quantity, msg=engine)
+                self.assertAlmostEqual(sum(tricks_histogram), quantity, msg=engine)
+                self.assertAlmostEqual(sum(points * count for points, count in enumerate(points_histogram)),
+                                       sim.total_points[team], msg=engine)
+                if engine != SimulationEngineEnum.EXACT:  # exact totals square each deal's expected points
+                    self.assertEqual(sum(points * points * count for points, count in enumerate(points_histogram)),
+                                     sim.total_points_squared[team], engine)
+                self.assertAlmostEqual(quantity - points_histogram[0], sim.total_wins[team], msg=engine)
+            black_tricks = sum(tricks for pid, tricks in sim.total_tricks_by_player.items() if pid % 2)
+            self.assertAlmostEqual(sum(tricks * count for tricks, count
+                                       in enumerate(sim.total_tricks_histogram[SuitColorEnum.BLACK])),
+                                   black_tricks, msg=engine)
+            for player_id, tricks in sim.total_tricks_by_player.items():
+                self.assertGreaterEqual(sim.total_tricks_squared_by_player[player_id], tricks - 1e-9, engine)
+
+
+class TestShardedSimulation(unittest.TestCase):
+    """Sharded runs must be reproducible per seed and merge every shard's totals."""
+
+    def _simulate(self, quantity, workers, seed, engine=SimulationEngineEnum.BITMASK):
+        players = make_players()
+        players[0].hand.remaining_cards = [euchre_deck_map["jack_of_spades"], euchre_deck_map["ace_of_spades"]]
+        return make_simulation_service().simulate(RoundSimulation(
+            players=players,
+            call=Call(suit=spades, type=CallTypeEnum.REGULAR_P1, player_id=1),
+            rounds=[],
+            flipped_card=None,
+            quantity=quantity,
+            engine=engine,
+            workers=workers,
+            seed=seed,
+        ))
+
+    def test_same_seed_reproduces_results(self):
+        for engine in (SimulationEngineEnum.BITMASK, SimulationEngineEnum.NUMPY):
+            first = self._simulate(25_000, 3, seed=7, engine=engine)
+            second = self._simulate(25_000, 3, seed=7, engine=engine)
+            self.assertEqual(first.total_points, second.total_points)
+            self.assertEqual(first.total_tricks_by_player, second.total_tricks_by_player)
+
+    def test_shards_cover_every_round(self):
+        sim = self._simulate(25_001, 3, seed=1)
+        self.assertEqual(sum(sim.total_wins.values()), 25_001)
+        self.assertEqual(sum(sim.total_tricks_by_player.values()), 5 * 25_001)
+
+    def test_sharded_matches_serial_statistics(self):
+        serial = self._simulate(30_000, 1, seed=3)
+        sharded = self._simulate(30_000, 3, seed=3)
+        for team in (SuitColorEnum.BLACK, SuitColorEnum.RED):
+            self.assertAlmostEqual(serial.total_wins[team] / 30_000, sharded.total_wins[team] / 30_000,
+                                   delta=0.02)
+
+
+class TestWorkerPool(unittest.TestCase):
+    """A persistent worker pool must give the same results as in-process simulation."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.pool = SimulationWorkerPool(2)
+        cls.pool.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.pool.shutdown()
+
+    def _simulate(self, svc, quantity, seed):
+        return svc.simulate(RoundSimulation(
+            players=make_players(),
+            call=Call(suit=hearts, type=CallTypeEnum.REGULAR_P2, player_id=2),
+            rounds=[],
+            flipped_card=None,
+            quantity=quantity,
+            engine=SimulationEngineEnum.BITMASK,
+            seed=seed,
+        ))
+
+    def test_pooled_single_shard_matches_in_process(self):
+        pooled_svc = make_simulation_service()
+        pooled_svc.worker_pool = self.pool
+        pooled = self._simulate(pooled_svc, 2_000, seed=5)
+        local = self._simulate(make_simulation_service(), 2_000, seed=5)
+        self.assertEqual(pooled.total_points, local.total_points)
+        self.assertEqual(pooled.total_tricks_by_player, local.total_tricks_by_player)
+
+    def test_pool_is_reused_across_simulations(self):
+        svc = make_simulation_service()
+        svc.worker_pool = self.pool
+        executor = self.pool.executor
+        for _ in range(3):
+            sim = self._simulate(svc, 1_000, seed=None)
+            self.assertEqual(sum(sim.total_wins.values()), 1_000)
+        self.assertIs(self.pool.executor, executor)
+
+    def test_pool_starts_on_first_submit(self):
+        pool = SimulationWorkerPool(1)
+        self.assertIsNone(pool.executor)
+        try:
+            self.assertEqual(pool.submit(sum, [1, 2]).result(), 3)
+            self.assertIsNotNone(pool.executor)
+        finally:
+            pool.shutdown()
+        self.assertIsNone(pool.executor)
+
+    def test_pool_runs_from_a_script_read_from_stdin(self):
+        script = ('from services.simulation.SimulationWorkerPool import SimulationWorkerPool\n'
+                  'pool = SimulationWorkerPool(1)\n'
+                  'print(pool.submit(sum, [1, 2]).result())\n'
+                  'pool.shutdown()\n')
+        result = subprocess.run([sys.executable, '-'], input=script, capture_output=True, text=True, timeout=60,
+                                cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        self.assertEqual(result.stdout.strip(), '3', result.stderr)
+
+    def test_importing_the_api_starts_no_workers(self):
+        script = 'import RoundSimulationApi as api; print(api.simulation_worker_pool.executor is None)'
+        result = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True, timeout=60,
+                                cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        self.assertEqual(result.stdout.strip(), 'True', result.stderr)
+
+    def test_server_entry_point_warms_workers(self):
+        script = ('import RoundSimulationApi as api; app = api.create_app(); '
+                  'print(app is api.app, api.simulation_worker_pool.executor is not None)')
+        result = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True, timeout=60,
+                                cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        self.assertEqual(result.stdout.strip(), 'True True', result.stderr)
+
+
+class TestAdaptiveSimulation(unittest.TestCase):
+    """Adaptive runs stop once the confidence interval target is met, never past the ceiling."""
+
+    def _simulate(self, quantity, engine=SimulationEngineEnum.BITMASK, **targets):
+        return make_simulation_service().simulate(RoundSimulation(
+            players=make_players(),
+            call=Call(suit=spades, type=CallTypeEnum.REGULAR_P1, player_id=1),
+            rounds=[],
+            flipped_card=None,
+            quantity=quantity,
+            engine=engine,
+            seed=4,
+            **targets,
+        ))
+
+    def test_stops_once_win_prob_target_met(self):
+        sim = self._simulate(1_000_000, target_win_prob_ci=0.01)
+        self.assertLess(sim.rounds_completed, 1_000_000)
+        self.assertEqual(sum(sim.total_wins.values()), sim.rounds_completed)
+        p = sim.total_wins[SuitColorEnum.BLACK] / sim.rounds_completed
+        self.assertLessEqual(1.96 * (p * (1 - p) / sim.rounds_completed) ** 0.5, 0.01)
+
+    def test_points_target_needs_more_rounds_than_loose_target(self):
+        loose = self._simulate(1_000_000, target_avg_points_ci=0.05)
+        tight = self._simulate(1_000_000, target_avg_points_ci=0.015)
+        self.assertLess(loose.rounds_completed, tight.rounds_completed)
+
+    def test_honors_quantity_ceiling(self):
+        sim = self._simulate(5_000, target_win_prob_ci=0.0001)
+        self.assertEqual(sim.rounds_completed, 5_000)
+
+    def test_object_engine_stops_once_target_met(self):
+        sim = self._simulate(100_000, SimulationEngineEnum.OBJECT, target_win_prob_ci=0.02,
+                             outputs=frozenset({SimulationOutputEnum.AVG_POINTS}))
+        self.assertEqual(sim.rounds_completed, 10_000)
+        self.assertEqual(sum(sim.total_wins.values()), 10_000)
+
+    def test_exact_engine_needs_fewer_rounds_before_first_check(self):
+        sim = self._simulate(2_000, SimulationEngineEnum.EXACT, target_win_prob_ci=0.2)
+        self.assertLess(sim.rounds_completed, 1_000)
+
+
+class TestTimeBudgetSimulation(unittest.TestCase):
+    """Time-budgeted runs stop near the deadline and report the rounds they actually played."""
+
+    def _simulate(self, engine, quantity, time_budget_ms):
+        return make_simulation_service().simulate(RoundSimulation(
+            players=make_players(),
+            call=Call(suit=spades, type=CallTypeEnum.REGULAR_P1, player_id=1),
+            rounds=[],
+            flipped_card=None,
+            quantity=quantity,
+            engine=engine,
+            time_budget_ms=time_budget_ms,
+        ))
+
+    def test_stops_at_deadline(self):
+        for engine in SimulationEngineEnum:
+            start = time.time()
+            sim = self._simulate(engine, 10_000_000, 200)
+            elapsed = time.time() - start
+            self.assertLess(elapsed, 1.0, engine)
+            self.assertGreater(sim.rounds_completed, 0, engine)
+            self.assertLess(sim.rounds_completed, 10_000_000, engine)
+            # the exact engine sums fractional expected wins
+            self.assertAlmostEqual(sum(sim.total_wins.values()), sim.rounds_completed, msg=engine)
+            self.assertGreater(sim.rounds_per_sec, 0, engine)
+
+    def test_honors_quantity_ceiling(self):
+        sim = self._simulate(SimulationEngineEnum.BITMASK, 500, 10_000)
+        self.assertEqual(sim.rounds_completed, 500)
+
+
+class TestBatchSimulation(unittest.TestCase):
+    """Batch scenarios share deals and play draws, so scenario differences have far less noise."""
+
+    def _scenario(self, card_name, caller_id=1):
+        players = make_players()
+        players[0].hand.remaining_cards = [euchre_deck_map["jack_of_spades"], euchre_deck_map[card_name]]
+        return RoundSimulation(
+            players=players,
+            call=Call(suit=spades, type=CallTypeEnum.REGULAR_P2, player_id=caller_id),
+            rounds=[],
+            flipped_card=None,
+            dealer_id=4,
+        )
+
+    def _batch(self, scenarios, quantity, seed):
+        return make_simulation_service().simulate_batch(
+            RoundSimulationBatch(simulations=scenarios, quantity=quantity, seed=seed))
+
+    def test_identical_scenarios_get_identical_totals(self):
+        batch = self._batch([self._scenario("ace_of_hearts"), self._scenario("ace_of_hearts")], 3_000, 1)
+        first, second = batch.simulations
+        self.assertEqual(first.total_points, second.total_points)
+        self.assertEqual(first.total_tricks_by_player, second.total_tricks_by_player)
+        self.assertEqual(first.rounds_completed, 3_000)
+
+    def test_changing_only_the_caller_keeps_every_trick(self):
+        batch = self._batch([self._scenario("ace_of_hearts", 1), self._scenario("ace_of_hearts", 3)], 3_000, 2)
+        self.assertEqual(batch.simulations[0].total_tricks_by_player, batch.simulations[1].total_tricks_by_player)
+
+    def test_common_random_numbers_reduce_difference_variance(self):
+        def black_wins(simulation):
+            return simulation.total_wins[SuitColorEnum.BLACK]
+
+        shared, independent = [], []
+        for seed in range(15):
+            strong, weak = self._batch([self._scenario("ace_of_hearts"), self._scenario("nine_of_hearts")],
+                                       1_000, seed).simulations
+            shared.append(black_wins(strong) - black_wins(weak))
+            strong = self._batch([self._scenario("ace_of_hearts")], 1_000, seed + 100).simulations[0]
+            weak = self._batch([self._scenario("nine_of_hearts")], 1_000, seed + 200).simulations[0]
+            independent.append(black_wins(strong) - black_wins(weak))
+        self.assertLess(statistics.pvariance(shared), statistics.pvariance(independent))
+
+
+class TestFlippedCardSweep(unittest.TestCase):
+    """A sweep splits the quantity evenly into one stratum per possible up-card."""
+
+    def _sweep(self, call, quantity=19_000, engine=SimulationEngineEnum.NUMPY, outputs=DEFAULT_SIMULATION_OUTPUTS):
+        players = make_players()
+        players[0].hand.remaining_cards = [euchre_deck_map[name] for name in
+                                           ["jack_of_spades", "jack_of_clubs", "ace_of_spades"]]
+        simulation = RoundSimulation(players=players, call=call, rounds=[], flipped_card=None, quantity=quantity,
+                                     dealer_id=4, seed=2, engine=engine, outputs=outputs)
+        return simulation, make_simulation_service().sweep_flipped_cards(simulation)
+
+    def test_one_stratum_per_unassigned_card(self):
+        simulation, batch = self._sweep(Call(suit=spades, type=CallTypeEnum.REGULAR_P2, player_id=1))
+        flipped = [stratum.flipped_card for stratum in batch.simulations]
+        self.assertEqual(len(flipped), 21 - 4)  # the 4 unassigned spades cannot be turned down and then called
+        self.assertTrue(all(card.suit != spades for card in flipped))
+        self.assertEqual(simulation.rounds_completed, 19_000)
+        self.assertEqual(sum(simulation.total_wins.values()), simulation.rounds_completed)
+
+    def test_strata_quantities_add_up_to_the_requested_quantity(self):
+        simulation, batch = self._sweep(Call(suit=spades, type=CallTypeEnum.REGULAR_P2, player_id=1), quantity=1_000)
+        quantities = [stratum.rounds_completed for stratum in batch.simulations]
+        self.assertEqual(sum(quantities), 1_000)
+        self.assertEqual(simulation.rounds_completed, 1_000)
+        self.assertLessEqual(max(quantities) - min(quantities), 1)
+
+    def test_strata_use_the_sweep_engine_and_outputs(self):
+        outputs = frozenset({SimulationOutputEnum.WIN_PROB, SimulationOutputEnum.AVG_TRICKS})
+        _, batch = self._sweep(Call(suit=spades, type=CallTypeEnum.REGULAR_P2, player_id=1), quantity=340,
+                               engine=SimulationEngineEnum.BITMASK, outputs=outputs)
+        self.assertTrue(all(stratum.engine == SimulationEngineEnum.BITMASK for stratum in batch.simulations))
+        self.assertTrue(all(stratum.outputs == outputs for stratum in batch.simulations))
+
+    def test_quantity_below_candidate_count_rejected(self):
+        with self.assertRaises(ValueError):
+            self._sweep(Call(suit=spades, type=CallTypeEnum.REGULAR_P2, player_id=1), quantity=10)
+
+    def test_phase_1_strata_call_the_flipped_suit(self):
+        _, batch = self._sweep(Call(suit=None, type=CallTypeEnum.REGULAR_P1, player_id=1), quantity=2_000)
+        self.assertEqual(len(batch.simulations), 21)
+        self.assertTrue(all(stratum.call.suit == stratum.flipped_card.suit for stratum in batch.simulations))
+
+
+class TestCallDecision(unittest.TestCase):
+    """Every bidding option is scored on the same deals and ranked by expected net points."""
+
+    def _evaluate(self, card_names, decider_id=1, dealer_id=4, flipped="queen_of_spades"):
+        players = make_players()
+        players[decider_id - 1].hand.remaining_cards = [euchre_deck_map[name] for name in card_names]
+        return CallDecisionService(CallService(), make_simulation_service()).evaluate(CallDecision(
+            players=players,
+            decider_id=decider_id,
+            dealer_id=dealer_id,
+            flipped_card=euchre_deck_map[flipped],
+            quantity=2_000,
+            seed=5,
+        ))
+
+    def test_options_ranked_best_first(self):
+        decision = self._evaluate(["jack_of_spades", "jack_of_clubs", "ace_of_spades", "king_of_spades",
+                                   "ace_of_hearts"])
+        self.assertEqual(len(decision.options), 9)
+        points = [option.expected_points for option in decision.options]
+        self.assertEqual(points, sorted(points, reverse=True))
+        best = decision.options[0]
+        self.assertEqual((best.call.suit, best.call.type), (spades, CallTypeEnum.LONER_P1))
+        self.assertTrue(any(option.is_pass() for option in decision.options))
+        self.assertTrue(all(option.standard_error >= 0 for option in decision.options))
+
+    def test_pass_scenario_never_names_turned_down_suit(self):
+        players = make_players()
+        decision = CallDecision(players=players, decider_id=1, dealer_id=4,
+                                flipped_card=euchre_deck_map["queen_of_spades"], quantity=10)
+        service = CallDecisionService(CallService(), make_simulation_service())
+        pass_option = CallOption(call=Call(suit=None, type=CallTypeEnum.REGULAR_P2, player_id=0))
+        simulation = service.create_option_simulation(decision, pass_option)
+        setup = service.round_simulation_service.create_setup(simulation)
+        self.assertEqual(setup.trump_id, -1)
+        self.assertEqual(sorted(setup.trump_ids), sorted(set(range(4)) - {suit_id_map[spades]}))
+        strata = NumpyRoundService.get_strata_draws(setup)
+        self.assertEqual(len({int(row[1] * len(setup.trump_ids)) for row in strata}), 3)
+
+    def test_dealer_pick_up_discards_weakest_card(self):
+        hand = [euchre_deck_map[name] for name in
+                ["jack_of_spades", "ace_of_spades", "king_of_spades", "nine_of_hearts", "ace_of_clubs"]]
+        kept = CallDecisionService.pick_up_flipped_card(hand, euchre_deck_map["queen_of_spades"])
+        self.assertNotIn(euchre_deck_map["nine_of_hearts"], kept)
+        self.assertIn(euchre_deck_map["queen_of_spades"], kept)
+        self.assertEqual(len(kept), 5)
+
+    def test_dealer_with_all_trump_after_pick_up_always_sweeps(self):
+        decision = self._evaluate(["jack_of_spades", "jack_of_clubs", "ace_of_spades", "king_of_spades",
+                                   "nine_of_hearts"], decider_id=4, dealer_id=4)
+        loner = next(option for option in decision.options if option.call.type == CallTypeEnum.LONER_P1)
+        self.assertEqual(loner.expected_points, 4)
+        self.assertEqual(loner.standard_error, 0)
+
+
+class TestDiscardDecision(unittest.TestCase):
+    """Each of the dealer's six candidate discards is scored on the same deals."""
+
+    def _decision(self, dealer_cards, call_type=CallTypeEnum.REGULAR_P1, caller_id=2):
+        players = make_players()
+        players[3].hand.remaining_cards = [euchre_deck_map[name] for name in dealer_cards]
+        return DiscardDecision(
+            players=players,
+            dealer_id=4,
+            flipped_card=euchre_deck_map["queen_of_spades"],
+            call=Call(suit=spades, type=call_type, player_id=caller_id),
+            quantity=2_000,
+            seed=3,
+        )
+
+    def test_discard_is_never_dealt(self):
+        players = make_players()
+        discard = euchre_deck_map["nine_of_hearts"]
+        setup = BitmaskRoundService.create_setup(players, None, euchre_deck_map["queen_of_spades"], 4, [], discard)
+        self.assertNotIn(card_id_map[discard], setup.unassigned_card_ids)
+        self.assertEqual(len(setup.unassigned_card_ids), 22)
+
+    def test_ranks_six_candidates_best_first(self):
+        service = CallDecisionService(CallService(), make_simulation_service())
+        decision = service.evaluate_discards(self._decision(
+            ["jack_of_spades", "ace_of_spades", "nine_of_hearts", "ace_of_clubs", "king_of_diamonds"]))
+        self.assertEqual(len(decision.options), 6)
+        self.assertEqual(decision.options[0].card, euchre_deck_map["nine_of_hearts"])
+        self.assertEqual(decision.options[-1].card, euchre_deck_map["jack_of_spades"])
+
+    def test_dealer_sitting_out_rejected(self):
+        service = CallDecisionService(CallService(), make_simulation_service())
+        with self.assertRaises(ValueError):
+            service.evaluate_discards(self._decision(
+                ["jack_of_spades", "ace_of_spades", "nine_of_hearts", "ace_of_clubs", "king_of_diamonds"],
+                CallTypeEnum.LONER_P1, caller_id=2))
+
+
+class TestSimulationJobs(unittest.TestCase):
+    """Background jobs publish partial totals, finish with the full quantity and stop when cancelled."""
+
+    def setUp(self):
+        self.job_service = SimulationJobService(make_simulation_service())
+
+    def _submit(self, quantity, chunk_size=1_000, call_type=CallTypeEnum.REGULAR_P1):
+        return self.job_service.submit(RoundSimulation(
+            players=make_players(),
+            call=Call(suit=spades, type=call_type, player_id=1),
+            rounds=[],
+            flipped_card=None,
+            quantity=quantity,
+            engine=SimulationEngineEnum.BITMASK,
+            chunk_size=chunk_size,
+        ))
+
+    def _wait(self, job, timeout=10):
+        deadline = time.time() + timeout
+        while not job.status.is_finished() and time.time() < deadline:
+            time.sleep(0.01)
+        return job
+
+    def test_job_completes_with_all_rounds(self):
+        job = self._wait(self._submit(5_000))
+        self.assertEqual(job.status, SimulationJobStatusEnum.COMPLETED)
+        self.assertEqual(job.totals.rounds, 5_000)
+        self.assertEqual(sum(job.totals.wins), 5_000)
+        self.assertIs(self.job_service.get_job(job.id), job)
+
+    def test_cancel_stops_job_with_partial_totals(self):
+        job = self._submit(100_000_000)
+        while job.totals is None:
+            time.sleep(0.01)
+        self.job_service.cancel(job.id)
+        self._wait(job)
+        self.assertEqual(job.status, SimulationJobStatusEnum.CANCELLED)
+        self.assertLess(job.totals.rounds, 100_000_000)
+        self.assertEqual(sum(job.totals.wins), job.totals.rounds)
+
+    def test_loner_teammate_removed_before_job_starts(self):
+        job = self._submit(5_000, call_type=CallTypeEnum.LONER_P1)
+        self.assertEqual([p.id for p in job.simulation.players], [1, 2, 4])
+        self._wait(job)
+        self.assertEqual(job.status, SimulationJobStatusEnum.COMPLETED)
+        self.assertEqual([p.id for p in job.simulation.players], [1, 2, 4])
+
+    def test_expired_jobs_pruned_on_get(self):
+        self.job_service.retention_seconds = 0
+        job = self._wait(self._submit(1_000))
+        time.sleep(0.01)
+        self.assertIsNone(self.job_service.get_job(job.id))
+        self.assertNotIn(job.id, self.job_service.jobs)
+
+    def test_object_engine_rejected(self):
+        with self.assertRaises(ValueError) as context:
+            self.job_service.submit(RoundSimulation(players=make_players(), call=None, rounds=[],
+                                                    flipped_card=None, engine=SimulationEngineEnum.OBJECT))
+        self.assertIn("bitmask, numpy, stratified, exact", str(context.exception))
+
+
 class TestGame(unittest.TestCase):
     """Integration tests for a full game via GameService."""
 
@@ -303,5 +1085,70 @@ class TestGame(unittest.TestCase):
             expected_dealer = (expected_dealer % 4) + 1
 
 
+class TestGameSimulationRecording(unittest.TestCase):
+    """Recorded games must stream every play to the log without keeping the games."""
+
+    def test_streams_every_game_to_the_play_log(self):
+        random.seed(8)
+        with tempfile.TemporaryDirectory() as directory:
+            simulation = GameSimulation(players=tuple(make_players()), games=[], output_directory=directory,
+                                        file_name='', quantity=3, record_batch_size=1, record_games=True)
+            GameSimulationService(make_game_service(), RecordService()).run_simulation(simulation)
+
+            player_names, records = read_play_log(simulation.get_full_file_path())
+            self.assertEqual(player_names, {p.id: p.name for p in simulation.players})
+            self.assertEqual(sorted(set(records['game_id'].tolist())), [1, 2, 3])
+            self.assertEqual(simulation.games, [])
+            self.assertEqual(simulation.card_win_totals.plays.sum(), len(records))
+            self.assertEqual(simulation.card_win_totals.wins.sum(),
+                             int((records['player_id'] == records['winner_id']).sum()))
+
+            from_log = CardWinTotals.create()
+            RecordService.update_card_win_totals_from_log(from_log, simulation.get_full_file_path(), chunk_size=1000)
+            self.assertEqual(from_log.plays.tolist(), simulation.card_win_totals.plays.tolist())
+            self.assertEqual(from_log.wins.tolist(), simulation.card_win_totals.wins.tolist())
+            del records
+
+    def test_keeps_round_snapshots_and_game_totals(self):
+        random.seed(9)
+        simulation = GameSimulation(players=tuple(make_players()), games=[], output_directory='', file_name='',
+                                    quantity=3, keep_round_snapshots=True)
+        GameSimulationService(make_game_service(), RecordService()).run_simulation(simulation)
+
+        totals = simulation.totals
+        snapshots = simulation.round_snapshots
+        self.assertEqual((totals.games, sum(totals.wins)), (3, 3))
+        self.assertEqual(totals.rounds, len(snapshots))
+        self.assertEqual([snapshot.game_id for snapshot in snapshots],
+                         sorted(snapshot.game_id for snapshot in snapshots))
+        for team_id in range(2):
+            self.assertEqual(totals.points[team_id], sum(snapshot.points[team_id] for snapshot in snapshots))
+        self.assertEqual(sum(totals.calls_by_seat), len(snapshots))
+        self.assertTrue(any(snapshot.discarded_card_id >= 0 for snapshot in snapshots))
+        self.assertTrue(any(call_types[snapshot.call_type_id].is_loner() for snapshot in snapshots))
+        for snapshot in snapshots:
+            # every seat's dealt hand is kept, even when it sits out or the dealer picks up
+            dealt = [card_id for hand in snapshot.starting_hands for card_id in hand]
+            self.assertEqual(len(set(dealt)), 20)
+            self.assertTrue(all(len(hand) == 5 for hand in snapshot.starting_hands[1:]))
+            self.assertNotIn(snapshot.flipped_card_id, dealt)
+            played = set(snapshot.play_card_ids)
+            call_type = call_types[snapshot.call_type_id]
+            if snapshot.discarded_card_id >= 0:
+                self.assertTrue(call_type.is_phase_1())
+                self.assertIn(snapshot.discarded_card_id, snapshot.starting_hands[snapshot.dealer_id])
+                self.assertNotIn(snapshot.discarded_card_id, played)
+                self.assertIn(snapshot.flipped_card_id, played)
+            active_ids = set(range(1, 5))
+            if call_type.is_loner():
+                caller_team = snapshot.caller_id % 2
+                active_ids -= {pid for pid in active_ids if pid % 2 == caller_team and pid != snapshot.caller_id}
+            for player_id in active_ids:
+                hand = set(snapshot.starting_hands[player_id]) - {snapshot.discarded_card_id}
+                self.assertTrue(hand <= played, player_id)
+            self.assertEqual(len(snapshot.play_card_ids), 5 * len(active_ids))
+            self.assertEqual(len(snapshot.trick_winner_ids), 5)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -1,9 +1,10 @@
 """Tests for API input validation — every invalid input must return 400 with a clear message."""
 import copy
 import json
+import time
 import unittest
 
-from RoundSimulationApi import app
+from RoundSimulationApi import app, simulation_cache
 
 
 def valid_payload():
@@ -503,6 +504,591 @@ class TestPartialCallDefaults(unittest.TestCase):
         self.assertIn("call_type is required", resp.get_json()["error"])
 
 
+class TestEngineSelection(unittest.TestCase):
+
+    def setUp(self):
+        self.client = app.test_client()
+
+    def _post(self, payload):
+        return self.client.post(
+            "/euchre/simulate/round",
+            data=json.dumps(payload),
+            content_type="application/json",
+        )
+
+    def test_every_engine_returns_200(self):
+        for engine in ["object", "bitmask", "numpy", "stratified"]:
+            payload = valid_payload()
+            payload["engine"] = engine
+            self.assertEqual(self._post(payload).status_code, 200, engine)
+
+    def test_negative_seed_rejected(self):
+        payload = valid_payload()
+        payload["seed"] = -5
+        resp = self._post(payload)
+        self.assertEqual(resp.status_code, 400)
+        self.assertIn("seed must be a non-negative integer", resp.get_json()["error"])
+
+    def test_boolean_seed_rejected(self):
+        for seed in (True, False):
+            payload = valid_payload()
+            payload["seed"] = seed
+            resp = self._post(payload)
+            self.assertEqual(resp.status_code, 400, seed)
+            self.assertIn("seed must be a non-negative integer", resp.get_json()["error"])
+
+    def test_seeded_requests_are_reproducible(self):
+        payload = valid_payload()
+        payload["seed"] = 99
+        payload["quantity"] = 500
+        first = self._post(payload).get_json()
+        simulation_cache.clear()
+        second = self._post(payload).get_json()
+        for data in (first, second):
+            del data["rounds_per_sec"]
+        self.assertEqual(first, second)
+
+    def test_adaptive_request_reports_rounds_used(self):
+        payload = valid_payload()
+        payload["quantity"] = 200_000
+        payload["target_win_prob_ci"] = 0.02
+        data = self._post(payload).get_json()
+        self.assertLess(data["rounds_simulated"], 200_000)
+
+    def test_non_positive_target_rejected(self):
+        payload = valid_payload()
+        payload["target_avg_points_ci"] = 0
+        resp = self._post(payload)
+        self.assertEqual(resp.status_code, 400)
+        self.assertIn("target_avg_points_ci must be a positive number", resp.get_json()["error"])
+
+    def test_boolean_target_rejected(self):
+        payload = valid_payload()
+        payload["target_win_prob_ci"] = True
+        resp = self._post(payload)
+        self.assertEqual(resp.status_code, 400)
+        self.assertIn("target_win_prob_ci must be a positive number", resp.get_json()["error"])
+
+    def test_time_budget_reports_rounds_and_rate(self):
+        payload = valid_payload()
+        del payload["quantity"]
+        payload["time_budget_ms"] = 100
+        data = self._post(payload).get_json()
+        self.assertGreater(data["rounds_simulated"], 0)
+        self.assertLess(data["rounds_simulated"], 1_000_000)
+        self.assertGreater(data["rounds_per_sec"], 0)
+
+    def test_invalid_time_budget_rejected(self):
+        for budget in (0, -10, 1.5, 600_000):
+            payload = valid_payload()
+            payload["time_budget_ms"] = budget
+            resp = self._post(payload)
+            self.assertEqual(resp.status_code, 400, budget)
+            self.assertIn("time_budget_ms must be an integer", resp.get_json()["error"])
+
+    def test_only_requested_outputs_are_returned(self):
+        payload = valid_payload()
+        payload["outputs"] = ["win_prob"]
+        data = self._post(payload).get_json()
+        self.assertEqual(len(data["win_prob_map"]), 2)
+        self.assertEqual(data["avg_points_map"], {})
+        self.assertEqual(data["avg_tricks_map"], {})
+        self.assertEqual(data["rounds_simulated"], 5)
+
+    def test_histograms_and_standard_errors_returned(self):
+        payload = valid_payload()
+        payload["quantity"] = 200
+        payload["outputs"] = ["win_prob", "points_histogram", "tricks_histogram", "standard_errors"]
+        data = self._post(payload).get_json()
+        self.assertEqual(len(data["points_histogram_map"]), 2)
+        for shares in data["tricks_histogram_map"].values():
+            self.assertEqual(len(shares), 6)
+            self.assertAlmostEqual(sum(shares), 1, places=3)
+        for team_name, (low, high) in data["win_prob_ci_map"].items():
+            self.assertLess(low, data["win_prob_map"][team_name])
+            self.assertGreater(high, data["win_prob_map"][team_name])
+            self.assertGreater(data["win_prob_se_map"][team_name], 0)
+        self.assertIsNone(data["avg_points_se_map"])
+
+    def test_outputs_default_to_the_averages(self):
+        data = self._post(valid_payload()).get_json()
+        self.assertEqual(len(data["win_prob_map"]), 2)
+        self.assertEqual(len(data["avg_tricks_map"]), 4)
+        for map_name in ("points_histogram_map", "tricks_histogram_map", "win_prob_se_map", "avg_points_se_map",
+                         "avg_tricks_se_map", "win_prob_ci_map", "avg_points_ci_map", "avg_tricks_ci_map"):
+            self.assertIsNone(data[map_name], map_name)
+
+    def test_confidence_intervals_clamped_to_possible_values(self):
+        payload = valid_payload()
+        payload["quantity"] = 5
+        payload["seed"] = 1
+        payload["outputs"] = ["win_prob", "avg_points", "avg_tricks", "standard_errors"]
+        data = self._post(payload).get_json()
+        for map_name, high in (("win_prob_ci_map", 1), ("avg_points_ci_map", 4), ("avg_tricks_ci_map", 5)):
+            for low_bound, high_bound in data[map_name].values():
+                self.assertGreaterEqual(low_bound, 0, map_name)
+                self.assertLessEqual(high_bound, high, map_name)
+        self.assertTrue(any(low == 0 for low, _ in data["avg_tricks_ci_map"].values()))
+
+    def test_invalid_outputs_rejected(self):
+        for outputs in (["histogram_of_everything"], [], "win_prob"):
+            payload = valid_payload()
+            payload["outputs"] = outputs
+            resp = self._post(payload)
+            self.assertEqual(resp.status_code, 400, outputs)
+            self.assertIn("outputs must", resp.get_json()["error"])
+
+    def test_invalid_engine_rejected(self):
+        payload = valid_payload()
+        payload["engine"] = "gpu"
+        resp = self._post(payload)
+        self.assertEqual(resp.status_code, 400)
+        self.assertIn("is not a valid engine", resp.get_json()["error"])
+
+    def test_exact_engine_quantity_capped_without_time_budget(self):
+        payload = valid_payload()
+        payload["engine"] = "exact"
+        payload["quantity"] = 1_001
+        resp = self._post(payload)
+        self.assertEqual(resp.status_code, 400)
+        self.assertIn("quantity must not exceed 1000 on the exact engine", resp.get_json()["error"])
+
+    def test_exact_engine_quantity_bounded_by_time_budget_accepted(self):
+        payload = valid_payload()
+        payload["engine"] = "exact"
+        payload["quantity"] = 1_000_000
+        payload["time_budget_ms"] = 50
+        self.assertEqual(self._post(payload).status_code, 200)
+
+
+class TestSimulationCache(unittest.TestCase):
+    """Repeated scenarios must be answered from the cache, relabelled with the request's names."""
+
+    def setUp(self):
+        self.client = app.test_client()
+        simulation_cache.clear()
+
+    def _post(self, payload):
+        return self.client.post(
+            "/euchre/simulate/round",
+            data=json.dumps(payload),
+            content_type="application/json",
+        )
+
+    @staticmethod
+    def _results(data):
+        return {key: value for key, value in data.items() if key not in ("rounds_per_sec", "cached")}
+
+    def test_repeat_request_hits_cache(self):
+        hits_before = simulation_cache.stats()["hits"]
+        first = self._post(valid_payload()).get_json()
+        second = self._post(valid_payload()).get_json()
+        self.assertEqual(self._results(first), self._results(second))
+        self.assertEqual(simulation_cache.stats()["hits"], hits_before + 1)
+        self.assertFalse(first["cached"])
+        self.assertTrue(second["cached"])
+        self.assertEqual(second["rounds_per_sec"], 0)
+
+    def test_seeded_suit_twin_does_not_answer_original(self):
+        original = valid_payload()
+        original["quantity"] = 2_000
+        original["seed"] = 7
+        # swapping spades and clubs keeps every bower a bower, so the twin is the same game under other suits
+        twin = json.loads(json.dumps(original).replace("spades", "#").replace("clubs", "spades").replace("#", "clubs"))
+        fresh = self._results(self._post(original).get_json())
+        simulation_cache.clear()
+        self.assertEqual(self._post(twin).status_code, 200)
+        after_twin = self._post(original).get_json()
+        self.assertFalse(after_twin["cached"])
+        self.assertEqual(self._results(after_twin), fresh)
+
+    def test_other_engine_misses_cache(self):
+        payload = valid_payload()
+        payload["seed"] = 4
+        self._post(payload)
+        hits_before = simulation_cache.stats()["hits"]
+        payload["engine"] = "exact"
+        self.assertEqual(self._post(payload).status_code, 200)
+        self.assertEqual(simulation_cache.stats()["hits"], hits_before)
+
+    def test_renamed_players_reuse_entry_with_new_names(self):
+        first = self._post(valid_payload()).get_json()
+        payload = valid_payload()
+        payload["player_names"] = ["Ann", "Ben", "Cat", "Dan"]
+        payload["dealer_name"] = "Ann"
+        payload["caller_name"] = "Ben"
+        second = self._post(payload).get_json()
+        self.assertEqual(list(first["avg_points_map"].values()), list(second["avg_points_map"].values()))
+        self.assertEqual(set(second["avg_tricks_map"]), {"Ann", "Ben", "Cat", "Dan"})
+
+    def test_cached_loner_excludes_teammate(self):
+        payload = valid_payload()
+        payload["call_type"] = "LONER_P1"
+        first = self._post(payload).get_json()
+        second = self._post(payload).get_json()
+        self.assertEqual(self._results(first), self._results(second))
+        self.assertNotIn("Dave", second["avg_tricks_map"])
+
+    def test_stats_endpoint(self):
+        resp = self.client.get("/euchre/simulate/round/cache")
+        self.assertEqual(resp.status_code, 200)
+        for key in ("hits", "misses", "evictions", "size"):
+            self.assertIn(key, resp.get_json())
+
+
+class TestSimulationJobs(unittest.TestCase):
+
+    def setUp(self):
+        self.client = app.test_client()
+
+    def _submit(self, payload):
+        return self.client.post(
+            "/euchre/simulate/round/jobs",
+            data=json.dumps(payload),
+            content_type="application/json",
+        )
+
+    def _wait(self, job_id, timeout=20):
+        deadline = time.time() + timeout
+        while True:
+            data = self.client.get(f"/euchre/simulate/round/jobs/{job_id}").get_json()
+            if data["status"] in ("completed", "cancelled", "failed") or time.time() > deadline:
+                return data
+            time.sleep(0.05)
+
+    def test_submit_and_poll_until_complete(self):
+        payload = valid_payload()
+        payload["quantity"] = 20_000
+        resp = self._submit(payload)
+        self.assertEqual(resp.status_code, 202)
+        data = self._wait(resp.get_json()["job_id"])
+        self.assertEqual(data["status"], "completed")
+        self.assertEqual(data["rounds_completed"], 20_000)
+        self.assertEqual(data["percent_complete"], 100)
+        self.assertEqual(data["result"]["rounds_simulated"], 20_000)
+        self.assertIn("Alice & Carol", data["result"]["win_prob_map"])
+
+    def test_quantity_beyond_sync_limit_accepted_and_cancelled(self):
+        payload = valid_payload()
+        payload["quantity"] = 50_000_000
+        job_id = self._submit(payload).get_json()["job_id"]
+        resp = self.client.delete(f"/euchre/simulate/round/jobs/{job_id}")
+        self.assertEqual(resp.status_code, 200)
+        data = self._wait(job_id)
+        self.assertEqual(data["status"], "cancelled")
+        self.assertLess(data["rounds_completed"], 50_000_000)
+
+    def test_quantity_above_job_limit_rejected(self):
+        payload = valid_payload()
+        payload["quantity"] = 2_000_000_000
+        resp = self._submit(payload)
+        self.assertEqual(resp.status_code, 400)
+        self.assertIn("quantity must not exceed", resp.get_json()["error"])
+
+    def test_exact_engine_quantity_above_job_limit_rejected(self):
+        payload = valid_payload()
+        payload["engine"] = "exact"
+        payload["quantity"] = 1_000_001
+        resp = self._submit(payload)
+        self.assertEqual(resp.status_code, 400)
+        self.assertIn("quantity must not exceed 1000000 on the exact engine", resp.get_json()["error"])
+
+    def test_unknown_job_returns_404(self):
+        self.assertEqual(self.client.get("/euchre/simulate/round/jobs/missing").status_code, 404)
+        self.assertEqual(self.client.delete("/euchre/simulate/round/jobs/missing").status_code, 404)
+
+
+class TestSimulationBatch(unittest.TestCase):
+
+    def setUp(self):
+        self.client = app.test_client()
+
+    def _post(self, payload):
+        return self.client.post(
+            "/euchre/simulate/round/batch",
+            data=json.dumps(payload),
+            content_type="application/json",
+        )
+
+    def test_results_in_scenario_order(self):
+        loner = valid_payload()
+        loner["call_type"] = "LONER_P1"
+        resp = self._post({"scenarios": [valid_payload(), loner], "quantity": 2_000, "seed": 3})
+        self.assertEqual(resp.status_code, 200)
+        data = resp.get_json()
+        self.assertEqual(data["rounds_simulated"], 2_000)
+        self.assertEqual(len(data["results"]), 2)
+        self.assertIn("Dave", data["results"][0]["avg_tricks_map"])
+        self.assertNotIn("Dave", data["results"][1]["avg_tricks_map"])
+
+    def test_quantity_defaults_to_largest_scenario(self):
+        small = valid_payload()
+        large = valid_payload()
+        large["quantity"] = 40
+        data = self._post({"scenarios": [small, large]}).get_json()
+        self.assertEqual(data["rounds_simulated"], 40)
+
+    def test_too_many_scenarios_rejected(self):
+        resp = self._post({"scenarios": [valid_payload()] * 21})
+        self.assertEqual(resp.status_code, 400)
+        self.assertIn("scenarios must contain between 1 and 20", resp.get_json()["error"])
+
+    def test_unsupported_scenario_fields_rejected(self):
+        for field_name, value in (("engine", "exact"), ("seed", 1), ("target_win_prob_ci", 0.01),
+                                  ("target_avg_points_ci", 0.05), ("time_budget_ms", 100)):
+            scenario = valid_payload()
+            scenario[field_name] = value
+            resp = self._post({"scenarios": [valid_payload(), scenario]})
+            self.assertEqual(resp.status_code, 400, field_name)
+            self.assertIn(f"scenario 1: {field_name} is not supported", resp.get_json()["error"])
+
+    def test_non_integer_quantity_rejected(self):
+        for quantity in ("5", 2.5, True):
+            resp = self._post({"scenarios": [valid_payload()], "quantity": quantity})
+            self.assertEqual(resp.status_code, 400, quantity)
+            self.assertIn("quantity must be a positive integer", resp.get_json()["error"])
+
+    def test_invalid_scenario_reported_by_index(self):
+        bad = valid_payload()
+        bad["call_type"] = ""
+        resp = self._post({"scenarios": [valid_payload(), bad]})
+        self.assertEqual(resp.status_code, 400)
+        self.assertIn("scenario 1: call_type is required", resp.get_json()["error"])
+
+
+class TestFlippedCardSweepEndpoint(unittest.TestCase):
+
+    def setUp(self):
+        self.client = app.test_client()
+
+    def _post(self, payload):
+        return self.client.post(
+            "/euchre/simulate/round/flipped-sweep",
+            data=json.dumps(payload),
+            content_type="application/json",
+        )
+
+    def test_returns_result_per_candidate(self):
+        payload = valid_payload()
+        payload["flipped_card"] = ""
+        payload["call_suit"] = ""
+        payload["quantity"] = 1_500
+        resp = self._post(payload)
+        self.assertEqual(resp.status_code, 200)
+        data = resp.get_json()
+        self.assertEqual(len(data["by_flipped_card"]), 24 - 9)
+        self.assertNotIn("nine_of_spades", data["by_flipped_card"])
+        self.assertEqual(data["overall"]["rounds_simulated"], data["rounds_simulated"])
+
+    def test_fixed_flipped_card_rejected(self):
+        resp = self._post(valid_payload())
+        self.assertEqual(resp.status_code, 400)
+        self.assertIn("flipped_card must be blank", resp.get_json()["error"])
+
+    def _sweep_payload(self, **fields):
+        payload = valid_payload()
+        payload["flipped_card"] = ""
+        payload["call_suit"] = ""
+        payload["quantity"] = 1_000
+        payload.update(fields)
+        return payload
+
+    def test_total_rounds_match_quantity(self):
+        resp = self._post(self._sweep_payload())
+        self.assertEqual(resp.status_code, 200)
+        data = resp.get_json()
+        self.assertEqual(data["rounds_simulated"], 1_000)
+        self.assertEqual(sum(result["rounds_simulated"] for result in data["by_flipped_card"].values()), 1_000)
+
+    def test_engine_and_outputs_reach_every_stratum(self):
+        resp = self._post(self._sweep_payload(engine="bitmask", outputs=["win_prob", "standard_errors"]))
+        self.assertEqual(resp.status_code, 200)
+        data = resp.get_json()
+        for result in [data["overall"], *data["by_flipped_card"].values()]:
+            self.assertTrue(result["win_prob_se_map"])
+            self.assertEqual(result["avg_points_map"], {})
+
+    def test_unsupported_fields_rejected(self):
+        for field_name, value in (("time_budget_ms", 100), ("target_win_prob_ci", 0.01),
+                                  ("target_avg_points_ci", 0.05)):
+            resp = self._post(self._sweep_payload(**{field_name: value}))
+            self.assertEqual(resp.status_code, 400, field_name)
+            self.assertIn(f"{field_name} is not supported", resp.get_json()["error"])
+
+    def test_missing_quantity_rejected(self):
+        resp = self._post(self._sweep_payload(quantity=None))
+        self.assertEqual(resp.status_code, 400)
+        self.assertIn("quantity must be a positive integer", resp.get_json()["error"])
+
+
+class TestCallDecisionEndpoint(unittest.TestCase):
+
+    def setUp(self):
+        self.client = app.test_client()
+
+    def _payload(self):
+        return {
+            "player_names": ["Alice", "Bob", "Carol", "Dave"],
+            "player_hands": [["JS", "JC", "AS", "KS", "AH"], [], [], []],
+            "dealer_name": "Dave",
+            "flipped_card": "QS",
+            "decider_name": "Alice",
+            "quantity": 1_000,
+        }
+
+    def _post(self, payload):
+        return self.client.post(
+            "/euchre/evaluate/call",
+            data=json.dumps(payload),
+            content_type="application/json",
+        )
+
+    def test_returns_ranked_options(self):
+        resp = self._post(self._payload())
+        self.assertEqual(resp.status_code, 200)
+        options = resp.get_json()["options"]
+        self.assertEqual(len(options), 9)
+        self.assertEqual(options[0]["action"], "order_up")
+        self.assertEqual(sum(option["action"] == "pass" for option in options), 1)
+
+    def test_missing_decider_rejected(self):
+        payload = self._payload()
+        del payload["decider_name"]
+        resp = self._post(payload)
+        self.assertEqual(resp.status_code, 400)
+        self.assertIn("decider_name is required", resp.get_json()["error"])
+
+    def test_missing_or_non_integer_quantity_rejected(self):
+        for quantity in (None, "100", False):
+            payload = self._payload()
+            payload["quantity"] = quantity
+            resp = self._post(payload)
+            self.assertEqual(resp.status_code, 400, quantity)
+            self.assertIn("quantity must be a positive integer", resp.get_json()["error"])
+
+    def test_flipped_card_in_hand_rejected(self):
+        payload = self._payload()
+        payload["flipped_card"] = "AH"
+        resp = self._post(payload)
+        self.assertEqual(resp.status_code, 400)
+        self.assertIn("already in a player's hand", resp.get_json()["error"])
+
+
+class TestDiscardDecisionEndpoint(unittest.TestCase):
+
+    def setUp(self):
+        self.client = app.test_client()
+
+    def _payload(self):
+        return {
+            "player_names": ["Alice", "Bob", "Carol", "Dave"],
+            "player_hands": [[], [], [], ["JS", "AS", "9H", "AC", "KD"]],
+            "dealer_name": "Dave",
+            "flipped_card": "QS",
+            "caller_name": "Bob",
+            "quantity": 1_000,
+        }
+
+    def _post(self, payload):
+        return self.client.post(
+            "/euchre/evaluate/discard",
+            data=json.dumps(payload),
+            content_type="application/json",
+        )
+
+    def test_returns_six_ranked_discards(self):
+        resp = self._post(self._payload())
+        self.assertEqual(resp.status_code, 200)
+        options = resp.get_json()["options"]
+        self.assertEqual(len(options), 6)
+        self.assertIn("queen_of_spades", [option["discard"] for option in options])
+
+    def test_missing_or_non_integer_quantity_rejected(self):
+        for quantity in (None, "100", 1.5):
+            payload = self._payload()
+            payload["quantity"] = quantity
+            resp = self._post(payload)
+            self.assertEqual(resp.status_code, 400, quantity)
+            self.assertIn("quantity must be a positive integer", resp.get_json()["error"])
+
+    def test_incomplete_dealer_hand_rejected(self):
+        payload = self._payload()
+        payload["player_hands"][3] = ["JS", "AS"]
+        resp = self._post(payload)
+        self.assertEqual(resp.status_code, 400)
+        self.assertIn("must have 5 cards", resp.get_json()["error"])
+
+    def test_phase_2_call_rejected(self):
+        payload = self._payload()
+        payload["call_type"] = "REGULAR_P2"
+        resp = self._post(payload)
+        self.assertEqual(resp.status_code, 400)
+        self.assertIn("phase 1", resp.get_json()["error"])
+
+
+class TestSimulationStream(unittest.TestCase):
+
+    def setUp(self):
+        self.client = app.test_client()
+        simulation_cache.clear()
+
+    def _stream(self, payload):
+        resp = self.client.post(
+            "/euchre/simulate/round/stream",
+            data=json.dumps(payload),
+            content_type="application/json",
+        )
+        events = []
+        if resp.mimetype != "text/event-stream":
+            return resp, events
+        for block in resp.get_data(as_text=True).strip().split("\n\n"):
+            if block:
+                name_line, data_line = block.split("\n")
+                events.append((name_line[len("event: "):], json.loads(data_line[len("data: "):])))
+        return resp, events
+
+    def test_progress_events_then_result(self):
+        payload = valid_payload()
+        payload["quantity"] = 120_000
+        resp, events = self._stream(payload)
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.mimetype, "text/event-stream")
+        names = [name for name, _ in events]
+        self.assertGreaterEqual(names.count("progress"), 2)
+        self.assertEqual(names[-1], "result")
+        progress = [data["rounds_simulated"] for name, data in events if name == "progress"]
+        self.assertEqual(progress, sorted(progress))
+        self.assertIn("win_prob_map", events[0][1])
+        self.assertEqual(events[-1][1]["rounds_simulated"], 120_000)
+
+    def test_cached_scenario_streams_only_result(self):
+        self._stream(valid_payload())
+        _, events = self._stream(valid_payload())
+        self.assertEqual([name for name, _ in events], ["result"])
+
+    def test_invalid_request_rejected_before_streaming(self):
+        payload = valid_payload()
+        payload["quantity"] = -1
+        resp, _ = self._stream(payload)
+        self.assertEqual(resp.status_code, 400)
+
+    def test_object_engine_rejected(self):
+        payload = valid_payload()
+        payload["engine"] = "object"
+        resp, _ = self._stream(payload)
+        self.assertEqual(resp.status_code, 400)
+        self.assertIn("streamed simulations require", resp.get_json()["error"])
+
+    def test_streamed_result_not_served_to_sync_request(self):
+        payload = valid_payload()
+        payload["seed"] = 8
+        self._stream(payload)
+        hits_before = simulation_cache.stats()["hits"]
+        resp = self.client.post("/euchre/simulate/round", data=json.dumps(payload), content_type="application/json")
+        self.assertFalse(resp.get_json()["cached"])
+        self.assertEqual(simulation_cache.stats()["hits"], hits_before)
+
+
 class TestShorthandCardNotation(unittest.TestCase):
 
     def setUp(self):
@@ -1,7 +1,7 @@
 from typing import List
 
 from constants.GameConstants import trump_suit_hierarchy, play_suit_hierarchy, trump_and_play_suit_hierarchy, \
-    euchre_deck_map, suit_name_map, euchre_deck, suits
+    euchre_deck_map, suit_name_map, euchre_deck, suits, card_id_map, card_bits, CARD_COUNT
 from dtos.BasicDto import CardValueEnum, Card, Suit
 
 _SHORTHAND_VALUE_MAP = {
@@ -97,3 +97,21 @@ def get_suit_by_name(suit_name) -> Suit:
     if suit_name not in suit_name_map:
         raise ValueError(f'Invalid suit name: {suit_name}')
     return suit_name_map[suit_name]
+
+
+# lazily filled cache: key=card mask, value=tuple of card ids set in the mask
+class _MaskCardIdCache(dict):
+    def __missing__(self, mask):
+        card_ids = tuple(card_id for card_id in range(CARD_COUNT) if mask & card_bits[card_id])
+        self[mask] = card_ids
+        return card_ids
+
+
+mask_card_ids = _MaskCardIdCache()
+
+
+def cards_to_mask(cards: List[Card]) -> int:
+    mask = 0
+    for card in cards:
+        mask |= card_bits[card_id_map[card]]
+    return mask
@@ -0,0 +1,154 @@
+import os
+import queue
+import threading
+from typing import Dict, Tuple
+
+import numpy as np
+
+# binary play log: one fixed-size header, then one fixed-size record per play appended in play order
+# the records mirror the RecordService csv columns with names replaced by ids (player names live in the header),
+# so a log of any size can be scanned through numpy.memmap without parsing
+PLAY_LOG_MAGIC = b'EUCHPLAY'
+PLAY_LOG_VERSION = 1
+PLAY_LOG_MAX_NAME_BYTES = 32
+PLAY_LOG_HEADER_DTYPE = np.dtype([
+    ('magic', 'S8'),
+    ('version', '<u2'),
+    ('record_size', '<u2'),
+    ('reserved', '<u4'),
+    ('player_names', f'S{PLAY_LOG_MAX_NAME_BYTES}', (5,)),  # index=player_id (index 0 unused), utf-8 encoded
+])
+PLAY_RECORD_DTYPE = np.dtype([
+    ('game_id', '<u4'),
+    ('round_id', '<u4'),
+    ('trick_id', 'u1'),
+    ('dealer_id', 'u1'),
+    ('caller_id', 'u1'),
+    ('call_type_id', 'u1'),  # index into SimulationDto.call_types
+    ('trump_id', 'u1'),  # index into GameConstants.suits
+    ('player_id', 'u1'),
+    ('play_id', 'u1'),
+    ('card_id', 'u1'),  # index into GameConstants.euchre_deck
+    ('play_card_rank', 'u1'),  # rank for the trump and play suit (lower wins)
+    ('card_rank', 'u1'),  # rank for the trump suit alone
+    ('winner_id', 'u1'),  # player_id that won the trick
+    ('reserved', 'u1'),
+])
+
+
+# names longer than the fixed name field are rejected, since numpy would silently truncate them
+def create_play_log_header(player_names: Dict[int, str]) -> np.ndarray:
+    for name in player_names.values():
+        if len(name.encode('utf-8')) > PLAY_LOG_MAX_NAME_BYTES:
+            raise ValueError(f"player name '{name}' is longer than {PLAY_LOG_MAX_NAME_BYTES} utf-8 bytes")
+    header = np.zeros(1, dtype=PLAY_LOG_HEADER_DTYPE)
+    header['magic'] = PLAY_LOG_MAGIC
+    header['version'] = PLAY_LOG_VERSION
+    header['record_size'] = PLAY_RECORD_DTYPE.itemsize
+    for player_id, name in player_names.items():
+        header['player_names'][0, player_id] = name.encode('utf-8')
+    return header
+
+
+def read_play_log_header(log_file: str) -> Dict[int, str]:
+    header = np.fromfile(log_file, dtype=PLAY_LOG_HEADER_DTYPE, count=1)
+    if len(header) == 0 or header['magic'][0] != PLAY_LOG_MAGIC:
+        raise ValueError(f'{log_file} is not a play log')
+    if header['version'][0] != PLAY_LOG_VERSION or header['record_size'][0] != PLAY_RECORD_DTYPE.itemsize:
+        raise ValueError(f'{log_file} has unsupported play log version {header["version"][0]}')
+    return {player_id: name.decode('utf-8') for player_id, name in enumerate(header['player_names'][0]) if name}
+
+
+# player names by id and a read-only memory map of every record (nothing is read until the records are used)
+def read_play_log(log_file: str) -> Tuple[Dict[int, str], np.ndarray]:
+    player_names = read_play_log_header(log_file)
+    if os.path.getsize(log_file) == PLAY_LOG_HEADER_DTYPE.itemsize:
+        return player_names, np.zeros(0, dtype=PLAY_RECORD_DTYPE)
+    return player_names, np.memmap(log_file, dtype=PLAY_RECORD_DTYPE, mode='r',
+                                   offset=PLAY_LOG_HEADER_DTYPE.itemsize)
+
+
+class PlayLogWriter:
+    # append-only writer that keeps the log open across batches, writing the header when the log is new
+    # an existing log must have been written for the same player names
+    def __init__(self, log_file: str, player_names: Dict[int, str]):
+        self.log_file = log_file
+        self.records_written = 0
+        if os.path.isfile(log_file) and os.path.getsize(log_file) > 0:
+            if read_play_log_header(log_file) != player_names:
+                raise ValueError(f'{log_file} was written for other players')
+            self._file = open(log_file, 'ab')
+        else:
+            header = create_play_log_header(player_names)
+            self._file = open(log_file, 'wb')
+            header.tofile(self._file)
+
+    def write(self, records: np.ndarray) -> None:
+        if records.dtype != PLAY_RECORD_DTYPE:
+            raise ValueError('records must use PLAY_RECORD_DTYPE')
+        records.tofile(self._file)
+        self.records_written += len(records)
+
+    def flush(self) -> None:
+        self._file.flush()
+
+    def close(self) -> None:
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class BackgroundPlayLogWriter:
+    # queues record batches for a thread that owns one PlayLogWriter, so callers never wait on disk I/O
+    # the queue is bounded to keep memory constant: a caller only waits when the disk falls that far behind
+    # a write error stops the thread and is raised from the next write or from close
+    def __init__(self, log_file: str, player_names: Dict[int, str], max_queued_batches: int = 100):
+        self._writer = PlayLogWriter(log_file, player_names)
+        self._queue = queue.Queue(maxsize=max_queued_batches)
+        self._error = None
+        self._thread = threading.Thread(target=self._run, name='play-log-writer', daemon=True)
+        self._thread.start()
+
+    @property
+    def records_written(self) -> int:
+        return self._writer.records_written
+
+    def write(self, records: np.ndarray) -> None:
+        if self._error is not None:
+            raise self._error
+        self._queue.put(records)
+
+    def close(self) -> None:
+        self._queue.put(None)
+        self._thread.join()
+        self._writer.close()
+        if self._error is not None:
+            raise self._error
+
+    # writes everything queued so far in one call, until close queues None
+    def _run(self) -> None:
+        closing = False
+        while not closing:
+            batches = [self._queue.get()]
+            while batches[-1] is not None and not self._queue.empty():
+                batches.append(self._queue.get_nowait())
+            if batches[-1] is None:
+                closing = True
+                batches.pop()
+            if batches and self._error is None:
+                try:
+                    self._writer.write(np.concatenate(batches))
+                    self._writer.flush()
+                except Exception as e:
+                    # keep draining the queue so callers are never left waiting on a dead writer
+                    self._error = e
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
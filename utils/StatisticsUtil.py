@@ -0,0 +1,21 @@
+import math
+
+# z-score of a two-sided 95% confidence interval
+Z_95 = 1.959963984540054
+
+
+# standard error of a proportion estimated from successes out of count trials
+def proportion_standard_error(successes: int, count: int) -> float:
+    if count == 0:
+        return 0.0
+    p = successes / count
+    return math.sqrt(p * (1 - p) / count)
+
+
+# standard error of a mean estimated from the running sum and sum of squares of count samples
+def mean_standard_error(total: float, total_squares: float, count: int) -> float:
+    if count < 2:
+        return 0.0
+    mean = total / count
+    variance = max(0.0, total_squares / count - mean * mean) * count / (count - 1)
+    return math.sqrt(variance / count)
@@ -0,0 +1,96 @@
+from copy import copy
+from typing import List, Tuple
+
+from constants.GameConstants import suits, euchre_deck, card_id_map, suit_id_map
+from dtos.BasicDto import Card, Suit, Hand
+from dtos.SimulationDto import RoundSimulation, SuitCanonicalForm
+
+# suit ids pair up by color (spades/clubs=0/1, hearts/diamonds=2/3) so a suit's same-color partner is suit_id ^ 1
+# relabelling suits is harmless as long as partners stay partners, since that keeps every left bower a left bower
+# that leaves 8 symmetries: swap within black, swap within red, swap the colors, and their combinations
+# each permutation is indexed by original suit_id and holds the relabelled suit_id
+suit_permutations = tuple(
+    (spades_id, spades_id ^ 1, hearts_id, hearts_id ^ 1)
+    for spades_id in range(4) for hearts_id in range(4) if spades_id // 2 != hearts_id // 2
+)
+IDENTITY_SUIT_PERMUTATION = (0, 1, 2, 3)
+_VALUES_PER_SUIT = len(euchre_deck) // len(suits)
+
+
+def invert_suit_permutation(suit_permutation: Tuple[int, ...]) -> Tuple[int, ...]:
+    inverse = [0] * len(suit_permutation)
+    for suit_id, permuted_suit_id in enumerate(suit_permutation):
+        inverse[permuted_suit_id] = suit_id
+    return tuple(inverse)
+
+
+def permute_card_id(card_id: int, suit_permutation: Tuple[int, ...]) -> int:
+    return suit_permutation[card_id // _VALUES_PER_SUIT] * _VALUES_PER_SUIT + card_id % _VALUES_PER_SUIT
+
+
+def permute_card(card: Card, suit_permutation: Tuple[int, ...]) -> Card:
+    return euchre_deck[permute_card_id(card_id_map[card], suit_permutation)]
+
+
+def permute_suit(suit: Suit, suit_permutation: Tuple[int, ...]) -> Suit:
+    return suits[suit_permutation[suit_id_map[suit]]]
+
+
+# picks the lexicographically smallest relabelling of (hands, flipped card, call suit) over all 8 symmetries
+# every scenario in an equivalence class maps to the same hands/flipped/suit, with its own permutation
+# limiting candidate_permutations to the identity only normalizes the scenario (sorted hands, ids) without relabelling
+def canonicalize(hands: List[List[Card]], flipped_card: Card, call_suit: Suit,
+                 candidate_permutations: Tuple[Tuple[int, ...], ...] = suit_permutations) -> SuitCanonicalForm:
+    hand_ids = [[card_id_map[card] for card in hand] for hand in hands]
+    flipped_card_id = card_id_map[flipped_card] if flipped_card is not None else -1
+    call_suit_id = suit_id_map[call_suit] if call_suit is not None else -1
+
+    best = None
+    for suit_permutation in candidate_permutations:
+        candidate = (
+            tuple(tuple(sorted(permute_card_id(card_id, suit_permutation) for card_id in hand))
+                  for hand in hand_ids),
+            permute_card_id(flipped_card_id, suit_permutation) if flipped_card_id >= 0 else -1,
+            suit_permutation[call_suit_id] if call_suit_id >= 0 else -1,
+            suit_permutation,
+        )
+        if best is None or candidate < best:
+            best = candidate
+
+    return SuitCanonicalForm(
+        hands=best[0],
+        flipped_card_id=best[1],
+        call_suit_id=best[2],
+        suit_permutation=best[3],
+        inverse_permutation=invert_suit_permutation(best[3]),
+    )
+
+
+def canonicalize_round_simulation(round_simulation: RoundSimulation) -> SuitCanonicalForm:
+    return canonicalize(
+        [player.hand.remaining_cards for player in round_simulation.players],
+        round_simulation.flipped_card,
+        round_simulation.call.suit if round_simulation.call is not None else None,
+    )
+
+
+# returns a copy of the simulation with every card and the call suit relabelled by suit_permutation
+# use the inverse permutation of a canonical form to map a canonical simulation back to the original suits
+def permute_round_simulation(round_simulation: RoundSimulation, suit_permutation: Tuple[int, ...]) -> RoundSimulation:
+    permuted = copy(round_simulation)
+    permuted.players = []
+    for player in round_simulation.players:
+        permuted_player = copy(player)
+        permuted_player.hand = Hand(
+            starting_cards=[permute_card(card, suit_permutation) for card in player.hand.starting_cards],
+            remaining_cards=[permute_card(card, suit_permutation) for card in player.hand.remaining_cards],
+        )
+        permuted.players.append(permuted_player)
+    if round_simulation.flipped_card is not None:
+        permuted.flipped_card = permute_card(round_simulation.flipped_card, suit_permutation)
+    if round_simulation.call is not None and round_simulation.call.suit is not None:
+        permuted.call = copy(round_simulation.call)
+        permuted.call.suit = permute_suit(round_simulation.call.suit, suit_permutation)
+    permuted.rounds = []
+    permuted.passing_player_ids = list(round_simulation.passing_player_ids)
+    return permuted